@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from flask import Flask
+
+from .bench import bench_cli
+from .categories import categories_cli
+from .content import content_cli
+from .media import media_cli
+from .popularity import popularity_cli
+from .scheduler import scheduler_cli
+from .search import search_cli
+from .visits import visits_cli
+from .warmup import warmup_command
+
+
+def register_commands(app: Flask) -> None:
+    app.cli.add_command(bench_cli)
+    app.cli.add_command(categories_cli)
+    app.cli.add_command(content_cli)
+    app.cli.add_command(media_cli)
+    app.cli.add_command(popularity_cli)
+    app.cli.add_command(scheduler_cli)
+    app.cli.add_command(search_cli)
+    app.cli.add_command(visits_cli)
+    app.cli.add_command(warmup_command)
+
+
+__all__ = ["register_commands"]
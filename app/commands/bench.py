@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.services.loadtest import (
+    SCENARIOS,
+    HttpTarget,
+    WsgiTarget,
+    cleanup,
+    compare_results,
+    load_context,
+    login,
+    results_document,
+    run_benchmark,
+    select_scenarios,
+)
+from app.services.synthetic import SeedScale, remove_synthetic_data, seed_synthetic_data, synthetic_data_exists
+
+bench_cli = AppGroup("bench", help="Generate synthetic data, load test the API and compare runs.")
+
+
+@bench_cli.command("seed")
+@click.option("--posts", default=1000, show_default=True)
+@click.option("--categories", default=30, show_default=True)
+@click.option("--chapters", default=6, show_default=True, help="Average chapters per post.")
+@click.option("--media", default=200, show_default=True)
+@click.option("--visits", default=50000, show_default=True)
+@click.option("--days", default=90, show_default=True, help="How far back posts and visits go.")
+@click.option("--seed", "random_seed", default=42, show_default=True, help="Same seed, same data.")
+@click.option("--batch-size", default=1000, show_default=True, help="Rows per INSERT.")
+@click.option("--reset", is_flag=True, help="Remove earlier synthetic data first.")
+def seed_command(
+    posts: int, categories: int, chapters: int, media: int, visits: int, days: int, random_seed: int, batch_size: int, reset: bool
+) -> None:
+    """Fill the database with synthetic posts, chapters, categories, media, visits and daily metrics."""
+    if reset:
+        removed = remove_synthetic_data(batch_size)
+        click.echo(f"Removed {removed['posts']} posts, {removed['categories']} categories and {removed['media']} media")
+    elif synthetic_data_exists():
+        raise click.ClickException("Synthetic data is already present; pass --reset to replace it")
+
+    scale = SeedScale(posts, categories, chapters, media, visits, max(days, 1), random_seed)
+    counts = seed_synthetic_data(scale, current_app.config, batch_size, click.echo)
+    click.echo("Seeded " + ", ".join(f"{count} {name}" for name, count in counts.items()))
+
+
+@bench_cli.command("reset")
+@click.option("--batch-size", default=1000, show_default=True)
+def reset_command(batch_size: int) -> None:
+    """Remove the synthetic data and whatever the load test created."""
+    removed = remove_synthetic_data(batch_size)
+    click.echo(f"Removed {removed['posts']} posts, {removed['categories']} categories and {removed['media']} media")
+
+
+@bench_cli.command("run")
+@click.option("--url", help="Base URL of a running server; by default the app is called in-process.")
+@click.option("--scenario", "scenarios", multiple=True, type=click.Choice(sorted(SCENARIOS)), help="Repeatable; default all.")
+@click.option("--concurrency", default=8, show_default=True)
+@click.option("--requests", default=500, show_default=True, help="Requests per scenario.")
+@click.option("--warmup", default=20, show_default=True, help="Unmeasured requests before each scenario.")
+@click.option("--password", default="bench", show_default=True, help="Password of the synthetic admin user.")
+@click.option("--seed", "random_seed", default=0, show_default=True)
+@click.option("--output", type=click.Path(dir_okay=False, path_type=Path), help="Write the results as JSON.")
+def run_command(
+    url: str | None,
+    scenarios: tuple[str, ...],
+    concurrency: int,
+    requests: int,
+    warmup: int,
+    password: str,
+    random_seed: int,
+    output: Path | None,
+) -> None:
+    """Run the load test scenarios and report throughput and p50/p95/p99 latency.
+
+    With --url, the scenarios are picked from this app's database, so it
+    must be the one the server uses.
+    """
+    try:
+        target = HttpTarget(url) if url else WsgiTarget(current_app._get_current_object())
+        ctx = load_context()
+        chosen = select_scenarios(scenarios, ctx)
+        if any(scenario.admin for scenario in chosen):
+            ctx.token = login(target, password)
+    except ValueError as exc:
+        raise click.ClickException(str(exc)) from exc
+
+    click.echo(f"Target {target.description}: {len(chosen)} scenarios, {requests} requests each, concurrency {concurrency}")
+    try:
+        results = run_benchmark(
+            target, chosen, ctx, max(requests, 1), max(concurrency, 1), max(warmup, 0), random_seed, click.echo
+        )
+    finally:
+        cleanup(target, ctx)
+
+    if output is not None:
+        parameters = {"concurrency": concurrency, "requests": requests, "warmup": warmup, "seed": random_seed}
+        document = results_document(results, parameters, current_app._get_current_object(), target)
+        output.write_text(json.dumps(document, indent=2) + "\n")
+        click.echo(f"Wrote {output}")
+
+    failed = [name for name, result in results.items() if result["errors"]]
+    if failed:
+        click.echo(f"Scenarios with errors: {', '.join(failed)}", err=True)
+
+
+@bench_cli.command("compare")
+@click.argument("base", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.argument("new", type=click.Path(exists=True, dir_okay=False, path_type=Path))
+@click.option("--threshold", default=0.10, show_default=True, help="Allowed p95 growth, as a fraction.")
+@click.option("--min-delta-ms", default=1.0, show_default=True, help="Ignore p95 changes smaller than this.")
+def compare_command(base: Path, new: Path, threshold: float, min_delta_ms: float) -> None:
+    """Compare two `bench run --output` files; exits non-zero when a scenario regressed."""
+    comparison = compare_results(json.loads(base.read_text()), json.loads(new.read_text()), threshold, min_delta_ms)
+    for warning in comparison["comparable"]:
+        click.echo(f"Warning: {warning}", err=True)
+
+    click.echo(f"{'scenario':<24} {'p50 ms':>17} {'p95 ms':>17} {'p99 ms':>17} {'req/s':>17}")
+    for row in comparison["rows"]:
+        if row["base"] is None or row["new"] is None:
+            click.echo(f"{row['scenario']:<24} only in {'new' if row['base'] is None else 'base'}")
+            continue
+        cells = [
+            _cell(row["base"][metric], row["new"][metric], row[f"{metric}_change"])
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps")
+        ]
+        flag = "  REGRESSED: " + "; ".join(row["reasons"]) if row["regressed"] else ""
+        click.echo(f"{row['scenario']:<24} " + " ".join(cells) + flag)
+
+    if comparison["regressions"]:
+        raise click.ClickException(f"{len(comparison['regressions'])} scenarios regressed")
+
+
+def _cell(before: float, after: float, change: float | None) -> str:
+    percent = f"{change * 100:+.0f}%" if change is not None else "n/a"
+    return f"{after:9.1f} ({percent:>5})"
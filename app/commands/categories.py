@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import click
+from flask.cli import AppGroup
+
+from app.extensions import db
+from app.services.cache import get_response_cache
+from app.services.categories import rebuild_closure
+
+categories_cli = AppGroup("categories", help="Maintain the category tree.")
+
+
+@categories_cli.command("rebuild-closure")
+def rebuild_closure_command() -> None:
+    """Recompute category_closure from parent_id, e.g. after creating the table on an existing database."""
+    rows = rebuild_closure()
+    db.session.commit()
+    get_response_cache().invalidate("categories")
+    click.echo(f"Category closure rebuilt with {rows} rows")
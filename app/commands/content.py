@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+import json
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.services.bulk import BulkImporter, default_author_id, export_records, ndjson_line
+
+content_cli = AppGroup("content", help="Export and import posts and categories as NDJSON.")
+
+
+@content_cli.command("export")
+@click.argument("output", type=click.File("wb"), default="-")
+@click.option("--batch-size", type=int, help="Posts read per round trip.")
+def export_command(output, batch_size: int | None) -> None:
+    """Write every category and post to OUTPUT (stdout by default)."""
+    count = 0
+    for record in export_records(batch_size or current_app.config.get("BULK_BATCH_SIZE", 500)):
+        output.write(ndjson_line(record))
+        count += 1
+    click.echo(f"Exported {count} records", err=True)
+
+
+@content_cli.command("import")
+@click.argument("source", type=click.File("rb"))
+@click.option("--batch-size", type=int, help="Records written per transaction.")
+@click.option("--update", "update_existing", is_flag=True, help="Overwrite posts whose slug already exists.")
+@click.option("--author-id", type=int, help="Author of imported posts that do not name an existing one.")
+def import_command(source, batch_size: int | None, update_existing: bool, author_id: int | None) -> None:
+    """Import an NDJSON file produced by 'content export'."""
+    author_id = author_id or default_author_id()
+    if author_id is None:
+        raise click.ClickException("No user exists to own the imported posts; pass --author-id")
+
+    importer = BulkImporter(
+        author_id, batch_size or current_app.config.get("BULK_BATCH_SIZE", 500), update_existing, current_app.config
+    )
+    for event in importer.run(source):
+        if "error" in event:
+            error = event["error"]
+            click.echo(f"line {error['line']} ({error['slug'] or '-'}): {json.dumps(error['message'])}", err=True)
+        elif "progress" in event:
+            progress = event["progress"]
+            click.echo(f"{progress['processed']} processed, {progress['imported']} imported, {progress['failed']} failed", err=True)
+        else:
+            summary = event["summary"]
+            click.echo(
+                f"Imported {summary['imported']} posts, updated {summary['updated']}, "
+                f"stored {summary['categories']} categories; {summary['failed']} records failed"
+            )
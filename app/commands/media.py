@@ -0,0 +1,38 @@
+from __future__ import annotations
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import MediaAsset, MediaDerivative
+
+media_cli = AppGroup("media", help="Maintain uploaded media.")
+
+
+@media_cli.command("derivatives")
+@click.option("--limit", type=int, default=None, help="Process at most this many images.")
+def derivatives_command(limit: int | None) -> None:
+    """Generate thumbnails and responsive widths for images that have none yet."""
+    pipeline = current_app.extensions["image_derivatives"]
+    if pipeline.mode == "off":
+        raise click.ClickException("Image derivatives are disabled (IMAGE_DERIVATIVE_MODE=off or Pillow is missing)")
+
+    renditions = select(MediaDerivative.media_id)
+    query = (
+        select(MediaAsset.id)
+        .where(
+            MediaAsset.kind == "IMAGE",
+            MediaAsset.status == "READY",
+            ~MediaAsset.derivatives.any(),
+            MediaAsset.id.not_in(renditions),
+        )
+        .order_by(MediaAsset.id)
+        .limit(limit)
+    )
+    media_ids = db.session.scalars(query).all()
+    # The command runs everything inline; the process pool only pays off for request-time uploads.
+    pipeline.mode = "sync"
+    generated = sum(pipeline.generate(media_id) for media_id in media_ids)
+    click.echo(f"Generated derivatives for {generated} of {len(media_ids)} images")
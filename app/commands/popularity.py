@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+import click
+from flask.cli import AppGroup
+
+from app.services.popularity import refresh_popularity
+
+popularity_cli = AppGroup("popularity", help="Maintain the post popularity rankings.")
+
+
+@popularity_cli.command("refresh")
+@click.option("--full", is_flag=True, help="Also rebuild all-time totals from the complete metrics history.")
+def refresh_command(full: bool) -> None:
+    """Recompute the 7/30/90-day view windows; the scheduler thread does this daily unless it is off."""
+    refresh_popularity(full=full)
+    click.echo("Popularity rankings refreshed")
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+from zoneinfo import ZoneInfo
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.services.scheduler import get_post_scheduler, publish_due_posts, upcoming_posts
+
+scheduler_cli = AppGroup("scheduler", help="Publish scheduled posts.")
+
+
+@scheduler_cli.command("publish")
+def publish_command() -> None:
+    """Publish every scheduled post that is due; a drop-in for the old cron scan."""
+    slugs = publish_due_posts(lock_key=get_post_scheduler().lock_key)
+    if slugs is None:
+        click.echo("Another worker is publishing; nothing done")
+    else:
+        click.echo(f"Published {len(slugs)} posts")
+
+
+@scheduler_cli.command("run")
+def run_command() -> None:
+    """Run the scheduler in the foreground, for deployments that set SCHEDULER_MODE=off."""
+    scheduler = get_post_scheduler()
+    click.echo("Scheduler running; press Ctrl+C to stop")
+    try:
+        scheduler.run()
+    except KeyboardInterrupt:
+        scheduler.shutdown()
+
+
+@scheduler_cli.command("upcoming")
+@click.option("--limit", default=20, show_default=True, help="Number of posts to list.")
+def upcoming_command(limit: int) -> None:
+    """List the next scheduled posts in SCHEDULER_TIMEZONE."""
+    zone = ZoneInfo(current_app.config.get("SCHEDULER_TIMEZONE") or "UTC")
+    for post_id, slug, due in upcoming_posts(limit):
+        click.echo(f"{due.astimezone(zone):%Y-%m-%d %H:%M %Z}  {post_id:>6}  {slug}")
@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.services.search import full_text_enabled, reindex_all
+
+search_cli = AppGroup("search", help="Manage the full-text search index.")
+
+
+@search_cli.command("reindex")
+@click.option("--batch-size", default=500, show_default=True, help="Posts indexed per transaction.")
+def reindex_command(batch_size: int) -> None:
+    """Rebuild search documents for every post."""
+    if not full_text_enabled():
+        raise click.ClickException("Full-text search requires a PostgreSQL database")
+
+    total = reindex_all(current_app.config, batch_size=batch_size)
+    click.echo(f"Reindexed {total} posts")
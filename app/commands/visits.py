@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.extensions import db
+from app.services.visit_partitions import (
+    apply_retention,
+    ensure_partitions,
+    migrate_to_partitioned,
+    partitioning_supported,
+    visit_is_partitioned,
+)
+
+visits_cli = AppGroup("visits", help="Manage visit storage: partitions, rollups and retention.")
+
+
+@visits_cli.command("partition")
+@click.option("--batch-size", default=10000, show_default=True, help="Rows moved per transaction.")
+def partition_command(batch_size: int) -> None:
+    """Convert the visit table to monthly partitions while the site keeps running (PostgreSQL)."""
+    if not partitioning_supported():
+        raise click.ClickException("Partitioning the visit table requires PostgreSQL")
+    moved = migrate_to_partitioned(current_app.config.get("VISIT_PARTITION_PREMAKE_MONTHS", 3), batch_size, click.echo)
+    click.echo(f"Visit table is partitioned; moved {moved} existing visits")
+
+
+@visits_cli.command("maintain")
+def maintain_command() -> None:
+    """Create upcoming partitions and apply the retention policy; run daily from cron."""
+    if visit_is_partitioned():
+        created = ensure_partitions(current_app.config.get("VISIT_PARTITION_PREMAKE_MONTHS", 3))
+        db.session.commit()
+        if created:
+            click.echo(f"Created partitions: {', '.join(created)}")
+
+    months = int(current_app.config.get("VISIT_RETENTION_MONTHS") or 0)
+    if months <= 0:
+        click.echo("Visit retention is disabled")
+        return
+    result = apply_retention(months)
+    click.echo(
+        f"Rolled up and removed visits before {result['cutoff']}: "
+        f"{len(result['dropped_partitions'])} partitions dropped, {result['deleted_visits']} rows deleted"
+    )
@@ -0,0 +1,19 @@
+from __future__ import annotations
+
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+
+from app.services.warmup import warm_up
+
+
+@click.command("warmup")
+@with_appcontext
+def warmup_command() -> None:
+    """Run the worker warmup once and print how long each step took."""
+    result = warm_up(current_app._get_current_object())
+    for name, elapsed in result["timings_ms"].items():
+        error = result["errors"].get(name)
+        click.echo(f"{name:<24} {elapsed:8.1f} ms" + (f"  failed: {error}" if error else ""))
+    if result["errors"]:
+        raise click.ClickException(f"{len(result['errors'])} warmup steps failed")
@@ -3,8 +3,10 @@ from __future__ import annotations
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 
+from app.services.replicas import RoutingSession
 
-db = SQLAlchemy()
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 
 __all__ = ["db", "migrate"]
@@ -1,16 +1,33 @@
 from .user import User, Profile
-from .media import MediaAsset
-from .blog import BlogPost, Chapter, PostMetricsDaily, Visit
-from .category import Category, PostCategory
+from .media import MediaAsset, MediaDerivative
+from .blog import (
+    BlogPost,
+    Chapter,
+    PostMetricsDaily,
+    PostPopularity,
+    PostSearchDocument,
+    Visit,
+    VisitAgentDaily,
+    VisitReferrerDaily,
+    VisitSessionDaily,
+)
+from .category import Category, CategoryClosure, PostCategory
 
 __all__ = [
     "User",
     "Profile",
     "MediaAsset",
+    "MediaDerivative",
     "BlogPost",
     "Chapter",
     "PostMetricsDaily",
+    "PostPopularity",
+    "PostSearchDocument",
     "Visit",
+    "VisitAgentDaily",
+    "VisitReferrerDaily",
+    "VisitSessionDaily",
     "Category",
+    "CategoryClosure",
     "PostCategory",
 ]
@@ -3,6 +3,7 @@ from __future__ import annotations
 from datetime import datetime, date
 
 from sqlalchemy import CheckConstraint, Enum, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import relationship
 
 from app.extensions import db
@@ -15,6 +16,9 @@ class BlogPost(db.Model):
         Index("blog_post_status_idx", "status"),
         Index("blog_post_published_at_idx", "published_at"),
         Index("blog_post_author_idx", "author_id"),
+        Index("blog_post_status_published_id_idx", "status", "published_at", "id"),
+        Index("blog_post_created_id_idx", "created_at", "id"),
+        Index("blog_post_status_scheduled_idx", "status", "scheduled_for"),
     )
 
     id = db.Column(db.Integer, primary_key=True)
@@ -39,7 +43,10 @@ class BlogPost(db.Model):
     chapters = relationship("Chapter", order_by="Chapter.position", cascade="all, delete-orphan", back_populates="post")
     categories = relationship("Category", secondary="post_category", back_populates="posts")
     metrics_daily = relationship("PostMetricsDaily", cascade="all, delete-orphan", back_populates="post")
-    visits = relationship("Visit", cascade="all, delete-orphan", back_populates="post")
+    visits = relationship("Visit", cascade="all, delete-orphan", passive_deletes=True, back_populates="post")
+    search_document = relationship(
+        "PostSearchDocument", uselist=False, cascade="all, delete-orphan", passive_deletes=True, back_populates="post"
+    )
 
 
 class Chapter(db.Model):
@@ -67,6 +74,12 @@ class Chapter(db.Model):
 
 
 class Visit(db.Model):
+    """One article read.
+
+    On PostgreSQL the table can be range-partitioned by month on ``visited_at``
+    (``flask visits partition``); its primary key is then ``(id, visited_at)``.
+    """
+
     __tablename__ = "visit"
     __table_args__ = (Index("visit_post_time_idx", "post_id", "visited_at"),)
 
@@ -94,5 +107,68 @@ class PostMetricsDaily(db.Model):
     post = relationship("BlogPost", back_populates="metrics_daily")
 
 
+class PostPopularity(db.Model):
+    """Rolling view totals per post, kept current by the visit writer and a daily refresh."""
+
+    __tablename__ = "post_popularity"
+    __table_args__ = (
+        Index("post_popularity_7d_idx", "views_7d"),
+        Index("post_popularity_30d_idx", "views_30d"),
+        Index("post_popularity_90d_idx", "views_90d"),
+        Index("post_popularity_total_idx", "views_total"),
+    )
+
+    post_id = db.Column(db.Integer, ForeignKey("blog_post.id", ondelete="CASCADE"), primary_key=True)
+    views_7d = db.Column(db.Integer, default=0, nullable=False)
+    views_30d = db.Column(db.Integer, default=0, nullable=False)
+    views_90d = db.Column(db.Integer, default=0, nullable=False)
+    views_total = db.Column(db.BigInteger, default=0, nullable=False)
+    refreshed_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+
+class VisitSessionDaily(db.Model):
+    """One row per session that viewed a post on a given day; backs ``unique_sessions``."""
+
+    __tablename__ = "visit_session_daily"
+
+    post_id = db.Column(db.Integer, ForeignKey("blog_post.id", ondelete="CASCADE"), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    session_id = db.Column(db.String(255), primary_key=True)
+
+
+class VisitReferrerDaily(db.Model):
+    """Visits per referring host, rolled up from ``visit`` before old rows are dropped."""
+
+    __tablename__ = "visit_referrer_daily"
+
+    post_id = db.Column(db.Integer, ForeignKey("blog_post.id", ondelete="CASCADE"), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    referrer_host = db.Column(db.String(255), primary_key=True)
+    visits = db.Column(db.Integer, default=0, nullable=False)
+
+
+class VisitAgentDaily(db.Model):
+    """Visits per user agent family, rolled up from ``visit`` before old rows are dropped."""
+
+    __tablename__ = "visit_agent_daily"
+
+    post_id = db.Column(db.Integer, ForeignKey("blog_post.id", ondelete="CASCADE"), primary_key=True)
+    date = db.Column(db.Date, primary_key=True)
+    agent_family = db.Column(db.String(32), primary_key=True)
+    visits = db.Column(db.Integer, default=0, nullable=False)
+
+
+class PostSearchDocument(db.Model):
+    __tablename__ = "post_search_document"
+    __table_args__ = (Index("post_search_document_idx", "document", postgresql_using="gin"),)
+
+    post_id = db.Column(db.Integer, ForeignKey("blog_post.id", ondelete="CASCADE"), primary_key=True)
+    config = db.Column(db.String(64), nullable=False)
+    document = db.Column(db.Text().with_variant(TSVECTOR(), "postgresql"), nullable=False)
+    updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    post = relationship("BlogPost", back_populates="search_document")
+
+
 from .media import MediaAsset  # noqa: E402
 from .user import User  # noqa: E402
@@ -23,6 +23,17 @@ class Category(db.Model):
     posts = relationship("BlogPost", secondary="post_category", back_populates="categories")
 
 
+class CategoryClosure(db.Model):
+    """Every ancestor/descendant pair of the category tree, including each category with itself at depth 0."""
+
+    __tablename__ = "category_closure"
+    __table_args__ = (Index("category_closure_descendant_idx", "descendant_id", "ancestor_id"),)
+
+    ancestor_id = db.Column(db.Integer, ForeignKey("category.id", ondelete="CASCADE"), primary_key=True)
+    descendant_id = db.Column(db.Integer, ForeignKey("category.id", ondelete="CASCADE"), primary_key=True)
+    depth = db.Column(db.Integer, nullable=False)
+
+
 class PostCategory(db.Model):
     __tablename__ = "post_category"
     __table_args__ = (
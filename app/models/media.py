@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from datetime import datetime
 
-from sqlalchemy import Enum, ForeignKey
+from sqlalchemy import Enum, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from app.extensions import db
@@ -10,12 +10,18 @@ from app.extensions import db
 
 class MediaAsset(db.Model):
     __tablename__ = "media_asset"
+    __table_args__ = (db.Index("media_asset_checksum_bytes_idx", "checksum", "bytes"),)
 
     id = db.Column(db.Integer, primary_key=True)
     uploader_id = db.Column(db.Integer, ForeignKey("user.id", ondelete="SET NULL"))
     kind = db.Column(Enum("IMAGE", "VIDEO", "FILE", name="media_kind"), nullable=False)
-    storage_provider = db.Column(Enum("DB", "GDRIVE", "EXTERNAL", name="storage_provider"), nullable=False)
+    storage_provider = db.Column(Enum("DB", "GDRIVE", "EXTERNAL", "LOCAL", name="storage_provider"), nullable=False)
     storage_path = db.Column(db.Text, nullable=False)
+    # PENDING assets are still being pushed to storage; their storage_path is the spool file name.
+    status = db.Column(
+        Enum("PENDING", "READY", "FAILED", name="media_status"), nullable=False, default="READY", server_default="READY"
+    )
+    upload_error = db.Column(db.Text)
     mime_type = db.Column(db.String(255))
     bytes = db.Column(db.Integer)
     checksum = db.Column(db.String(255))
@@ -28,6 +34,32 @@ class MediaAsset(db.Model):
 
     uploader = relationship("User", backref="uploaded_media", foreign_keys=[uploader_id])
     thumbnail = relationship("MediaAsset", remote_side=[id])
+    derivatives = relationship(
+        "MediaDerivative",
+        foreign_keys="MediaDerivative.source_media_id",
+        order_by="MediaDerivative.width",
+        cascade="all, delete-orphan",
+        passive_deletes=True,
+        back_populates="source",
+    )
+
+
+class MediaDerivative(db.Model):
+    """A resized rendition of an image, itself stored as a :class:`MediaAsset`."""
+
+    __tablename__ = "media_derivative"
+    __table_args__ = (UniqueConstraint("source_media_id", "variant", name="uq_media_derivative_variant"),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    source_media_id = db.Column(db.Integer, ForeignKey("media_asset.id", ondelete="CASCADE"), nullable=False)
+    media_id = db.Column(db.Integer, ForeignKey("media_asset.id", ondelete="CASCADE"), nullable=False, index=True)
+    variant = db.Column(db.String(32), nullable=False)
+    width = db.Column(db.Integer, nullable=False)
+    height = db.Column(db.Integer, nullable=False)
+    created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, nullable=False)
+
+    source = relationship("MediaAsset", foreign_keys=[source_media_id], back_populates="derivatives")
+    media = relationship("MediaAsset", foreign_keys=[media_id])
 
 
 from .user import User  # noqa: E402
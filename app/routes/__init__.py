@@ -3,11 +3,13 @@ from __future__ import annotations
 from flask import Blueprint, Flask
 
 from .admin import admin_bp
+from .media import media_bp
 from .public import public_bp
 
 
 def register_blueprints(app: Flask) -> None:
     app.register_blueprint(public_bp, url_prefix="/api")
+    app.register_blueprint(media_bp, url_prefix="/api")
     app.register_blueprint(admin_bp, url_prefix="/api/admin")
 
 
@@ -1,28 +1,62 @@
 from __future__ import annotations
 
+import mimetypes
 from datetime import datetime, timedelta, timezone
 
 import jwt
-from flask import Blueprint, current_app, g, jsonify, request
+from flask import Blueprint, Response, current_app, g, jsonify, request, stream_with_context, url_for
 from jwt import InvalidTokenError
 from sqlalchemy import select
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from app.extensions import db
 from app.models import BlogPost, Category, Chapter, MediaAsset, User
-from app.schemas import BlogPostSchema, CategorySchema, MediaAssetSchema
-from app.services.storage import StorageError, get_storage_backend
+from app.schemas import BlogPostSchema, CategorySchema, ChapterSchema, MediaAssetSchema
+from app.schemas.blog import CHAPTER_TYPES
+from app.services.bulk import BulkImporter, export_records, ndjson_line
+from app.services.cache import get_response_cache, post_tag
+from app.services.categories import add_to_tree, creates_cycle, move_in_tree, remove_from_tree
+from app.services.images import get_derivative_pipeline
+from app.services.media import (
+    delete_stored_objects,
+    duplicate_groups,
+    find_duplicate,
+    merge_duplicates,
+    posts_referencing,
+)
+from app.services.media_cache import get_media_cache
+from app.services.projections import parse_fields, project_posts
+from app.services.replicas import get_replica_router, remember_writes
+from app.services.scheduler import get_post_scheduler
+from app.services.search import index_posts
+from app.services.storage import StorageError, get_storage_backend, hash_stream
+from app.services.uploads import UploadQueueFull, get_upload_pipeline
+from app.utils.loading import post_detail_options, post_list_options
+from app.utils.pagination import (
+    decode_cursor,
+    descending_keyset,
+    encode_cursor,
+    parse_datetime_value,
+    parse_limit,
+)
 
 admin_bp = Blueprint("admin", __name__)
+admin_bp.after_request(remember_writes)
 
 
 blog_post_schema = BlogPostSchema()
+chapter_schema = ChapterSchema()
 blog_post_list_schema = BlogPostSchema(many=True)
 category_schema = CategorySchema()
 category_list_schema = CategorySchema(many=True)
 media_schema = MediaAssetSchema()
 
 
+CHAPTER_FIELDS = ("position", "type", "title", "text_content", "media_id", "external_video_url", "caption", "alt_text")
+# Dumped chapters may be sent back as they are; these fields are ignored on write.
+CHAPTER_READ_ONLY_FIELDS = ("id", "post_id", "created_at", "updated_at")
+
+
 def require_admin_jwt() -> dict:
     from flask import abort
 
@@ -159,20 +193,17 @@ def login_admin():
 @admin_bp.post("/posts")
 def create_post():
     payload = request.get_json() or {}
-    post = blog_post_schema.load(payload)
+    post = blog_post_schema.load(_without_chapters(payload))
     post.author_id = payload.get("author_id") or _ensure_default_admin_user().id
 
     chapters_payload = payload.get("chapters", [])
     if chapters_payload and not isinstance(chapters_payload, list):
         return jsonify({"message": "chapters must be a list"}), 400
-    post.chapters = []
-    for idx, chapter_data in enumerate(chapters_payload):
-        if not isinstance(chapter_data, dict):
-            return jsonify({"message": "chapters must contain objects"}), 400
-        try:
-            post.chapters.append(_build_chapter(chapter_data, idx))
-        except ValueError as exc:
-            return jsonify({"message": str(exc)}), 400
+    try:
+        _check_chapter_media(chapters_payload)
+        post.chapters = [_build_chapter(chapter_data, idx) for idx, chapter_data in enumerate(chapters_payload)]
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
 
     category_ids = payload.get("category_ids", [])
     if category_ids and not isinstance(category_ids, list):
@@ -186,32 +217,35 @@ def create_post():
 
     db.session.add(post)
     _apply_categories(post, category_ids)
+    db.session.flush()
+    index_posts([post.id], current_app.config)
     db.session.commit()
+    get_response_cache().invalidate("posts", post_tag(post.slug))
+    if post.status == "SCHEDULED":
+        get_post_scheduler().notify(post.id, post.scheduled_for)
 
     return jsonify(blog_post_schema.dump(post)), 201
 
 
 @admin_bp.put("/posts/<int:post_id>")
 def update_post(post_id: int):
-    post = db.session.get(BlogPost, post_id)
+    post = db.session.get(BlogPost, post_id, options=post_detail_options())
     if not post:
         return jsonify({"message": "Not found"}), 404
 
     payload = request.get_json() or {}
-    post = blog_post_schema.load(payload, instance=post, partial=True)
+    previous_slug = post.slug
+    post = blog_post_schema.load(_without_chapters(payload), instance=post, partial=True)
 
     if "chapters" in payload:
         chapters_payload = payload["chapters"]
         if chapters_payload and not isinstance(chapters_payload, list):
             return jsonify({"message": "chapters must be a list"}), 400
-        post.chapters.clear()
-        for idx, chapter_data in enumerate(chapters_payload):
-            if not isinstance(chapter_data, dict):
-                return jsonify({"message": "chapters must contain objects"}), 400
-            try:
-                post.chapters.append(_build_chapter(chapter_data, idx))
-            except ValueError as exc:
-                return jsonify({"message": str(exc)}), 400
+        try:
+            _reconcile_chapters(post, chapters_payload or [])
+        except ValueError as exc:
+            db.session.rollback()
+            return jsonify({"message": str(exc)}), 400
 
     if "category_ids" in payload:
         category_ids = payload["category_ids"]
@@ -225,33 +259,135 @@ def update_post(post_id: int):
         db.session.rollback()
         return jsonify({"message": str(exc)}), 400
 
+    db.session.flush()
+    index_posts([post.id], current_app.config)
     db.session.commit()
+    get_response_cache().invalidate("posts", post_tag(previous_slug), post_tag(post.slug))
+    if post.status == "SCHEDULED":
+        get_post_scheduler().notify(post.id, post.scheduled_for)
     return jsonify(blog_post_schema.dump(post))
 
 
+@admin_bp.patch("/posts/<int:post_id>/chapters/<int:chapter_id>")
+def update_chapter(post_id: int, chapter_id: int):
+    chapter = db.session.scalar(select(Chapter).where(Chapter.id == chapter_id, Chapter.post_id == post_id))
+    if not chapter:
+        return jsonify({"message": "Not found"}), 404
+
+    try:
+        values = _chapter_values(request.get_json() or {})
+        _check_chapter_media([values])
+        for name, value in values.items():
+            setattr(chapter, name, value)
+        _check_chapter(chapter)
+    except ValueError as exc:
+        db.session.rollback()
+        return jsonify({"message": str(exc)}), 400
+
+    db.session.flush()
+    index_posts([post_id], current_app.config)
+    db.session.commit()
+    slug = db.session.scalar(select(BlogPost.slug).where(BlogPost.id == post_id))
+    get_response_cache().invalidate("posts", post_tag(slug))
+    return jsonify(chapter_schema.dump(chapter))
+
+
 @admin_bp.delete("/posts/<int:post_id>")
 def delete_post(post_id: int):
     post = db.session.get(BlogPost, post_id)
     if not post:
         return jsonify({"message": "Not found"}), 404
 
+    slug = post.slug
     db.session.delete(post)
     db.session.commit()
+    get_response_cache().invalidate("posts", post_tag(slug))
     return "", 204
 
 
 @admin_bp.get("/posts")
 def list_posts():
-    posts = db.session.scalars(select(BlogPost).order_by(BlogPost.created_at.desc())).all()
-    return jsonify(blog_post_list_schema.dump(posts))
+    try:
+        limit = parse_limit(
+            request.args.get("limit"),
+            current_app.config.get("POST_PAGE_SIZE", 20),
+            current_app.config.get("POST_PAGE_MAX_SIZE", 100),
+        )
+        fields = parse_fields(request.args.get("fields"), request.args.get("view"), "full")
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    query = select(BlogPost)
+
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            created_at, post_id = decode_cursor(cursor, 2)
+            query = query.where(
+                descending_keyset(BlogPost.created_at, BlogPost.id, parse_datetime_value(created_at), int(post_id))
+            )
+        except (TypeError, ValueError):
+            return jsonify({"message": "Invalid cursor"}), 400
+
+    query = query.order_by(BlogPost.created_at.desc(), BlogPost.id.desc()).limit(limit + 1)
+
+    if fields is not None:
+        items, extras = project_posts(query, fields, [BlogPost.created_at])
+    else:
+        posts = db.session.scalars(query.options(*post_list_options())).all()
+        items = blog_post_list_schema.dump(posts)
+        extras = [(post.created_at,) for post in posts]
+
+    next_cursor = None
+    if len(items) > limit:
+        items, extras = items[:limit], extras[:limit]
+        next_cursor = encode_cursor(extras[-1][0], items[-1]["id"])
+
+    return jsonify({"items": items, "next_cursor": next_cursor})
+
+
+@admin_bp.get("/content/export")
+def export_content():
+    try:
+        batch_size = _bulk_batch_size()
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    lines = (ndjson_line(record) for record in export_records(batch_size))
+    return Response(
+        stream_with_context(lines),
+        mimetype="application/x-ndjson",
+        headers={"Content-Disposition": "attachment; filename=content.ndjson"},
+    )
+
+
+@admin_bp.post("/content/import")
+def import_content():
+    try:
+        batch_size = _bulk_batch_size()
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    update_existing = request.args.get("update", "").lower() in ("1", "true", "yes")
+    importer = BulkImporter(_ensure_default_admin_user().id, batch_size, update_existing, current_app.config)
+    # Progress is streamed back while the request body is still being read.
+    events = (ndjson_line(event) for event in importer.run(request.stream))
+    return Response(stream_with_context(events), mimetype="application/x-ndjson")
 
 
 @admin_bp.post("/categories")
 def create_category():
     payload = request.get_json() or {}
     category = category_schema.load(payload)
+    try:
+        _check_category_parent(category)
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
     db.session.add(category)
+    db.session.flush()
+    add_to_tree(category.id, category.parent_id)
     db.session.commit()
+    get_response_cache().invalidate("categories")
     return jsonify(category_schema.dump(category)), 201
 
 
@@ -262,8 +398,17 @@ def update_category(category_id: int):
         return jsonify({"message": "Not found"}), 404
 
     payload = request.get_json() or {}
+    previous_parent_id = category.parent_id
     category = category_schema.load(payload, instance=category, partial=True)
+    if category.parent_id != previous_parent_id:
+        try:
+            _check_category_parent(category)
+        except ValueError as exc:
+            db.session.rollback()
+            return jsonify({"message": str(exc)}), 400
+        move_in_tree(category.id, category.parent_id)
     db.session.commit()
+    get_response_cache().invalidate("categories")
     return jsonify(category_schema.dump(category))
 
 
@@ -273,8 +418,11 @@ def delete_category(category_id: int):
     if not category:
         return jsonify({"message": "Not found"}), 404
 
+    # Its children become roots, as the foreign key sets their parent_id to NULL.
+    remove_from_tree(category.id)
     db.session.delete(category)
     db.session.commit()
+    get_response_cache().invalidate("categories")
     return "", 204
 
 
@@ -284,6 +432,21 @@ def list_categories():
     return jsonify(category_list_schema.dump(categories))
 
 
+@admin_bp.get("/stats")
+def get_stats():
+    return jsonify(
+        {
+            "visit_buffer": current_app.extensions["visit_buffer"].stats(),
+            "response_cache": get_response_cache().stats(),
+            "media_cache": get_media_cache().stats() if get_media_cache() else None,
+            "upload_pipeline": get_upload_pipeline().stats(),
+            "image_derivatives": get_derivative_pipeline().stats(),
+            "scheduler": get_post_scheduler().stats(),
+            "read_replicas": get_replica_router().stats(),
+        }
+    )
+
+
 @admin_bp.post("/media")
 def upload_media():
     if "file" not in request.files:
@@ -295,12 +458,6 @@ def upload_media():
     if kind not in {"IMAGE", "VIDEO", "FILE"}:
         return jsonify({"message": "Invalid media kind"}), 400
 
-    storage = get_storage_backend(current_app.config)
-    try:
-        storage_obj = storage.upload(file.stream, filename, file.mimetype)
-    except StorageError as exc:  # pragma: no cover - requires external service
-        return jsonify({"message": str(exc)}), 500
-
     uploader_id = request.form.get("uploader_id")
     if uploader_id:
         try:
@@ -308,6 +465,26 @@ def upload_media():
         except ValueError:
             return jsonify({"message": "uploader_id must be an integer"}), 400
 
+    # Identical content was uploaded before: reuse that asset instead of storing another copy.
+    size, checksum = hash_stream(file.stream)
+    existing = find_duplicate(checksum, size)
+    if existing is not None:
+        return jsonify(media_schema.dump(existing)), 200
+
+    try:
+        storage = get_storage_backend(current_app.config)
+    except StorageError as exc:  # pragma: no cover - requires external service
+        return jsonify({"message": str(exc)}), 500
+
+    pipeline = get_upload_pipeline()
+    if pipeline.asynchronous:
+        return _queue_media_upload(pipeline, storage.provider, file, filename, kind, uploader_id, size, checksum)
+
+    try:
+        storage_obj = storage.upload(file.stream, filename, file.mimetype)
+    except StorageError as exc:  # pragma: no cover - requires external service
+        return jsonify({"message": str(exc)}), 500
+
     media = MediaAsset(
         uploader_id=uploader_id,
         kind=kind,
@@ -320,10 +497,83 @@ def upload_media():
 
     db.session.add(media)
     db.session.commit()
+    if kind == "IMAGE":
+        get_derivative_pipeline().schedule(media.id)
 
     return jsonify(media_schema.dump(media)), 201
 
 
+@admin_bp.get("/media/<int:media_id>/status")
+def get_media_status(media_id: int):
+    media = db.session.get(MediaAsset, media_id)
+    if not media:
+        return jsonify({"message": "Not found"}), 404
+    return jsonify(media_schema.dump(media))
+
+
+def _queue_media_upload(pipeline, provider: str, file, filename: str, kind: str, uploader_id, size: int, checksum: str):
+    """Spool the upload, record a ``PENDING`` asset and let the pipeline push it to storage."""
+    spool_name = pipeline.spool(file.stream, filename)
+    media = MediaAsset(
+        uploader_id=uploader_id,
+        kind=kind,
+        status="PENDING",
+        storage_provider=provider,
+        storage_path=spool_name,
+        mime_type=file.mimetype or mimetypes.guess_type(filename)[0],
+        bytes=size,
+        checksum=checksum,
+    )
+    db.session.add(media)
+    db.session.commit()
+
+    try:
+        pipeline.submit(media.id)
+    except UploadQueueFull as exc:
+        db.session.delete(media)
+        db.session.commit()
+        pipeline.discard(spool_name)
+        return jsonify({"message": str(exc)}), 503
+
+    response = jsonify(media_schema.dump(media))
+    response.status_code = 202
+    response.headers["Location"] = url_for("admin.get_media_status", media_id=media.id)
+    return response
+
+
+@admin_bp.get("/media/duplicates")
+def list_media_duplicates():
+    try:
+        limit = parse_limit(request.args.get("limit"), 100, 1000)
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+    return jsonify(duplicate_groups(limit=limit))
+
+
+@admin_bp.post("/media/duplicates/merge")
+def merge_media_duplicates():
+    data = request.get_json(silent=True) or {}
+    checksums = data.get("checksums")
+    if checksums is not None and (
+        not isinstance(checksums, list) or not all(isinstance(value, str) for value in checksums)
+    ):
+        return jsonify({"message": "checksums must be a list of strings"}), 400
+
+    groups = duplicate_groups(checksums)
+    if data.get("dry_run"):
+        return jsonify({"groups": groups, "removed_media_ids": [], "removed_rendition_ids": []})
+
+    affected_slugs = posts_referencing([media_id for group in groups for media_id in group["duplicate_ids"]])
+    result = merge_duplicates(groups)
+    db.session.commit()
+    # Only after the commit: a rolled back merge must still find its files.
+    delete_stored_objects(result.pop("orphaned_objects"))
+    if affected_slugs:
+        # Posts embed hero and chapter media ids.
+        get_response_cache().invalidate("posts", *(post_tag(slug) for slug in affected_slugs))
+    return jsonify({"groups": groups, **result})
+
+
 def _apply_categories(post: BlogPost, category_ids: list[int]) -> None:
     if not category_ids:
         post.categories.clear()
@@ -333,6 +583,13 @@ def _apply_categories(post: BlogPost, category_ids: list[int]) -> None:
     post.categories = categories
 
 
+def _bulk_batch_size() -> int:
+    try:
+        return parse_limit(request.args.get("batch_size"), current_app.config.get("BULK_BATCH_SIZE", 500), 5000)
+    except ValueError as exc:
+        raise ValueError("batch_size must be a positive integer") from exc
+
+
 def _ensure_default_admin_user() -> User:
     admin = db.session.scalar(select(User).limit(1))
     if admin:
@@ -355,20 +612,107 @@ def _apply_post_status(post: BlogPost) -> None:
         raise ValueError("Scheduled posts must include 'scheduled_for'")
 
 
+def _without_chapters(payload: dict) -> dict:
+    # Chapters are applied by the route; loading them through the schema would build throwaway instances.
+    return {key: value for key, value in payload.items() if key != "chapters"}
+
+
 def _build_chapter(chapter_data: dict, fallback_position: int) -> Chapter:
-    data = dict(chapter_data)
-    data.pop("id", None)
-    position = data.pop("position", fallback_position)
-    media_id = data.get("media_id")
-    if media_id is not None:
-        media = db.session.get(MediaAsset, media_id)
-        if not media:
-            raise ValueError(f"media_id {media_id} does not exist")
-    chapter = Chapter(**data)
-    chapter.position = position
+    values = _chapter_values(chapter_data)
+    values.setdefault("position", fallback_position)
+    chapter = Chapter(**values)
+    _check_chapter(chapter)
     return chapter
 
 
+def _reconcile_chapters(post: BlogPost, chapters_payload: list) -> None:
+    """Make ``post.chapters`` match the payload while touching only the rows that changed.
+
+    Entries with an ``id`` update that chapter in place (fields they omit are
+    kept), entries without one are inserted, and chapters missing from the
+    payload are deleted. Reordering only rewrites ``position``.
+    """
+    _check_chapter_media(chapters_payload)
+    existing = {chapter.id: chapter for chapter in post.chapters}
+    chapters = []
+    for idx, chapter_data in enumerate(chapters_payload):
+        chapter_id = chapter_data.get("id") if isinstance(chapter_data, dict) else None
+        if chapter_id is None:
+            chapters.append(_build_chapter(chapter_data, idx))
+            continue
+
+        chapter_id = _chapter_id(chapter_id)
+        chapter = existing.pop(chapter_id, None)
+        if chapter is None:
+            raise ValueError(f"Chapter {chapter_id} does not belong to this post or is listed twice")
+        values = _chapter_values(chapter_data)
+        values.setdefault("position", idx)
+        for name, value in values.items():
+            if getattr(chapter, name) != value:
+                setattr(chapter, name, value)
+        _check_chapter(chapter)
+        chapters.append(chapter)
+
+    # Assigning the collection diffs it: chapters left in ``existing`` are deleted as orphans.
+    post.chapters = chapters
+
+
+def _chapter_id(value) -> int:
+    # JSON clients (and form-driven editors) often send ids as strings; "7" must match chapter 7.
+    try:
+        if isinstance(value, (bool, float)):
+            raise TypeError
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Chapter id must be an integer, got {value!r}") from None
+
+
+def _chapter_values(chapter_data) -> dict:
+    if not isinstance(chapter_data, dict):
+        raise ValueError("chapters must contain objects")
+    unknown = set(chapter_data) - set(CHAPTER_FIELDS) - set(CHAPTER_READ_ONLY_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown chapter fields: {', '.join(sorted(unknown))}")
+    values = {name: chapter_data[name] for name in CHAPTER_FIELDS if name in chapter_data}
+    if "position" in values and not isinstance(values["position"], int):
+        raise ValueError("position must be an integer")
+    media_id = values.get("media_id")
+    if media_id is not None and (not isinstance(media_id, int) or isinstance(media_id, bool)):
+        raise ValueError("media_id must be an integer")
+    return values
+
+
+def _check_category_parent(category: Category) -> None:
+    if category.parent_id is None:
+        return
+    if db.session.get(Category, category.parent_id) is None:
+        raise ValueError(f"Parent category {category.parent_id} does not exist")
+    if category.id is not None and creates_cycle(category.id, category.parent_id):
+        raise ValueError("A category cannot be moved under itself or one of its subcategories")
+
+
+def _check_chapter(chapter: Chapter) -> None:
+    if chapter.type not in CHAPTER_TYPES:
+        raise ValueError(f"Chapter type must be one of {', '.join(CHAPTER_TYPES)}")
+    if chapter.type == "TEXT" and chapter.text_content is None:
+        raise ValueError("TEXT chapters need text_content")
+
+
+def _check_chapter_media(chapters_payload: list) -> None:
+    """Validate every referenced ``media_id`` with a single query."""
+    media_ids = {
+        chapter["media_id"]
+        for chapter in chapters_payload
+        if isinstance(chapter, dict) and isinstance(chapter.get("media_id"), int)
+    }
+    if not media_ids:
+        return
+    found = set(db.session.scalars(select(MediaAsset.id).where(MediaAsset.id.in_(media_ids))))
+    missing = sorted(media_ids - found)
+    if missing:
+        raise ValueError(f"media_id {', '.join(map(str, missing))} does not exist")
+
+
 def _generate_admin_jwt(user: User) -> str:
     secret = current_app.config.get("ADMIN_JWT_SECRET")
     if not secret:
@@ -0,0 +1,115 @@
+from __future__ import annotations
+
+import logging
+import secrets
+from pathlib import Path
+
+from flask import Blueprint, Response, current_app, jsonify, redirect, request, send_file
+
+from app.extensions import db
+from app.models import MediaAsset
+from app.services.media import media_file_path
+from app.services.storage import StorageError
+from app.utils.http_cache import apply_validators, as_utc, is_not_modified, not_modified_response
+
+logger = logging.getLogger(__name__)
+
+media_bp = Blueprint("media", __name__)
+
+# Requests asking for more ranges than this get the whole file instead.
+MAX_RANGES = 16
+_READ_SIZE = 64 * 1024
+
+
+@media_bp.get("/media/<int:media_id>")
+def get_media(media_id: int):
+    asset = db.session.get(MediaAsset, media_id)
+    if asset is None:
+        return jsonify({"message": "Not found"}), 404
+    if asset.status != "READY":
+        return jsonify({"message": f"Media is {asset.status.lower()}", "status": asset.status}), 409
+
+    try:
+        path = media_file_path(asset)
+    except StorageError as exc:
+        logger.warning("Media %s could not be fetched: %s", media_id, exc)
+        return jsonify({"message": "Media is temporarily unavailable"}), 502
+
+    if path is None:
+        if asset.storage_path.startswith(("http://", "https://")):
+            return redirect(asset.storage_path)
+        return jsonify({"message": "Not found"}), 404
+
+    etag = asset.checksum or f"{asset.id}-{asset.bytes}"
+    last_modified = as_utc(asset.updated_at)
+    cache_control = current_app.config.get("MEDIA_CACHE_CONTROL", "public, max-age=31536000, immutable")
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified, cache_control)
+
+    mime_type = asset.mime_type or "application/octet-stream"
+    response = _multi_range_response(path, mime_type, etag)
+    if response is None:
+        # Full and single-range responses go through the WSGI file wrapper (sendfile) or X-Sendfile.
+        response = send_file(path, mimetype=mime_type, conditional=True, etag=etag, last_modified=last_modified)
+    return apply_validators(response, etag, last_modified, cache_control)
+
+
+def _multi_range_response(path: Path, mime_type: str, etag: str) -> Response | None:
+    """``multipart/byteranges`` response for requests with several ranges; ``None`` otherwise.
+
+    Werkzeug only serves single ranges, so those (and plain requests) are left to
+    ``send_file``.
+    """
+    requested = request.range
+    if requested is None or requested.units != "bytes" or not 1 < len(requested.ranges) <= MAX_RANGES:
+        return None
+    if_range = request.if_range
+    if if_range.etag is not None and if_range.etag != etag:
+        return None
+    if if_range.date is not None:
+        return None
+
+    size = path.stat().st_size
+    ranges = []
+    for start, end in requested.ranges:
+        if end is None:
+            start, end = (max(size + start, 0), size) if start < 0 else (start, size)
+        end = min(end, size)
+        if start < end:
+            ranges.append((start, end))
+    if not ranges:
+        response = Response(status=416)
+        response.headers["Content-Range"] = f"bytes */{size}"
+        return response
+
+    boundary = secrets.token_hex(16)
+    headers = [
+        (f"--{boundary}\r\nContent-Type: {mime_type}\r\nContent-Range: bytes {start}-{end - 1}/{size}\r\n\r\n").encode()
+        for start, end in ranges
+    ]
+    closing = f"\r\n--{boundary}--\r\n".encode()
+    length = sum(len(header) + end - start + 2 for header, (start, end) in zip(headers, ranges)) - 2 + len(closing)
+
+    def generate():
+        with open(path, "rb") as file_handle:
+            for index, (header, (start, end)) in enumerate(zip(headers, ranges)):
+                yield (b"\r\n" if index else b"") + header
+                file_handle.seek(start)
+                remaining = end - start
+                while remaining > 0:
+                    chunk = file_handle.read(min(_READ_SIZE, remaining))
+                    if not chunk:
+                        return
+                    remaining -= len(chunk)
+                    yield chunk
+        yield closing
+
+    response = Response(
+        generate(), status=206, mimetype=f"multipart/byteranges; boundary={boundary}", direct_passthrough=True
+    )
+    response.content_length = length
+    response.accept_ranges = "bytes"
+    return response
+
+
+__all__ = ["media_bp"]
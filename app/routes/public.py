@@ -1,19 +1,43 @@
 from __future__ import annotations
 
+from contextlib import nullcontext
 from datetime import datetime
 
 from flask import Blueprint, current_app, jsonify, request
 from sqlalchemy import func, select
 
 from app.extensions import db
-from app.models import BlogPost, Category, PostMetricsDaily, Visit
+from app.models import BlogPost, Category, Chapter, MediaAsset, PostCategory, PostPopularity
 from app.schemas import BlogPostSchema, CategorySchema
+from app.schemas.fast import compile_schema
+from app.services.cache import get_response_cache, post_tag, request_cache_key
+from app.services.categories import build_tree, category_tree_rows, in_category_tree
+from app.services.metrics import increment_post_metric
+from app.services.popularity import popularity_column
+from app.services.projections import parse_fields, project_posts
+from app.services.replicas import route_public_reads, use_primary
+from app.services.search import apply_search, headlines
+from app.services.visits import VisitEvent, record_visit
+from app.utils.http_cache import apply_validators, fingerprint_etag, is_not_modified, not_modified_response
+from app.utils.loading import post_detail_options, post_list_options
+from app.utils.pagination import (
+    decode_cursor,
+    descending_keyset,
+    encode_cursor,
+    parse_datetime_value,
+    parse_limit,
+)
 
 public_bp = Blueprint("public", __name__)
+public_bp.before_request(route_public_reads)
 
-blog_post_schema = BlogPostSchema()
-blog_post_list_schema = BlogPostSchema(many=True)
-category_list_schema = CategorySchema(many=True)
+# Hot read paths dump through compiled serializers; marshmallow stays the source of truth.
+blog_post_schema = compile_schema(BlogPostSchema())
+blog_post_list_schema = compile_schema(BlogPostSchema(many=True))
+category_list_schema = compile_schema(CategorySchema(many=True))
+
+# Post list payloads embed category slugs, so category writes invalidate them too.
+LIST_CACHE_TAGS = ("posts", "categories")
 
 
 @public_bp.get("/posts")
@@ -22,15 +46,12 @@ def list_posts():
 
     category_slug = request.args.get("category")
     if category_slug:
-        query = query.join(BlogPost.categories).where(Category.slug == category_slug)
+        query = query.where(in_category_tree(category_slug))
 
     search = request.args.get("search")
+    rank = None
     if search:
-        ilike = f"%{search.lower()}%"
-        summary_expr = func.coalesce(BlogPost.summary, "")
-        query = query.where(
-            func.lower(BlogPost.title).like(ilike) | func.lower(summary_expr).like(ilike)
-        )
+        query, rank = apply_search(query, search, current_app.config)
 
     published_before = request.args.get("published_before")
     if published_before:
@@ -48,112 +69,283 @@ def list_posts():
         except ValueError:
             return jsonify({"message": "Invalid published_after"}), 400
 
-    query = query.order_by(BlogPost.published_at.desc().nullslast())
+    try:
+        limit = parse_limit(
+            request.args.get("limit"),
+            current_app.config.get("POST_PAGE_SIZE", 20),
+            current_app.config.get("POST_PAGE_MAX_SIZE", 100),
+        )
+        fields = _requested_fields("summary")
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    # Ranked searches page on (rank, id); everything else on (published_at, id).
+    sort_column = rank if rank is not None else BlogPost.published_at
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            sort_value, post_id = decode_cursor(cursor, 2)
+            sort_value = float(sort_value) if rank is not None else parse_datetime_value(sort_value)
+            query = query.where(descending_keyset(sort_column, BlogPost.id, sort_value, int(post_id)))
+        except (TypeError, ValueError):
+            return jsonify({"message": "Invalid cursor"}), 400
+
+    query = query.order_by(sort_column.desc().nullslast(), BlogPost.id.desc()).limit(limit + 1)
+
+    cache_control = current_app.config.get("HTTP_CACHE_CONTROL", "public, no-cache")
+    etag, last_modified = fingerprint_etag(
+        db.session.execute(query.with_only_columns(*_post_fingerprint_columns())).all(),
+        request.full_path,
+    )
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified, cache_control)
+
+    items, extras = _dump_posts(query, fields, [sort_column])
+    next_cursor = None
+    if len(items) > limit:
+        items, extras = items[:limit], extras[:limit]
+        next_cursor = encode_cursor(extras[-1][0], items[-1]["id"])
+
+    if search and request.args.get("highlight", "").lower() in {"1", "true", "yes"}:
+        snippets = headlines([item["id"] for item in items], search, current_app.config)
+        for item in items:
+            item["search_snippet"] = snippets.get(item["id"])
 
-    posts = db.session.scalars(query).all()
-    return jsonify(blog_post_list_schema.dump(posts))
+    response = jsonify({"items": items, "next_cursor": next_cursor})
+    return apply_validators(response, etag, last_modified, cache_control)
 
 
 @public_bp.get("/posts/<slug>")
 def get_post(slug: str):
-    post = db.session.scalar(select(BlogPost).where(BlogPost.slug == slug, BlogPost.status == "PUBLISHED"))
-    if not post:
-        return jsonify({"message": "Not found"}), 404
+    try:
+        fields = _requested_fields("full")
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    def build():
+        if fields is not None:
+            items, _ = project_posts(_published_post_query(slug), fields)
+            return items[0] if items else None
+        post = db.session.scalars(_published_post_query(slug).options(*post_detail_options())).unique().first()
+        return blog_post_schema.dump(post) if post is not None else None
+
+    return _conditional_json(
+        (post_tag(slug), "categories"),
+        lambda: db.session.execute(_published_post_query(slug).with_only_columns(*_post_fingerprint_columns())).all(),
+        build,
+        register_visit=True,
+    )
+
 
-    _register_visit(post)
-    return jsonify(blog_post_schema.dump(post))
+@public_bp.post("/posts/<slug>/like")
+def like_post(slug: str):
+    return _increment_post_counter(slug, "likes")
+
+
+@public_bp.post("/posts/<slug>/share")
+def share_post(slug: str):
+    return _increment_post_counter(slug, "shares")
 
 
 @public_bp.get("/posts/featured")
 def get_featured_posts():
-    limit = current_app.config.get("POST_FEATURED_LIMIT", 6)
-    posts = db.session.scalars(
-        select(BlogPost)
-        .where(BlogPost.status == "PUBLISHED", BlogPost.is_featured.is_(True))
-        .order_by(BlogPost.published_at.desc().nullslast())
-        .limit(limit)
-    ).all()
-    return jsonify(blog_post_list_schema.dump(posts))
+    return _conditional_post_list(_featured_query())
 
 
 @public_bp.get("/posts/recent")
 def get_recent_posts():
-    limit = current_app.config.get("POST_RECENT_LIMIT", 12)
-    posts = db.session.scalars(
-        select(BlogPost)
-        .where(BlogPost.status == "PUBLISHED")
-        .order_by(BlogPost.published_at.desc().nullslast())
-        .limit(limit)
-    ).all()
-    return jsonify(blog_post_list_schema.dump(posts))
+    return _conditional_post_list(_recent_query())
 
 
 @public_bp.get("/posts/popular")
 def get_popular_posts():
-    subquery = (
-        select(
-            PostMetricsDaily.post_id,
-            func.sum(PostMetricsDaily.views).label("total_views"),
+    window = request.args.get("window") or current_app.config.get("POST_POPULAR_WINDOW", "30d")
+    try:
+        column = popularity_column(window)
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+    return _conditional_post_list(_popular_query(column))
+
+
+@public_bp.get("/categories")
+def list_categories():
+    if request.args.get("tree", "").lower() in {"1", "true", "yes"}:
+        return _conditional_json(
+            ("categories", "posts"),
+            lambda: db.session.execute(_category_tree_fingerprint()).all(),
+            _dump_category_tree,
         )
-        .group_by(PostMetricsDaily.post_id)
-        .subquery()
+
+    query = select(Category).order_by(Category.name)
+    return _conditional_json(
+        ("categories",),
+        lambda: db.session.execute(select(func.count(Category.id), func.max(Category.updated_at))).all(),
+        lambda: category_list_schema.dump(db.session.scalars(query).all()),
+    )
+
+
+def _dump_category_tree() -> list[dict]:
+    rows = category_tree_rows()
+    nodes = category_list_schema.dump([category for category, _, _ in rows])
+    for node, (_, post_count, direct_post_count) in zip(nodes, rows):
+        node["post_count"] = post_count
+        node["direct_post_count"] = direct_post_count
+    return build_tree(nodes)
+
+
+def _category_tree_fingerprint():
+    """Counts and newest timestamps of categories, published posts and their links."""
+    published = select(BlogPost.id).where(BlogPost.status == "PUBLISHED")
+    return select(
+        func.count(Category.id),
+        func.max(Category.updated_at),
+        select(func.count()).select_from(published.subquery()).scalar_subquery(),
+        select(func.max(BlogPost.updated_at)).where(BlogPost.status == "PUBLISHED").scalar_subquery(),
+        select(func.count()).select_from(PostCategory).where(PostCategory.post_id.in_(published)).scalar_subquery(),
+        select(func.max(PostCategory.assigned_at)).scalar_subquery(),
     )
 
-    posts = db.session.scalars(
+
+def _published_post_query(slug: str):
+    return select(BlogPost).where(BlogPost.slug == slug, BlogPost.status == "PUBLISHED")
+
+
+def _featured_query():
+    return (
         select(BlogPost)
-        .join(subquery, BlogPost.id == subquery.c.post_id)
-        .where(BlogPost.status == "PUBLISHED")
-        .order_by(subquery.c.total_views.desc())
+        .where(BlogPost.status == "PUBLISHED", BlogPost.is_featured.is_(True))
+        .order_by(BlogPost.published_at.desc().nullslast())
         .limit(current_app.config.get("POST_FEATURED_LIMIT", 6))
-    ).all()
+    )
 
-    return jsonify(blog_post_list_schema.dump(posts))
 
+def _recent_query():
+    return (
+        select(BlogPost)
+        .where(BlogPost.status == "PUBLISHED")
+        .order_by(BlogPost.published_at.desc().nullslast())
+        .limit(current_app.config.get("POST_RECENT_LIMIT", 12))
+    )
 
-@public_bp.get("/categories")
-def list_categories():
-    categories = db.session.scalars(select(Category).order_by(Category.name)).all()
-    return jsonify(category_list_schema.dump(categories))
-
-
-def _register_visit(post: BlogPost) -> None:
-    session_id = request.headers.get("X-Session-ID")
-    ip_hash = request.headers.get("X-Forwarded-For") or request.remote_addr
-    user_agent = request.headers.get("User-Agent")
-    today = datetime.utcnow().date()
-
-    already_counted = False
-    if session_id:
-        already_counted = (
-            db.session.scalar(
-                select(func.count())
-                .select_from(Visit)
-                .where(
-                    Visit.post_id == post.id,
-                    Visit.session_id == session_id,
-                    func.date(Visit.visited_at) == today,
-                )
-            )
-            > 0
-        )
 
-    visit = Visit(
-        post_id=post.id,
-        session_id=session_id,
-        ip_hash=ip_hash,
-        user_agent=user_agent,
-        visited_at=datetime.utcnow(),
+def _popular_query(column):
+    return (
+        select(BlogPost)
+        .join(PostPopularity, PostPopularity.post_id == BlogPost.id)
+        .where(BlogPost.status == "PUBLISHED", column > 0)
+        .order_by(column.desc(), BlogPost.id.desc())
+        .limit(current_app.config.get("POST_FEATURED_LIMIT", 6))
     )
-    db.session.add(visit)
-    db.session.commit()
 
-    metrics_key = (post.id, today)
-    metrics = db.session.get(PostMetricsDaily, metrics_key)
-    if not metrics:
-        metrics = PostMetricsDaily(post_id=metrics_key[0], date=metrics_key[1])
-        db.session.add(metrics)
 
-    metrics.views += 1
-    if session_id and not already_counted:
-        metrics.unique_sessions += 1
+def _post_fingerprint_columns() -> list:
+    """Columns that change whenever a post's serialized form changes."""
+    chapter_stats = select(func.count(Chapter.id), func.max(Chapter.updated_at)).where(Chapter.post_id == BlogPost.id)
+    category_stats = (
+        select(func.count(Category.id), func.max(Category.updated_at), func.max(PostCategory.assigned_at))
+        .join(PostCategory, PostCategory.category_id == Category.id)
+        .where(PostCategory.post_id == BlogPost.id)
+    )
+    return [
+        BlogPost.id,
+        BlogPost.updated_at,
+        chapter_stats.with_only_columns(func.count(Chapter.id)).scalar_subquery(),
+        chapter_stats.with_only_columns(func.max(Chapter.updated_at)).scalar_subquery(),
+        category_stats.with_only_columns(func.count(Category.id)).scalar_subquery(),
+        category_stats.with_only_columns(func.max(Category.updated_at)).scalar_subquery(),
+        category_stats.with_only_columns(func.max(PostCategory.assigned_at)).scalar_subquery(),
+        # Finished image derivatives update the hero asset.
+        select(MediaAsset.updated_at).where(MediaAsset.id == BlogPost.hero_media_id).scalar_subquery(),
+    ]
+
+
+def _conditional_post_list(query):
+    try:
+        fields = _requested_fields("summary")
+    except ValueError as exc:
+        return jsonify({"message": str(exc)}), 400
+
+    return _conditional_json(
+        LIST_CACHE_TAGS,
+        lambda: db.session.execute(query.with_only_columns(*_post_fingerprint_columns())).all(),
+        lambda: _dump_posts(query, fields)[0],
+    )
+
+
+def _requested_fields(default_view: str) -> tuple[str, ...] | None:
+    return parse_fields(request.args.get("fields"), request.args.get("view"), default_view)
+
+
+def _dump_posts(query, fields: tuple[str, ...] | None, extra_columns=()) -> tuple[list[dict], list[tuple]]:
+    """Dump posts as full entities (``fields is None``) or as a column projection."""
+    if fields is not None:
+        return project_posts(query, fields, extra_columns)
+
+    rows = db.session.execute(query.add_columns(*extra_columns).options(*post_list_options())).all()
+    return blog_post_list_schema.dump([row[0] for row in rows]), [tuple(row[1:]) for row in rows]
+
+
+def _conditional_json(tags, fingerprint, build, register_visit: bool = False):
+    """Serve a cached JSON body with ETag/Last-Modified validators.
+
+    On a cache miss only the metadata ``fingerprint`` query runs before
+    deciding on a ``304``; ``build`` runs only when a body has to be sent.
+    """
+    cache = get_response_cache()
+    key = request_cache_key()
+    cache_control = current_app.config.get("HTTP_CACHE_CONTROL", "public, no-cache")
+
+    hit, entry, versions = cache.lookup(key, tags)
+    if hit:
+        last_modified = parse_datetime_value(entry["last_modified"])
+    else:
+        # An entry serves every client until its tags are invalidated, so it is built on the primary:
+        # a lagging replica would refill it with data from before the write that invalidated it.
+        with use_primary() if versions is not None else nullcontext():
+            rows = fingerprint()
+            if register_visit and not rows:
+                return jsonify({"message": "Not found"}), 404
+
+            etag, last_modified = fingerprint_etag(rows, request.full_path)
+            entry = {"etag": etag, "last_modified": last_modified.isoformat() if last_modified else None}
+            if register_visit:
+                entry["id"] = rows[0][0]
+            if is_not_modified(etag, last_modified):
+                if register_visit:
+                    _register_visit(entry["id"])
+                return not_modified_response(etag, last_modified, cache_control)
+
+            entry["body"] = build()
+            if entry["body"] is None:
+                # Deleted or unpublished between the fingerprint and the body query.
+                return jsonify({"message": "Not found"}), 404
+        cache.store(key, entry, versions)
+
+    if register_visit:
+        _register_visit(entry["id"])
+    if is_not_modified(entry["etag"], last_modified):
+        return not_modified_response(entry["etag"], last_modified, cache_control)
+    return apply_validators(jsonify(entry["body"]), entry["etag"], last_modified, cache_control)
+
+
+def _increment_post_counter(slug: str, counter: str):
+    post_id = db.session.scalar(select(BlogPost.id).where(BlogPost.slug == slug, BlogPost.status == "PUBLISHED"))
+    if post_id is None:
+        return jsonify({"message": "Not found"}), 404
+
+    increment_post_metric(post_id, counter)
     db.session.commit()
+    return "", 204
+
+
+def _register_visit(post_id: int) -> None:
+    record_visit(
+        VisitEvent(
+            post_id=post_id,
+            visited_at=datetime.utcnow(),
+            session_id=request.headers.get("X-Session-ID"),
+            ip_hash=request.headers.get("X-Forwarded-For") or request.remote_addr,
+            user_agent=request.headers.get("User-Agent"),
+            referrer=request.referrer,
+        )
+    )
@@ -1,6 +1,6 @@
 from .blog import BlogPostSchema, ChapterSchema
 from .category import CategorySchema
-from .media import MediaAssetSchema
+from .media import MediaAssetSchema, MediaDerivativeSchema
 from .profile import ProfileSchema
 
 __all__ = [
@@ -8,5 +8,6 @@ __all__ = [
     "ChapterSchema",
     "CategorySchema",
     "MediaAssetSchema",
+    "MediaDerivativeSchema",
     "ProfileSchema",
 ]
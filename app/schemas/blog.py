@@ -6,6 +6,13 @@ from marshmallow_sqlalchemy import SQLAlchemySchema, auto_field
 from app.extensions import db
 from app.models import BlogPost, Chapter
 from .category import CategorySchema
+from .media import MediaAssetSchema
+
+POST_STATUSES = ("DRAFT", "SCHEDULED", "PUBLISHED", "HIDDEN", "ARCHIVED")
+CHAPTER_TYPES = ("TEXT", "IMAGE", "VIDEO")
+
+# What post payloads embed of the hero image: its size and the resized renditions to pick from.
+HERO_MEDIA_FIELDS = ("id", "mime_type", "width", "height", "thumbnail_media_id", "derivatives")
 
 
 class ChapterSchema(SQLAlchemySchema):
@@ -17,7 +24,7 @@ class ChapterSchema(SQLAlchemySchema):
     id = auto_field(dump_only=True)
     post_id = auto_field(dump_only=True)
     position = auto_field()
-    type = auto_field(validate=validate.OneOf(["TEXT", "IMAGE", "VIDEO"]))
+    type = auto_field(validate=validate.OneOf(CHAPTER_TYPES))
     title = auto_field(load_default=None)
     text_content = auto_field(load_default=None)
     media_id = auto_field(load_default=None)
@@ -39,11 +46,12 @@ class BlogPostSchema(SQLAlchemySchema):
     slug = auto_field()
     title = auto_field()
     summary = auto_field(load_default=None)
-    status = auto_field(validate=validate.OneOf(["DRAFT", "SCHEDULED", "PUBLISHED", "HIDDEN", "ARCHIVED"]))
+    status = auto_field(validate=validate.OneOf(POST_STATUSES))
     is_featured = fields.Boolean(load_default=False)
     scheduled_for = fields.AwareDateTime(load_default=None)
     published_at = fields.AwareDateTime(load_default=None)
     hero_media_id = auto_field(load_default=None)
+    hero_media = fields.Nested(MediaAssetSchema, only=HERO_MEDIA_FIELDS, dump_only=True)
     meta_title = auto_field(load_default=None)
     meta_description = auto_field(load_default=None)
     reading_time_minutes = auto_field(load_default=None)
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from datetime import timezone
+
+from marshmallow import Schema, ValidationError, fields, validate, validates_schema
+
+from .blog import CHAPTER_TYPES, POST_STATUSES
+
+
+class CategoryRecordSchema(Schema):
+    """One ``{"kind": "category"}`` line of a bulk NDJSON file."""
+
+    kind = fields.Constant("category")
+    slug = fields.String(required=True, validate=validate.Length(min=1))
+    name = fields.String(required=True, validate=validate.Length(min=1))
+    description = fields.String(load_default=None, allow_none=True)
+    parent = fields.String(load_default=None, allow_none=True)
+
+
+class ChapterRecordSchema(Schema):
+    position = fields.Integer(load_default=None, allow_none=True)
+    type = fields.String(required=True, validate=validate.OneOf(CHAPTER_TYPES))
+    title = fields.String(load_default=None, allow_none=True)
+    text_content = fields.String(load_default=None, allow_none=True)
+    media_id = fields.Integer(load_default=None, allow_none=True)
+    media_checksum = fields.String(load_default=None, allow_none=True)
+    external_video_url = fields.String(load_default=None, allow_none=True)
+    caption = fields.String(load_default=None, allow_none=True)
+    alt_text = fields.String(load_default=None, allow_none=True)
+
+    @validates_schema
+    def validate_text(self, data, **kwargs):
+        if data["type"] == "TEXT" and data.get("text_content") is None:
+            raise ValidationError("TEXT chapters need text_content", "text_content")
+
+
+class PostRecordSchema(Schema):
+    """One ``{"kind": "post"}`` line: a post with its chapters, category slugs and media references.
+
+    Media is referenced by checksum where known, since ids differ between environments.
+    """
+
+    kind = fields.Constant("post")
+    slug = fields.String(required=True, validate=validate.Length(min=1))
+    title = fields.String(required=True, validate=validate.Length(min=1))
+    summary = fields.String(load_default=None, allow_none=True)
+    status = fields.String(load_default="DRAFT", validate=validate.OneOf(POST_STATUSES))
+    is_featured = fields.Boolean(load_default=False)
+    # Naive timestamps are UTC, as everywhere else in the app.
+    scheduled_for = fields.AwareDateTime(load_default=None, allow_none=True, default_timezone=timezone.utc)
+    published_at = fields.AwareDateTime(load_default=None, allow_none=True, default_timezone=timezone.utc)
+    author_id = fields.Integer(load_default=None, allow_none=True, load_only=True)
+    hero_media_id = fields.Integer(load_default=None, allow_none=True)
+    hero_media_checksum = fields.String(load_default=None, allow_none=True)
+    meta_title = fields.String(load_default=None, allow_none=True)
+    meta_description = fields.String(load_default=None, allow_none=True)
+    reading_time_minutes = fields.Integer(load_default=None, allow_none=True)
+    lang = fields.String(load_default="hr", validate=validate.Length(max=10))
+    categories = fields.List(fields.String(), load_default=list)
+    chapters = fields.List(fields.Nested(ChapterRecordSchema), load_default=list)
+
+    @validates_schema
+    def validate_schedule(self, data, **kwargs):
+        if data.get("status") == "SCHEDULED" and not data.get("scheduled_for"):
+            raise ValidationError("Scheduled posts must include 'scheduled_for'", "scheduled_for")
+
+
+__all__ = ["CategoryRecordSchema", "ChapterRecordSchema", "PostRecordSchema"]
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from typing import Any, Callable
+
+from marshmallow import Schema, fields, missing
+
+
+class CompiledSchema:
+    """Dump-only twin of a marshmallow schema compiled into flat Python functions.
+
+    The generated code reads each attribute once and applies the same conversion
+    marshmallow would, so ``dump`` returns data equal to ``schema.dump``. Fields it
+    does not recognise fall back to marshmallow's own ``serialize``. Loading and
+    validation stay with the marshmallow schema.
+    """
+
+    def __init__(self, schema: Schema) -> None:
+        self.schema = schema
+        self.many = schema.many
+        self._dump_one = _compile(schema)
+
+    def dump(self, obj: Any) -> Any:
+        if self.many:
+            dump_one = self._dump_one
+            return [dump_one(item) for item in obj]
+        return self._dump_one(obj)
+
+
+def compile_schema(schema: Schema) -> CompiledSchema:
+    return CompiledSchema(schema)
+
+
+def _compile(schema: Schema) -> Callable[[Any], dict]:
+    # Dump hooks can reshape the output arbitrarily, so leave those schemas to marshmallow.
+    if any(schema._hooks[(tag, many)] for tag in ("pre_dump", "post_dump") for many in (False, True)):
+        return lambda obj: schema.dump(obj, many=False)
+
+    namespace: dict[str, Any] = {"missing": missing}
+    object_lines = ["def dump_object(obj):", "    out = {}"]
+    dict_lines = ["def dump_dict(obj):", "    out = {}"]
+
+    for index, (name, field) in enumerate(schema.dump_fields.items()):
+        key = field.data_key if field.data_key is not None else name
+        attribute = field.attribute or name
+        converter = _converter(field, index, namespace)
+
+        if converter is None or "." in attribute or not attribute.isidentifier():
+            namespace[f"field_{index}"] = field
+            namespace[f"accessor_{index}"] = schema.get_attribute
+            for lines in (object_lines, dict_lines):
+                lines.append(f"    value = field_{index}.serialize({name!r}, obj, accessor=accessor_{index})")
+                lines.append(f"    if value is not missing: out[{key!r}] = value")
+            continue
+
+        object_lines.append(f"    value = getattr(obj, {attribute!r}, missing)")
+        object_lines.append(f"    if value is not missing: out[{key!r}] = {converter}")
+        dict_lines.append(f"    if {attribute!r} in obj:")
+        dict_lines.append(f"        value = obj[{attribute!r}]")
+        dict_lines.append(f"        out[{key!r}] = {converter}")
+
+    object_lines.append("    return out")
+    dict_lines.append("    return out")
+    source = "\n".join(object_lines) + "\n\n" + "\n".join(dict_lines) + "\n"
+    exec(compile(source, f"<compiled {type(schema).__name__}>", "exec"), namespace)
+
+    dump_object = namespace["dump_object"]
+    dump_dict = namespace["dump_dict"]
+
+    def dump(obj: Any) -> dict:
+        return dump_dict(obj) if isinstance(obj, dict) else dump_object(obj)
+
+    return dump
+
+
+def _converter(field: fields.Field, index: int, namespace: dict[str, Any]) -> str | None:
+    """Source expression converting ``value`` like ``field._serialize`` would, or ``None`` if unsupported."""
+    kind = type(field)
+    if kind is fields.Field or kind is fields.Raw:
+        return "value"
+    if kind is fields.Integer and not field.as_string:
+        return "None if value is None else int(value)"
+    if kind is fields.String:
+        return "None if value is None else (value if type(value) is str else str(value))"
+    if kind is fields.Boolean:
+        namespace[f"boolean_{index}"] = field._serialize
+        return f"boolean_{index}(value, None, None)"
+    if kind in (fields.DateTime, fields.AwareDateTime, fields.NaiveDateTime, fields.Date):
+        if (field.format or field.DEFAULT_FORMAT) in ("iso", "iso8601"):
+            return "None if value is None else value.isoformat()"
+        return None
+    if kind is fields.Pluck:
+        nested = _compile(field.schema)
+        namespace[f"pluck_{index}"] = nested
+        namespace[f"pluck_key_{index}"] = field._field_data_key
+        if field.many:
+            return f"None if value is None else [pluck_{index}(item)[pluck_key_{index}] for item in value]"
+        return f"None if value is None else pluck_{index}(value)[pluck_key_{index}]"
+    if kind is fields.Nested:
+        namespace[f"nested_{index}"] = _compile(field.schema)
+        if field.many:
+            return f"None if value is None else [nested_{index}(item) for item in value]"
+        return f"None if value is None else nested_{index}(value)"
+    if kind is fields.List:
+        inner = _converter(field.inner, index, namespace)
+        if inner is None:
+            return None
+        namespace[f"item_{index}"] = eval(f"lambda value: {inner}", namespace)
+        return f"None if value is None else [item_{index}(item) for item in value]"
+    return None
+
+
+__all__ = ["CompiledSchema", "compile_schema"]
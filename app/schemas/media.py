@@ -4,7 +4,19 @@ from marshmallow import fields, validate
 from marshmallow_sqlalchemy import SQLAlchemySchema, auto_field
 
 from app.extensions import db
-from app.models import MediaAsset
+from app.models import MediaAsset, MediaDerivative
+
+
+class MediaDerivativeSchema(SQLAlchemySchema):
+    class Meta:
+        model = MediaDerivative
+        sqla_session = db.session
+        load_instance = True
+
+    media_id = auto_field(dump_only=True)
+    variant = auto_field(dump_only=True)
+    width = auto_field(dump_only=True)
+    height = auto_field(dump_only=True)
 
 
 class MediaAssetSchema(SQLAlchemySchema):
@@ -16,8 +28,10 @@ class MediaAssetSchema(SQLAlchemySchema):
     id = auto_field(dump_only=True)
     uploader_id = auto_field(load_default=None)
     kind = fields.String(validate=validate.OneOf(["IMAGE", "VIDEO", "FILE"]))
-    storage_provider = fields.String(validate=validate.OneOf(["DB", "GDRIVE", "EXTERNAL"]))
+    storage_provider = fields.String(validate=validate.OneOf(["DB", "GDRIVE", "EXTERNAL", "LOCAL"]))
     storage_path = auto_field()
+    status = fields.String(dump_only=True)
+    upload_error = auto_field(dump_only=True)
     mime_type = auto_field(load_default=None)
     bytes = auto_field(load_default=None)
     checksum = auto_field(load_default=None)
@@ -27,3 +41,4 @@ class MediaAssetSchema(SQLAlchemySchema):
     thumbnail_media_id = auto_field(load_default=None)
     created_at = auto_field(dump_only=True)
     updated_at = auto_field(dump_only=True)
+    derivatives = fields.List(fields.Nested(MediaDerivativeSchema), dump_only=True)
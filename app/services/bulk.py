@@ -0,0 +1,420 @@
+from __future__ import annotations
+
+import json
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from typing import Iterable, Iterator, Mapping
+
+from marshmallow import ValidationError
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import aliased
+
+from app.extensions import db
+from app.models import BlogPost, Category, Chapter, MediaAsset, PostCategory, User
+from app.schemas.bulk import CategoryRecordSchema, PostRecordSchema
+from app.services.cache import get_response_cache, post_tag
+from app.services.categories import rebuild_closure
+from app.services.scheduler import get_post_scheduler
+from app.services.search import index_posts
+from app.utils.sql import dialect_insert
+
+
+logger = logging.getLogger(__name__)
+
+category_record_schema = CategoryRecordSchema()
+post_record_schema = PostRecordSchema()
+
+_POST_COLUMNS = (
+    "slug",
+    "title",
+    "summary",
+    "status",
+    "is_featured",
+    "scheduled_for",
+    "published_at",
+    "hero_media_id",
+    "meta_title",
+    "meta_description",
+    "reading_time_minutes",
+    "lang",
+)
+_CHAPTER_COLUMNS = (
+    "position",
+    "type",
+    "title",
+    "text_content",
+    "media_id",
+    "external_video_url",
+    "caption",
+    "alt_text",
+)
+
+
+def export_records(batch_size: int = 500) -> Iterator[dict]:
+    """Yield every category, then every post with its chapters, category slugs and media checksums.
+
+    Posts are read from a server-side cursor ``batch_size`` rows at a time, and
+    each batch fetches its chapters, categories and media in one query apiece,
+    so memory stays flat however many posts there are.
+    """
+    parent = aliased(Category)
+    categories = db.session.execute(
+        select(Category.slug, Category.name, Category.description, parent.slug.label("parent"))
+        .outerjoin(parent, Category.parent_id == parent.id)
+        .order_by(Category.id)
+    )
+    for row in categories:
+        yield category_record_schema.dump(dict(row._mapping))
+
+    posts = db.session.execute(
+        select(BlogPost.id, *(getattr(BlogPost, name) for name in _POST_COLUMNS))
+        .order_by(BlogPost.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for batch in posts.partitions():
+        post_ids = [row.id for row in batch]
+
+        chapters_by_post: dict[int, list[dict]] = defaultdict(list)
+        chapter_rows = db.session.execute(
+            select(Chapter.post_id, *(getattr(Chapter, name) for name in _CHAPTER_COLUMNS))
+            .where(Chapter.post_id.in_(post_ids))
+            .order_by(Chapter.post_id, Chapter.position, Chapter.id)
+        )
+        for row in chapter_rows:
+            chapters_by_post[row.post_id].append({name: getattr(row, name) for name in _CHAPTER_COLUMNS})
+
+        slugs_by_post: dict[int, list[str]] = defaultdict(list)
+        category_rows = db.session.execute(
+            select(PostCategory.post_id, Category.slug)
+            .join(Category, Category.id == PostCategory.category_id)
+            .where(PostCategory.post_id.in_(post_ids))
+            .order_by(PostCategory.post_id, Category.slug)
+        )
+        for post_id, slug in category_rows:
+            slugs_by_post[post_id].append(slug)
+
+        media_ids = {row.hero_media_id for row in batch if row.hero_media_id}
+        media_ids.update(chapter["media_id"] for chapters in chapters_by_post.values() for chapter in chapters)
+        media_ids.discard(None)
+        checksums = dict(
+            db.session.execute(select(MediaAsset.id, MediaAsset.checksum).where(MediaAsset.id.in_(media_ids))).all()
+        ) if media_ids else {}
+
+        for row in batch:
+            record = {name: getattr(row, name) for name in _POST_COLUMNS}
+            for name in ("scheduled_for", "published_at"):
+                if record[name] is not None and record[name].tzinfo is None:
+                    record[name] = record[name].replace(tzinfo=timezone.utc)
+            record["hero_media_checksum"] = checksums.get(row.hero_media_id)
+            record["categories"] = slugs_by_post[row.id]
+            record["chapters"] = [
+                {**chapter, "media_checksum": checksums.get(chapter["media_id"])} for chapter in chapters_by_post[row.id]
+            ]
+            yield post_record_schema.dump(record)
+
+
+class BulkImporter:
+    """Imports NDJSON category and post records in batches.
+
+    Each batch validates its media, category and author references with one
+    query apiece, writes posts, chapters and category links with multi-row
+    inserts, and commits. A batch the database rejects is retried record by
+    record, so a single bad record only fails itself. :meth:`run` yields
+    ``error`` events as records fail, a ``progress`` event after every batch
+    and a final ``summary``.
+    """
+
+    def __init__(self, author_id: int, batch_size: int = 500, update_existing: bool = False, config: Mapping | None = None) -> None:
+        self.author_id = author_id
+        self.batch_size = max(batch_size, 1)
+        self.update_existing = update_existing
+        self.config = config or {}
+        self.counts = Counter()
+        self._parents: dict[str, tuple[int, str]] = {}
+        self._changed_slugs: set[str] = set()
+        self._events: list[dict] = []
+
+    def run(self, lines: Iterable[bytes | str]) -> Iterator[dict]:
+        categories: list[tuple[int, dict]] = []
+        posts: list[tuple[int, dict]] = []
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line:
+                continue
+            self.counts["processed"] += 1
+            record = None
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict):
+                    raise ValueError("Record must be a JSON object")
+                kind = record.get("kind", "post")
+                if kind == "category":
+                    categories.append((number, category_record_schema.load(record)))
+                elif kind == "post":
+                    posts.append((number, post_record_schema.load(record)))
+                else:
+                    raise ValueError(f"Unknown record kind {kind!r}")
+            except ValidationError as exc:
+                self._fail(number, record, exc.messages)
+            except ValueError as exc:
+                self._fail(number, record, str(exc))
+
+            if len(categories) + len(posts) >= self.batch_size:
+                self._write_batch(categories, posts)
+                categories, posts = [], []
+                yield from self._drain()
+                yield {"progress": self._progress()}
+            else:
+                yield from self._drain()
+
+        if categories or posts:
+            self._write_batch(categories, posts)
+        self._link_parents()
+        if self.counts["categories"]:
+            rebuild_closure()
+            db.session.commit()
+        yield from self._drain()
+
+        if self._changed_slugs or self.counts["categories"]:
+            get_response_cache().invalidate("posts", "categories", *(post_tag(slug) for slug in self._changed_slugs))
+        yield {"summary": self._progress()}
+
+    def _write_batch(self, categories: list[tuple[int, dict]], posts: list[tuple[int, dict]]) -> None:
+        if categories:
+            self._write_categories(categories)
+        if posts:
+            self._write_posts(posts)
+
+    def _write_categories(self, records: list[tuple[int, dict]]) -> None:
+        rows = {}
+        for number, data in records:
+            rows[data["slug"]] = {"slug": data["slug"], "name": data["name"], "description": data["description"]}
+            if data["parent"]:
+                self._parents[data["slug"]] = (number, data["parent"])
+
+        table = Category.__table__
+        now = datetime.utcnow()
+        stmt = dialect_insert(table).values([{**row, "created_at": now, "updated_at": now} for row in rows.values()])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.slug],
+            set_={"name": stmt.excluded.name, "description": stmt.excluded.description, "updated_at": now},
+        )
+        try:
+            db.session.execute(stmt)
+            db.session.commit()
+        except SQLAlchemyError as exc:
+            db.session.rollback()
+            for number, data in records:
+                self._fail(number, data, f"Could not store category: {exc.__class__.__name__}")
+            return
+        self.counts["categories"] += len(rows)
+
+    def _write_posts(self, records: list[tuple[int, dict]]) -> None:
+        records = self._drop_duplicate_slugs(records)
+        if not records:
+            return
+        refs = self._load_references(records)
+
+        new_rows, updated_rows, children = [], [], []
+        for number, data in records:
+            try:
+                post_row, chapter_rows, category_ids = self._resolve(data, refs)
+            except ValueError as exc:
+                self._fail(number, data, str(exc))
+                continue
+            existing_id = refs["posts"].get(data["slug"])
+            if existing_id is not None and not self.update_existing:
+                self._fail(number, data, f"A post with slug {data['slug']!r} already exists")
+                continue
+            if existing_id is None:
+                new_rows.append(post_row)
+            else:
+                if data["author_id"] not in refs["authors"]:
+                    post_row.pop("author_id")  # keep the current author
+                updated_rows.append({**post_row, "b_id": existing_id})
+            children.append((number, data, existing_id, chapter_rows, category_ids))
+
+        if not children:
+            return
+        try:
+            post_ids = self._insert_posts(new_rows, updated_rows, children)
+            db.session.commit()
+        except SQLAlchemyError as exc:
+            db.session.rollback()
+            if len(children) == 1:
+                number, data = children[0][:2]
+                self._fail(number, data, f"Database rejected the record: {getattr(exc, 'orig', exc)}")
+                return
+            # Find the offending records by writing the rest of the batch one at a time.
+            for number, data, *_ in children:
+                self._write_posts([(number, data)])
+            return
+
+        self.counts["imported"] += len(new_rows)
+        self.counts["updated"] += len(updated_rows)
+        self._changed_slugs.update(data["slug"] for _, data, *_ in children)
+        scheduler = get_post_scheduler()
+        for post_id, (_, data, *_) in zip(post_ids, children):
+            if data["status"] == "SCHEDULED":
+                scheduler.notify(post_id, data["scheduled_for"])
+
+    def _insert_posts(self, new_rows: list[dict], updated_rows: list[dict], children: list[tuple]) -> list[int]:
+        table = BlogPost.__table__
+        ids = iter([])
+        if new_rows:
+            stmt = insert(table).returning(table.c.id, sort_by_parameter_order=True)
+            ids = iter(db.session.scalars(stmt, new_rows).all())
+        if updated_rows:
+            db.session.execute(update(table).where(table.c.id == bindparam("b_id")), updated_rows)
+            updated_ids = [row["b_id"] for row in updated_rows]
+            db.session.execute(delete(Chapter).where(Chapter.post_id.in_(updated_ids)))
+            db.session.execute(delete(PostCategory).where(PostCategory.post_id.in_(updated_ids)))
+
+        chapter_rows, link_rows, post_ids = [], [], []
+        now = datetime.utcnow()
+        for _, _, existing_id, chapters, category_ids in children:
+            post_id = existing_id if existing_id is not None else next(ids)
+            post_ids.append(post_id)
+            chapter_rows.extend({**chapter, "post_id": post_id} for chapter in chapters)
+            link_rows.extend({"post_id": post_id, "category_id": category_id, "assigned_at": now} for category_id in category_ids)
+        if chapter_rows:
+            db.session.execute(insert(Chapter.__table__), chapter_rows)
+        if link_rows:
+            db.session.execute(insert(PostCategory.__table__), link_rows)
+        index_posts(post_ids, self.config)
+        return post_ids
+
+    def _drop_duplicate_slugs(self, records: list[tuple[int, dict]]) -> list[tuple[int, dict]]:
+        seen = set()
+        unique = []
+        for number, data in records:
+            if data["slug"] in seen:
+                self._fail(number, data, f"Slug {data['slug']!r} appears more than once in the batch")
+                continue
+            seen.add(data["slug"])
+            unique.append((number, data))
+        return unique
+
+    def _load_references(self, records: list[tuple[int, dict]]) -> dict:
+        """Everything the batch points at, fetched with one query per kind of reference."""
+        slugs, category_slugs, media_ids, checksums, author_ids = set(), set(), set(), set(), set()
+        for _, data in records:
+            slugs.add(data["slug"])
+            category_slugs.update(data["categories"])
+            if data["author_id"]:
+                author_ids.add(data["author_id"])
+            references = [(data["hero_media_id"], data["hero_media_checksum"])]
+            references += [(chapter["media_id"], chapter["media_checksum"]) for chapter in data["chapters"]]
+            for media_id, checksum in references:
+                if checksum:
+                    checksums.add(checksum)
+                elif media_id:
+                    media_ids.add(media_id)
+
+        def lookup(stmt) -> dict:
+            return dict(db.session.execute(stmt).all())
+
+        return {
+            "posts": lookup(select(BlogPost.slug, BlogPost.id).where(BlogPost.slug.in_(slugs))),
+            "categories": lookup(select(Category.slug, Category.id).where(Category.slug.in_(category_slugs)))
+            if category_slugs
+            else {},
+            "media_ids": set(db.session.scalars(select(MediaAsset.id).where(MediaAsset.id.in_(media_ids))))
+            if media_ids
+            else set(),
+            # The oldest usable copy wins, matching how duplicates are merged.
+            "checksums": lookup(
+                select(MediaAsset.checksum, func.min(MediaAsset.id))
+                .where(MediaAsset.checksum.in_(checksums), MediaAsset.status != "FAILED")
+                .group_by(MediaAsset.checksum)
+            )
+            if checksums
+            else {},
+            "authors": set(db.session.scalars(select(User.id).where(User.id.in_(author_ids)))) if author_ids else set(),
+        }
+
+    def _resolve(self, data: dict, refs: dict) -> tuple[dict, list[dict], list[int]]:
+        def media(media_id: int | None, checksum: str | None, field: str) -> int | None:
+            if checksum:
+                if checksum not in refs["checksums"]:
+                    raise ValueError(f"{field}: no media with checksum {checksum}")
+                return refs["checksums"][checksum]
+            if media_id and media_id not in refs["media_ids"]:
+                raise ValueError(f"{field}: media_id {media_id} does not exist")
+            return media_id
+
+        missing = [slug for slug in data["categories"] if slug not in refs["categories"]]
+        if missing:
+            raise ValueError(f"Unknown categories: {', '.join(missing)}")
+
+        post_row = {name: data[name] for name in _POST_COLUMNS}
+        post_row["hero_media_id"] = media(data["hero_media_id"], data["hero_media_checksum"], "hero_media")
+        post_row["author_id"] = data["author_id"] if data["author_id"] in refs["authors"] else self.author_id
+        if post_row["status"] == "PUBLISHED" and not post_row["published_at"]:
+            post_row["published_at"] = datetime.utcnow()
+
+        chapters = []
+        for index, chapter in enumerate(data["chapters"]):
+            row = {name: chapter[name] for name in _CHAPTER_COLUMNS}
+            row["position"] = index if chapter["position"] is None else chapter["position"]
+            row["media_id"] = media(chapter["media_id"], chapter["media_checksum"], f"chapters[{index}]")
+            chapters.append(row)
+
+        category_ids = list(dict.fromkeys(refs["categories"][slug] for slug in data["categories"]))
+        return post_row, chapters, category_ids
+
+    def _link_parents(self) -> None:
+        if not self._parents:
+            return
+        parents = dict(db.session.execute(select(Category.id, Category.parent_id)).all())
+        ids = dict(db.session.execute(select(Category.slug, Category.id)).all())
+        rows = []
+        for slug, (number, parent) in self._parents.items():
+            if parent not in ids:
+                self._fail(number, {"slug": slug}, f"Unknown parent category {parent!r}")
+            elif slug in ids:
+                if _is_ancestor(parents, ids[slug], ids[parent]):
+                    self._fail(number, {"slug": slug}, f"Parent category {parent!r} would create a cycle")
+                    continue
+                parents[ids[slug]] = ids[parent]
+                rows.append({"b_id": ids[slug], "parent_id": ids[parent]})
+        if rows:
+            table = Category.__table__
+            db.session.execute(update(table).where(table.c.id == bindparam("b_id")).values(parent_id=bindparam("parent_id")), rows)
+            db.session.commit()
+
+    def _fail(self, number: int, record, message) -> None:
+        self.counts["failed"] += 1
+        slug = record.get("slug") if isinstance(record, dict) else None
+        self._events.append({"error": {"line": number, "slug": slug, "message": message}})
+
+    def _drain(self) -> Iterator[dict]:
+        events, self._events = self._events, []
+        yield from events
+
+    def _progress(self) -> dict:
+        return {name: self.counts[name] for name in ("processed", "imported", "updated", "categories", "failed")}
+
+
+def _is_ancestor(parents: dict[int, int | None], category_id: int, node_id: int | None) -> bool:
+    """Whether ``category_id`` is ``node_id`` or one of its ancestors in the ``parents`` map."""
+    seen = set()
+    while node_id is not None and node_id not in seen:
+        if node_id == category_id:
+            return True
+        seen.add(node_id)
+        node_id = parents.get(node_id)
+    return False
+
+
+def ndjson_line(record: dict) -> bytes:
+    return json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+
+
+def default_author_id() -> int | None:
+    return db.session.scalar(select(User.id).order_by(User.id).limit(1))
+
+
+__all__ = ["BulkImporter", "default_author_id", "export_records", "ndjson_line"]
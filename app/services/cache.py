@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Iterable, Protocol
+
+from flask import Flask, current_app, request
+
+
+logger = logging.getLogger(__name__)
+
+
+class CacheBackend(Protocol):
+    def get(self, key: str) -> tuple[Any, dict[str, int]] | None:
+        ...
+
+    def set(self, key: str, value: Any, tag_versions: dict[str, int], ttl: float) -> None:
+        ...
+
+    def tag_versions(self, tags: Iterable[str]) -> dict[str, int]:
+        ...
+
+    def bump_tags(self, tags: Iterable[str]) -> None:
+        ...
+
+    def clear(self) -> None:
+        ...
+
+
+class MemoryCacheBackend:
+    """Per-process LRU with a per-entry TTL."""
+
+    def __init__(self, max_entries: int, stats: Counter) -> None:
+        self.max_entries = max(max_entries, 1)
+        self._stats = stats
+        self._entries: OrderedDict[str, tuple[float, Any, dict[str, int]]] = OrderedDict()
+        self._tags: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> tuple[Any, dict[str, int]] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, versions = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self._stats["expired"] += 1
+                return None
+            self._entries.move_to_end(key)
+            return value, versions
+
+    def set(self, key: str, value: Any, tag_versions: dict[str, int], ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value, tag_versions)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def tag_versions(self, tags: Iterable[str]) -> dict[str, int]:
+        with self._lock:
+            return {tag: self._tags.get(tag, 0) for tag in tags}
+
+    def bump_tags(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                self._tags[tag] = self._tags.get(tag, 0) + 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCacheBackend:
+    """Cache shared by every worker on a host through a local SQLite file."""
+
+    def __init__(self, path: str, max_entries: int, stats: Counter) -> None:
+        self.path = path
+        self.max_entries = max(max_entries, 1)
+        self._stats = stats
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache_entry ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, tags TEXT NOT NULL, "
+                "expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS cache_entry_accessed_idx ON cache_entry (accessed_at)")
+            conn.execute("CREATE TABLE IF NOT EXISTS cache_tag (tag TEXT PRIMARY KEY, version INTEGER NOT NULL)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None or getattr(self._local, "pid", None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key: str) -> tuple[Any, dict[str, int]] | None:
+        conn = self._connect()
+        row = conn.execute("SELECT value, tags, expires_at FROM cache_entry WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, tags, expires_at = row
+        now = time.time()
+        if expires_at < now:
+            conn.execute("DELETE FROM cache_entry WHERE key = ?", (key,))
+            self._stats["expired"] += 1
+            return None
+        conn.execute("UPDATE cache_entry SET accessed_at = ? WHERE key = ?", (now, key))
+        return json.loads(value), json.loads(tags)
+
+    def set(self, key: str, value: Any, tag_versions: dict[str, int], ttl: float) -> None:
+        conn = self._connect()
+        now = time.time()
+        conn.execute(
+            "INSERT OR REPLACE INTO cache_entry (key, value, tags, expires_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, json.dumps(value), json.dumps(tag_versions), now + ttl, now),
+        )
+        overflow = conn.execute("SELECT COUNT(*) FROM cache_entry").fetchone()[0] - self.max_entries
+        if overflow > 0:
+            conn.execute(
+                "DELETE FROM cache_entry WHERE key IN "
+                "(SELECT key FROM cache_entry ORDER BY accessed_at LIMIT ?)",
+                (overflow,),
+            )
+            self._stats["evictions"] += overflow
+
+    def tag_versions(self, tags: Iterable[str]) -> dict[str, int]:
+        tags = list(tags)
+        if not tags:
+            return {}
+        placeholders = ", ".join("?" for _ in tags)
+        rows = self._connect().execute(
+            f"SELECT tag, version FROM cache_tag WHERE tag IN ({placeholders})", tags
+        ).fetchall()
+        versions = dict(rows)
+        return {tag: versions.get(tag, 0) for tag in tags}
+
+    def bump_tags(self, tags: Iterable[str]) -> None:
+        conn = self._connect()
+        conn.executemany(
+            "INSERT INTO cache_tag (tag, version) VALUES (?, 1) "
+            "ON CONFLICT (tag) DO UPDATE SET version = version + 1",
+            [(tag,) for tag in tags],
+        )
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM cache_entry")
+
+
+class ResponseCache:
+    """Caches JSON-ready payloads of public read endpoints.
+
+    Entries carry the versions of the tags they depend on (``posts``,
+    ``categories``, ``post:<slug>``). Invalidating a tag bumps its version,
+    which makes every entry built against the old version a miss.
+    """
+
+    def __init__(self, backend: CacheBackend | None, ttl: float, stats: Counter) -> None:
+        self.backend = backend
+        self.ttl = ttl
+        self._stats = stats
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.backend is not None
+
+    def get_or_set(self, key: str, tags: Iterable[str], builder: Callable[[], Any]) -> Any:
+        hit, value, versions = self.lookup(key, tags)
+        if hit:
+            return value
+        value = builder()
+        self.store(key, value, versions)
+        return value
+
+    def lookup(self, key: str, tags: Iterable[str]) -> tuple[bool, Any, dict[str, int] | None]:
+        """Return ``(hit, value, versions)``; pass ``versions`` to :meth:`store` after a miss."""
+        if self.backend is None:
+            return False, None, None
+
+        tags = tuple(tags)
+        try:
+            cached = self.backend.get(key)
+            current = self.backend.tag_versions(tags)
+        except sqlite3.Error:
+            logger.exception("Response cache lookup failed")
+            return False, None, None
+
+        if cached is not None and cached[1] == current:
+            self._count("hits")
+            return True, cached[0], current
+
+        self._count("misses")
+        return False, None, current
+
+    def store(self, key: str, value: Any, versions: dict[str, int] | None) -> None:
+        # Versions are captured before the value is built so a concurrent invalidation wins.
+        if self.backend is None or versions is None:
+            return
+        try:
+            self.backend.set(key, value, versions, self.ttl)
+        except sqlite3.Error:
+            logger.exception("Response cache store failed")
+
+    def invalidate(self, *tags: str) -> None:
+        if self.backend is None or not tags:
+            return
+        try:
+            self.backend.bump_tags(tags)
+        except sqlite3.Error:
+            logger.exception("Response cache invalidation failed; clearing local entries")
+            self.backend.clear()
+        self._count("invalidations")
+
+    def clear(self) -> None:
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._stats)
+        return {
+            "backend": type(self.backend).__name__ if self.backend else None,
+            "hits": counters.get("hits", 0),
+            "misses": counters.get("misses", 0),
+            "evictions": counters.get("evictions", 0),
+            "expired": counters.get("expired", 0),
+            "invalidations": counters.get("invalidations", 0),
+        }
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+
+def init_response_cache(app: Flask) -> ResponseCache:
+    stats: Counter = Counter()
+    backend_name = (app.config.get("RESPONSE_CACHE_BACKEND") or "none").lower()
+    max_entries = int(app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+
+    backend: CacheBackend | None
+    if backend_name == "memory":
+        backend = MemoryCacheBackend(max_entries, stats)
+    elif backend_name == "sqlite":
+        path = app.config.get("RESPONSE_CACHE_SQLITE_PATH") or os.path.join(app.instance_path, "response-cache.sqlite3")
+        backend = SQLiteCacheBackend(path, max_entries, stats)
+    else:
+        backend = None
+
+    cache = ResponseCache(backend, float(app.config.get("RESPONSE_CACHE_TTL", 60)), stats)
+    app.extensions["response_cache"] = cache
+    return cache
+
+
+def get_response_cache() -> ResponseCache:
+    return current_app.extensions["response_cache"]
+
+
+def request_cache_key() -> str:
+    """Cache key for the current request: endpoint plus its sorted query arguments."""
+    args = sorted((key, value) for key in request.args for value in request.args.getlist(key))
+    query = "&".join(f"{key}={value}" for key, value in args)
+    return f"{request.endpoint}:{request.path}?{query}"
+
+
+def post_tag(slug: str) -> str:
+    return f"post:{slug}"
+
+
+__all__ = [
+    "MemoryCacheBackend",
+    "ResponseCache",
+    "SQLiteCacheBackend",
+    "get_response_cache",
+    "init_response_cache",
+    "post_tag",
+    "request_cache_key",
+]
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import logging
+
+from sqlalchemy import and_, case, delete, func, insert, literal, select, true
+from sqlalchemy.orm import aliased
+
+from app.extensions import db
+from app.models import BlogPost, Category, CategoryClosure, PostCategory
+
+
+logger = logging.getLogger(__name__)
+
+_COLUMNS = ("ancestor_id", "descendant_id", "depth")
+# Stops the recursive rebuild on a parent_id cycle left by bad data; the duplicate pairs then fail loudly.
+_MAX_DEPTH = 64
+
+
+def add_to_tree(category_id: int, parent_id: int | None) -> None:
+    """Insert the closure rows of a new leaf: itself, plus one row per ancestor of ``parent_id``."""
+    rows = select(literal(category_id), literal(category_id), literal(0))
+    if parent_id is not None:
+        rows = rows.union_all(
+            select(CategoryClosure.ancestor_id, literal(category_id), CategoryClosure.depth + 1).where(
+                CategoryClosure.descendant_id == parent_id
+            )
+        )
+    db.session.execute(insert(CategoryClosure).from_select(_COLUMNS, rows))
+
+
+def move_in_tree(category_id: int, parent_id: int | None) -> None:
+    """Re-hang the subtree of ``category_id`` under ``parent_id`` (``None`` makes it a root)."""
+    _detach_subtree(category_id, keep_root=True)
+    if parent_id is None:
+        return
+    above = aliased(CategoryClosure)
+    below = aliased(CategoryClosure)
+    db.session.execute(
+        insert(CategoryClosure).from_select(
+            _COLUMNS,
+            # Every ancestor of the new parent times every member of the subtree.
+            select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+            .join_from(above, below, true())
+            .where(above.descendant_id == parent_id, below.ancestor_id == category_id),
+        )
+    )
+
+
+def remove_from_tree(category_id: int) -> None:
+    """Drop a category from the closure; its children become roots, as ``parent_id`` is set to NULL."""
+    _detach_subtree(category_id, keep_root=False)
+
+
+def creates_cycle(category_id: int, parent_id: int | None) -> bool:
+    """Whether making ``parent_id`` the parent would put ``category_id`` inside its own subtree."""
+    if parent_id is None:
+        return False
+    if parent_id == category_id:
+        return True
+    return (
+        db.session.scalar(
+            select(CategoryClosure.depth).where(
+                CategoryClosure.ancestor_id == category_id, CategoryClosure.descendant_id == parent_id
+            )
+        )
+        is not None
+    )
+
+
+def rebuild_closure() -> int:
+    """Recompute the whole closure table from ``Category.parent_id``; returns the number of rows."""
+    tree = select(
+        Category.id.label("ancestor_id"), Category.id.label("descendant_id"), literal(0).label("depth")
+    ).cte("tree", recursive=True)
+    child = aliased(Category)
+    tree = tree.union_all(
+        select(tree.c.ancestor_id, child.id, tree.c.depth + 1)
+        .join(child, child.parent_id == tree.c.descendant_id)
+        .where(tree.c.depth < _MAX_DEPTH)
+    )
+    db.session.execute(delete(CategoryClosure).execution_options(synchronize_session=False))
+    db.session.execute(insert(CategoryClosure).from_select(_COLUMNS, select(tree)))
+    count = db.session.scalar(select(func.count()).select_from(CategoryClosure))
+    logger.info("Rebuilt category closure with %d rows", count)
+    return count
+
+
+def in_category_tree(slug: str):
+    """``WHERE`` clause for posts tagged with the ``slug`` category or any of its descendants.
+
+    A semi-join through the closure table, so a post tagged with a category
+    and its subcategory is still returned once.
+    """
+    return BlogPost.id.in_(
+        select(PostCategory.post_id)
+        .join(CategoryClosure, CategoryClosure.descendant_id == PostCategory.category_id)
+        .join(Category, Category.id == CategoryClosure.ancestor_id)
+        .where(Category.slug == slug)
+    )
+
+
+def category_tree_rows():
+    """Each category with its published post count, including and excluding subcategories, in one query."""
+    counts = (
+        select(
+            CategoryClosure.ancestor_id,
+            func.count(func.distinct(PostCategory.post_id)).label("post_count"),
+            func.count(func.distinct(case((CategoryClosure.depth == 0, PostCategory.post_id)))).label(
+                "direct_post_count"
+            ),
+        )
+        .join(PostCategory, PostCategory.category_id == CategoryClosure.descendant_id)
+        .join(BlogPost, and_(BlogPost.id == PostCategory.post_id, BlogPost.status == "PUBLISHED"))
+        .group_by(CategoryClosure.ancestor_id)
+        .subquery()
+    )
+    return db.session.execute(
+        select(Category, func.coalesce(counts.c.post_count, 0), func.coalesce(counts.c.direct_post_count, 0))
+        .outerjoin(counts, counts.c.ancestor_id == Category.id)
+        .order_by(Category.name)
+    ).all()
+
+
+def build_tree(nodes: list[dict]) -> list[dict]:
+    """Nest dumped categories under their parents, keeping the input order among siblings."""
+    by_id = {node["id"]: {**node, "children": []} for node in nodes}
+    roots = []
+    for node in by_id.values():
+        parent = by_id.get(node["parent_id"])
+        (parent["children"] if parent is not None else roots).append(node)
+    return roots
+
+
+def _detach_subtree(category_id: int, keep_root: bool) -> None:
+    # Links from the category's ancestors (and, unless kept, from itself) into its subtree.
+    subtree = select(CategoryClosure.descendant_id).where(CategoryClosure.ancestor_id == category_id)
+    ancestors = select(CategoryClosure.ancestor_id).where(CategoryClosure.descendant_id == category_id)
+    if keep_root:
+        ancestors = ancestors.where(CategoryClosure.ancestor_id != category_id)
+    db.session.execute(
+        delete(CategoryClosure)
+        .where(CategoryClosure.descendant_id.in_(subtree), CategoryClosure.ancestor_id.in_(ancestors))
+        .execution_options(synchronize_session=False)
+    )
+
+
+__all__ = [
+    "add_to_tree",
+    "build_tree",
+    "category_tree_rows",
+    "creates_cycle",
+    "in_category_tree",
+    "move_in_tree",
+    "rebuild_closure",
+    "remove_from_tree",
+]
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+
+from flask import Flask, current_app
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.models import MediaAsset, MediaDerivative
+from app.services.cache import get_response_cache, post_tag
+from app.services.media import find_duplicate, media_file_path, posts_referencing
+from app.services.storage import GoogleDriveStorage, StorageError, get_storage_backend, hash_stream
+
+try:  # pragma: no cover - optional dependency
+    from PIL import Image, ImageOps
+except ImportError:  # pragma: no cover - optional dependency
+    Image = ImageOps = None
+
+# Pillow raises OSError subclasses for unreadable images, and DecompressionBombError for oversized ones.
+_IMAGE_ERRORS = (OSError, Image.DecompressionBombError) if Image is not None else (OSError,)
+
+
+logger = logging.getLogger(__name__)
+
+
+def render_derivatives(source: str, out_dir: str, widths: tuple[int, ...], thumbnail_size: int, quality: int) -> dict:
+    """Decode an image once and write a thumbnail plus narrower renditions as WebP.
+
+    Runs in a worker process, so it only takes and returns plain values.
+    """
+    with Image.open(source) as image:
+        rotated = _rotated(image)
+        width, height = (image.height, image.width) if rotated else image.size
+        targets = [("thumb", thumbnail_size)] + [(f"w{target}", target) for target in widths if target < width]
+
+        # JPEG can decode straight at a reduced scale, which is far cheaper than a full decode.
+        largest = max(target for _, target in targets)
+        draft = (largest, max(round(height * largest / width), 1))
+        image.draft("RGB", draft[::-1] if rotated else draft)
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info or "A" in image.getbands() else "RGB")
+
+        derivatives = []
+        for variant, target in targets:
+            if variant == "thumb":
+                rendition = image.copy()
+                rendition.thumbnail((target, target), Image.Resampling.LANCZOS)
+            else:
+                rendition = image.resize((target, max(round(height * target / width), 1)), Image.Resampling.LANCZOS)
+            path = os.path.join(out_dir, f"{variant}.webp")
+            rendition.save(path, "WEBP", quality=quality, method=4)
+            derivatives.append((variant, rendition.width, rendition.height, path))
+
+    return {"width": width, "height": height, "derivatives": derivatives}
+
+
+def _rotated(image) -> bool:
+    # EXIF orientations 5-8 swap width and height.
+    return image.getexif().get(0x0112, 1) in (5, 6, 7, 8)
+
+
+class DerivativePipeline:
+    """Fills in image dimensions and generates thumbnails and responsive widths.
+
+    Decoding and resizing run in a process pool so they never compete with
+    request threads for the GIL; a small thread pool waits on the results and
+    stores them through the storage backend. ``sync`` mode does everything on
+    the calling thread.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        configured = (app.config.get("IMAGE_DERIVATIVE_MODE") or "").lower()
+        mode = configured or ("sync" if app.testing else "async")
+        if Image is None and mode != "off":
+            # An explicitly enabled feature must not quietly ship switched off.
+            if configured:
+                raise RuntimeError(
+                    f"IMAGE_DERIVATIVE_MODE={configured} needs Pillow; install requirements.txt or set it to off"
+                )
+            logger.error("Pillow is not installed; image derivatives are disabled until it is or IMAGE_DERIVATIVE_MODE=off")
+            mode = "off"
+        self.mode = mode
+        self.widths = tuple(sorted(int(width) for width in app.config.get("IMAGE_DERIVATIVE_WIDTHS", (320, 640, 1280))))
+        self.thumbnail_size = int(app.config.get("IMAGE_THUMBNAIL_SIZE", 200))
+        self.quality = int(app.config.get("IMAGE_DERIVATIVE_QUALITY", 80))
+        self.processes = max(int(app.config.get("IMAGE_DERIVATIVE_PROCESSES", 2)), 1)
+        self._processes: Executor | None = None
+        self._threads: ThreadPoolExecutor | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._counters = Counter()
+
+    def schedule(self, media_id: int) -> None:
+        if self.mode == "off":
+            return
+        if self.mode == "sync":
+            self.generate(media_id)
+            return
+        self._ensure_pools()
+        self._threads.submit(self._run, media_id)
+
+    def generate(self, media_id: int) -> bool:
+        """Create the missing derivatives of one image; returns whether anything was stored."""
+        asset = db.session.get(MediaAsset, media_id)
+        if asset is None or asset.kind != "IMAGE" or asset.status != "READY" or asset.derivatives:
+            return False
+        if asset.mime_type and not asset.mime_type.startswith("image/"):
+            return False
+
+        work_dir = tempfile.mkdtemp(prefix="derivatives-")
+        try:
+            source = self._source_file(asset, work_dir)
+            if source is None:
+                logger.info("Media %s has no readable original; skipping derivatives", media_id)
+                return False
+            db.session.rollback()  # do not hold a transaction while rendering
+            result = self._render(str(source), work_dir)
+            self._store(media_id, result)
+        except (*_IMAGE_ERRORS, StorageError, SQLAlchemyError) as exc:
+            db.session.rollback()
+            self._count("failed")
+            logger.warning("Could not create derivatives for media %s: %s", media_id, exc)
+            return False
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+        self._count("generated")
+        return True
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        return {"mode": self.mode, "generated": counters.get("generated", 0), "failed": counters.get("failed", 0)}
+
+    def _render(self, source: str, work_dir: str) -> dict:
+        args = (source, work_dir, self.widths, self.thumbnail_size, self.quality)
+        if self.mode == "sync":
+            return render_derivatives(*args)
+        return self._processes.submit(render_derivatives, *args).result()
+
+    def _source_file(self, asset: MediaAsset, work_dir: str) -> Path | None:
+        path = media_file_path(asset)
+        if path is not None:
+            return path
+        storage = get_storage_backend(current_app.config)
+        if asset.storage_provider != "GDRIVE" or not isinstance(storage, GoogleDriveStorage):
+            return None
+        path = Path(work_dir) / "source"
+        with open(path, "wb") as file_handle:
+            storage.download(asset.storage_path, file_handle)
+        return path
+
+    def _store(self, media_id: int, result: dict) -> None:
+        asset = db.session.get(MediaAsset, media_id)
+        if asset is None or asset.derivatives:
+            return
+        storage = get_storage_backend(current_app.config)
+
+        for variant, width, height, path in result["derivatives"]:
+            with open(path, "rb") as file_handle:
+                size, checksum = hash_stream(file_handle)
+                rendition = find_duplicate(checksum, size)
+                if rendition is None:
+                    stored = storage.upload(file_handle, f"{media_id}-{variant}.webp", "image/webp")
+                    rendition = MediaAsset(
+                        uploader_id=asset.uploader_id,
+                        kind="IMAGE",
+                        storage_provider=stored.provider,
+                        storage_path=stored.path,
+                        mime_type=stored.mime_type or "image/webp",
+                        bytes=stored.size,
+                        checksum=stored.checksum,
+                        width=width,
+                        height=height,
+                    )
+                    db.session.add(rendition)
+                    db.session.flush()
+            asset.derivatives.append(MediaDerivative(media=rendition, variant=variant, width=width, height=height))
+            if variant == "thumb":
+                asset.thumbnail_media_id = rendition.id
+
+        asset.width = result["width"]
+        asset.height = result["height"]
+        slugs = posts_referencing([media_id])
+        db.session.commit()
+        if slugs:
+            get_response_cache().invalidate("posts", *(post_tag(slug) for slug in slugs))
+
+    def _run(self, media_id: int) -> None:
+        try:
+            with self.app.app_context():
+                try:
+                    self.generate(media_id)
+                finally:
+                    db.session.remove()
+        except Exception:
+            logger.exception("Derivative generation for media %s crashed", media_id)
+
+    def _ensure_pools(self) -> None:
+        # Pools do not survive a fork, so every worker process starts its own.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            # Spawned children do not inherit the parent's threads, locks or database connections.
+            context = multiprocessing.get_context("spawn")
+            self._processes = ProcessPoolExecutor(max_workers=self.processes, mp_context=context)
+            self._threads = ThreadPoolExecutor(max_workers=self.processes, thread_name_prefix="image-derivatives")
+            self._pid = pid
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+
+def init_image_derivatives(app: Flask) -> DerivativePipeline:
+    pipeline = DerivativePipeline(app)
+    app.extensions["image_derivatives"] = pipeline
+    return pipeline
+
+
+def get_derivative_pipeline() -> DerivativePipeline:
+    return current_app.extensions["image_derivatives"]
+
+
+__all__ = ["DerivativePipeline", "get_derivative_pipeline", "init_image_derivatives", "render_derivatives"]
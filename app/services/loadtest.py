@@ -0,0 +1,514 @@
+from __future__ import annotations
+
+import http.client
+import itertools
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable
+from urllib.parse import urlsplit
+
+from flask import Flask
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import BlogPost, Category, Chapter, MediaAsset, Visit
+from app.services.synthetic import BENCH_EMAIL, CATEGORY_PREFIX, SLUG_PREFIX, bench_user_id
+
+
+logger = logging.getLogger(__name__)
+
+RESULTS_VERSION = 1
+# Slugs of rows the write scenarios create; they are deleted after the run, and by ``bench reset`` at the latest.
+LOAD_SLUG_PREFIX = f"{SLUG_PREFIX}load-"
+LOAD_CATEGORY_PREFIX = f"{CATEGORY_PREFIX}load-"
+
+
+@dataclass(slots=True)
+class BenchContext:
+    """Ids and slugs the scenarios pick from, read from the database before the run."""
+
+    slugs: list[str]
+    category_slugs: list[str]
+    post_ids: list[int]
+    text_chapters: list[tuple[int, int]]
+    media_ids: list[int]
+    search_terms: list[str]
+    author_id: int | None = None
+    token: str | None = None
+    created_posts: list[int] = field(default_factory=list)
+    created_categories: list[int] = field(default_factory=list)
+    _sequence: itertools.count = field(default_factory=itertools.count)
+
+    def next_name(self, prefix: str) -> str:
+        return f"{prefix}{os.getpid()}-{next(self._sequence)}"
+
+
+@dataclass(slots=True)
+class Request:
+    method: str
+    path: str
+    body: dict | None = None
+
+
+@dataclass(slots=True)
+class Scenario:
+    name: str
+    admin: bool
+    build: Callable[[BenchContext, random.Random], Request]
+    # Statuses other than these count as errors; redirects are fine for media served from elsewhere.
+    ok: tuple[int, ...] = (200,)
+    # Reads the id of what a write created, so it can be removed after the run.
+    created: Callable[[BenchContext, dict], None] | None = None
+
+
+def _post_list(ctx, rng):
+    return Request("GET", "/api/posts")
+
+
+def _posts_by_category(ctx, rng):
+    return Request("GET", f"/api/posts?category={rng.choice(ctx.category_slugs)}")
+
+
+def _search(ctx, rng):
+    return Request("GET", f"/api/posts?search={rng.choice(ctx.search_terms)}")
+
+
+def _post_detail(ctx, rng):
+    return Request("GET", f"/api/posts/{_pick_slug(ctx, rng)}")
+
+
+def _like(ctx, rng):
+    return Request("POST", f"/api/posts/{_pick_slug(ctx, rng)}/like")
+
+
+def _media(ctx, rng):
+    return Request("GET", f"/api/media/{rng.choice(ctx.media_ids)}")
+
+
+def _login(ctx, rng):
+    return Request("POST", "/api/admin/auth/login", {"email": BENCH_EMAIL, "password": "bench"})
+
+
+def _update_post(ctx, rng):
+    return Request("PUT", f"/api/admin/posts/{rng.choice(ctx.post_ids)}", {"reading_time_minutes": rng.randint(2, 15)})
+
+
+def _update_chapter(ctx, rng):
+    post_id, chapter_id = rng.choice(ctx.text_chapters)
+    return Request("PATCH", f"/api/admin/posts/{post_id}/chapters/{chapter_id}", {"caption": f"Revision {rng.random():.6f}"})
+
+
+def _create_post(ctx, rng):
+    slug = ctx.next_name(LOAD_SLUG_PREFIX)
+    return Request(
+        "POST",
+        "/api/admin/posts",
+        {
+            # Owned by the bench user, like the seeded posts, so ``bench reset`` finds leftovers.
+            "author_id": ctx.author_id,
+            "slug": slug,
+            "title": f"Load test {slug}",
+            "status": "DRAFT",
+            "lang": "hr",
+            "chapters": [{"type": "TEXT", "text_content": "Load test chapter."}],
+        },
+    )
+
+
+def _create_category(ctx, rng):
+    slug = ctx.next_name(LOAD_CATEGORY_PREFIX)
+    return Request("POST", "/api/admin/categories", {"slug": slug, "name": slug})
+
+
+def _pick_slug(ctx, rng) -> str:
+    # Skewed towards the first slugs, which are the most visited, like real traffic.
+    return ctx.slugs[min(int(rng.paretovariate(1.2)) - 1, len(ctx.slugs) - 1)]
+
+
+SCENARIOS: dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in (
+        Scenario("posts", False, _post_list),
+        Scenario("posts_by_category", False, _posts_by_category),
+        Scenario("posts_search", False, _search),
+        Scenario("post_detail", False, _post_detail),
+        Scenario("posts_featured", False, lambda ctx, rng: Request("GET", "/api/posts/featured")),
+        Scenario("posts_recent", False, lambda ctx, rng: Request("GET", "/api/posts/recent")),
+        Scenario("posts_popular", False, lambda ctx, rng: Request("GET", "/api/posts/popular")),
+        Scenario("categories", False, lambda ctx, rng: Request("GET", "/api/categories")),
+        Scenario("category_tree", False, lambda ctx, rng: Request("GET", "/api/categories?tree=1")),
+        Scenario("post_like", False, _like, ok=(204,)),
+        Scenario("media", False, _media, ok=(200, 206, 302)),
+        Scenario("admin_login", True, _login),
+        Scenario("admin_posts", True, lambda ctx, rng: Request("GET", "/api/admin/posts")),
+        Scenario("admin_categories", True, lambda ctx, rng: Request("GET", "/api/admin/categories")),
+        Scenario("admin_stats", True, lambda ctx, rng: Request("GET", "/api/admin/stats")),
+        Scenario("admin_media_duplicates", True, lambda ctx, rng: Request("GET", "/api/admin/media/duplicates")),
+        Scenario("admin_post_update", True, _update_post),
+        Scenario("admin_chapter_update", True, _update_chapter),
+        Scenario(
+            "admin_post_create", True, _create_post, ok=(201,), created=lambda ctx, body: ctx.created_posts.append(body["id"])
+        ),
+        Scenario(
+            "admin_category_create",
+            True,
+            _create_category,
+            ok=(201,),
+            created=lambda ctx, body: ctx.created_categories.append(body["id"]),
+        ),
+    )
+}
+
+# Streams every post; slow on big datasets, so it only runs when asked for.
+SCENARIOS["admin_export"] = Scenario("admin_export", True, lambda ctx, rng: Request("GET", "/api/admin/content/export"))
+DEFAULT_SCENARIOS = tuple(name for name in SCENARIOS if name != "admin_export")
+
+
+class WsgiTarget:
+    """Calls the app in-process through one test client per thread: no network, no server needed."""
+
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        self.description = "wsgi"
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, headers: dict, body: bytes | None) -> tuple[int, bytes]:
+        client = getattr(self._local, "client", None)
+        if client is None:
+            client = self._local.client = self.app.test_client()
+        response = client.open(path, method=method, headers=headers, data=body)
+        try:
+            return response.status_code, response.get_data()
+        finally:
+            response.close()
+
+
+class HttpTarget:
+    """Sends requests to a running server over one keep-alive connection per thread."""
+
+    def __init__(self, base_url: str, timeout: float = 30.0) -> None:
+        parts = urlsplit(base_url)
+        if parts.scheme not in {"http", "https"} or not parts.hostname:
+            raise ValueError(f"Not an http(s) URL: {base_url}")
+        self.description = base_url
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._prefix = parts.path.rstrip("/")
+        self._timeout = timeout
+        self._local = threading.local()
+
+    def request(self, method: str, path: str, headers: dict, body: bytes | None) -> tuple[int, bytes]:
+        for attempt in (1, 2):
+            conn = self._connection()
+            try:
+                conn.request(method, self._prefix + path, body=body, headers=headers)
+                response = conn.getresponse()
+                return response.status, response.read()
+            except (ConnectionError, http.client.HTTPException):
+                # The server closed an idle keep-alive connection; retry once on a new one.
+                conn.close()
+                self._local.conn = None
+                if attempt == 2:
+                    raise
+        raise AssertionError("unreachable")
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self._https else http.client.HTTPConnection
+            conn = self._local.conn = cls(self._host, self._port, timeout=self._timeout)
+        return conn
+
+
+def load_context(limit: int = 1000) -> BenchContext:
+    """Collect what the scenarios need from the seeded data; raises ``ValueError`` when there is none."""
+    popular = func.count(Visit.id).label("visits")
+    slugs = db.session.scalars(
+        select(BlogPost.slug)
+        .outerjoin(Visit, Visit.post_id == BlogPost.id)
+        .where(BlogPost.status == "PUBLISHED")
+        .group_by(BlogPost.id, BlogPost.slug)
+        .order_by(popular.desc(), BlogPost.id)
+        .limit(limit)
+    ).all()
+    if not slugs:
+        raise ValueError("No published posts to load test; run `flask bench seed` first")
+
+    author_id = bench_user_id()
+    bench_posts = select(BlogPost.id).where(
+        BlogPost.author_id == author_id, ~BlogPost.slug.startswith(LOAD_SLUG_PREFIX, autoescape=True)
+    )
+    titles = db.session.scalars(select(BlogPost.title).where(BlogPost.slug.in_(slugs[:200]))).all()
+    words = sorted({word.lower() for title in titles for word in title.split() if len(word) > 4})
+    return BenchContext(
+        slugs=list(slugs),
+        category_slugs=list(db.session.scalars(select(Category.slug).order_by(Category.id).limit(limit))) or ["none"],
+        # Admin writes only touch synthetic posts, never real content.
+        post_ids=list(db.session.scalars(bench_posts.order_by(BlogPost.id).limit(limit))),
+        text_chapters=[
+            tuple(row)
+            for row in db.session.execute(
+                select(Chapter.post_id, Chapter.id)
+                .where(Chapter.post_id.in_(bench_posts), Chapter.type == "TEXT")
+                .order_by(Chapter.id)
+                .limit(limit)
+            )
+        ],
+        media_ids=list(
+            db.session.scalars(select(MediaAsset.id).where(MediaAsset.status == "READY").order_by(MediaAsset.id).limit(limit))
+        ),
+        search_terms=words[:100] or ["zdravlje"],
+        author_id=author_id,
+    )
+
+
+def dataset_counts() -> dict[str, int]:
+    counts = {}
+    for name, model in (("posts", BlogPost), ("chapters", Chapter), ("categories", Category), ("media", MediaAsset), ("visits", Visit)):
+        counts[name] = db.session.scalar(select(func.count()).select_from(model))
+    return counts
+
+
+def select_scenarios(names: tuple[str, ...] | list[str], ctx: BenchContext) -> list[Scenario]:
+    """The requested scenarios (all defaults when empty), minus those the dataset cannot feed."""
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    missing = {
+        "media": not ctx.media_ids,
+        "admin_post_update": not ctx.post_ids,
+        "admin_chapter_update": not ctx.text_chapters,
+    }
+    chosen = []
+    for name in names or DEFAULT_SCENARIOS:
+        if missing.get(name):
+            if names:
+                raise ValueError(f"Scenario {name} needs synthetic data; run `flask bench seed` first")
+            continue
+        chosen.append(SCENARIOS[name])
+    return chosen
+
+
+def login(target, password: str = "bench", email: str = BENCH_EMAIL) -> str:
+    status, body = target.request(
+        "POST",
+        "/api/admin/auth/login",
+        {"Content-Type": "application/json"},
+        json.dumps({"email": email, "password": password}).encode(),
+    )
+    if status != 200:
+        raise ValueError(f"Admin login as {email} failed with HTTP {status}: {body[:200]!r}")
+    return json.loads(body)["token"]
+
+
+def run_scenario(
+    target, scenario: Scenario, ctx: BenchContext, requests: int, concurrency: int, warmup: int = 10, seed: int = 0
+) -> dict:
+    """Send ``requests`` requests of one scenario from ``concurrency`` threads and summarise the latencies."""
+    headers = {"Accept": "application/json"}
+    if scenario.admin and ctx.token:
+        headers["Authorization"] = f"Bearer {ctx.token}"
+    counter = itertools.count()
+    statuses: Counter[str] = Counter()
+    latencies: list[float] = []
+    lock = threading.Lock()
+
+    def send(rng: random.Random, record: bool) -> None:
+        req = scenario.build(ctx, rng)
+        request_headers = dict(headers)
+        body = None
+        if req.body is not None:
+            request_headers["Content-Type"] = "application/json"
+            body = json.dumps(req.body).encode()
+        started = time.perf_counter()
+        try:
+            status, payload = target.request(req.method, req.path, request_headers, body)
+        except Exception as exc:  # noqa: BLE001 - a failed request is a result, not a crash
+            status, payload = type(exc).__name__, b""
+        elapsed = (time.perf_counter() - started) * 1000
+        if scenario.created is not None and status in scenario.ok:
+            scenario.created(ctx, json.loads(payload))
+        if record:
+            with lock:
+                latencies.append(elapsed)
+                statuses[str(status)] += 1
+
+    def worker(index: int) -> None:
+        rng = random.Random(f"{seed}-{scenario.name}-{index}")
+        while next(counter) < requests:
+            send(rng, True)
+
+    warmup_rng = random.Random(f"{seed}-{scenario.name}-warmup")
+    for _ in range(warmup):
+        send(warmup_rng, False)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix=f"bench-{scenario.name}") as pool:
+        for future in [pool.submit(worker, index) for index in range(concurrency)]:
+            future.result()
+    wall = time.perf_counter() - started
+
+    ok_codes = {str(code) for code in scenario.ok}
+    return {
+        "requests": len(latencies),
+        "errors": sum(count for status, count in statuses.items() if status not in ok_codes),
+        "statuses": dict(sorted(statuses.items())),
+        "duration_s": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        **_latency_summary(latencies),
+    }
+
+
+def run_benchmark(
+    target,
+    scenarios: list[Scenario],
+    ctx: BenchContext,
+    requests: int,
+    concurrency: int,
+    warmup: int = 10,
+    seed: int = 0,
+    log: Callable[[str], None] = logger.info,
+) -> dict[str, dict]:
+    results = {}
+    for scenario in scenarios:
+        result = results[scenario.name] = run_scenario(target, scenario, ctx, requests, concurrency, warmup, seed)
+        log(format_result_line(scenario.name, result))
+    return results
+
+
+def cleanup(target, ctx: BenchContext) -> None:
+    """Delete the posts and categories the write scenarios created, through the API like any other client."""
+    headers = {"Authorization": f"Bearer {ctx.token}"} if ctx.token else {}
+    for post_id in ctx.created_posts:
+        target.request("DELETE", f"/api/admin/posts/{post_id}", headers, None)
+    for category_id in ctx.created_categories:
+        target.request("DELETE", f"/api/admin/categories/{category_id}", headers, None)
+    ctx.created_posts.clear()
+    ctx.created_categories.clear()
+
+
+def results_document(scenarios: dict[str, dict], parameters: dict, app: Flask, target) -> dict:
+    """Wrap scenario results with what is needed to tell two runs apart later."""
+    return {
+        "version": RESULTS_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": _git_commit(app.root_path),
+        "target": target.description,
+        "database": db.engine.dialect.name,
+        "python": platform.python_version(),
+        "platform": platform.platform(terse=True),
+        "cpu_count": os.cpu_count(),
+        "parameters": parameters,
+        "dataset": dataset_counts(),
+        "scenarios": scenarios,
+    }
+
+
+def compare_results(base: dict, new: dict, threshold: float = 0.10, min_delta_ms: float = 1.0) -> dict:
+    """Per-scenario change between two result documents.
+
+    A scenario regressed when its p95 grew by more than ``threshold`` (a
+    fraction) and by at least ``min_delta_ms``, or when it now has errors.
+    The absolute floor keeps sub-millisecond noise from failing a run.
+    """
+    rows = []
+    for name in sorted(set(base.get("scenarios", {})) | set(new.get("scenarios", {}))):
+        before = base["scenarios"].get(name)
+        after = new["scenarios"].get(name)
+        row = {"scenario": name, "base": before, "new": after, "regressed": False, "reasons": []}
+        if before and after:
+            for metric in ("p50_ms", "p95_ms", "p99_ms", "throughput_rps"):
+                row[f"{metric}_change"] = _change(before.get(metric), after.get(metric))
+            p95_before, p95_after = before.get("p95_ms") or 0.0, after.get("p95_ms") or 0.0
+            if p95_after - p95_before >= min_delta_ms and (row["p95_ms_change"] or 0.0) > threshold:
+                row["reasons"].append(f"p95 {p95_before:.1f} -> {p95_after:.1f} ms")
+            if after.get("errors", 0) > before.get("errors", 0):
+                row["reasons"].append(f"errors {before.get('errors', 0)} -> {after['errors']}")
+            row["regressed"] = bool(row["reasons"])
+        rows.append(row)
+    return {
+        "threshold": threshold,
+        "comparable": _comparable(base, new),
+        "rows": rows,
+        "regressions": [row["scenario"] for row in rows if row["regressed"]],
+    }
+
+
+def format_result_line(name: str, result: dict) -> str:
+    return (
+        f"{name:<24} {result['throughput_rps']:9.1f} req/s  p50 {result['p50_ms']:8.2f}  "
+        f"p95 {result['p95_ms']:8.2f}  p99 {result['p99_ms']:8.2f} ms  errors {result['errors']}"
+    )
+
+
+def _latency_summary(latencies: list[float]) -> dict:
+    if not latencies:
+        return {"mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+    if len(latencies) == 1:
+        cuts = latencies * 99
+    else:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "mean_ms": round(statistics.fmean(latencies), 3),
+        "p50_ms": round(cuts[49], 3),
+        "p95_ms": round(cuts[94], 3),
+        "p99_ms": round(cuts[98], 3),
+        "max_ms": round(max(latencies), 3),
+    }
+
+
+def _change(before: float | None, after: float | None) -> float | None:
+    if not before or after is None:
+        return None
+    return round((after - before) / before, 4)
+
+
+def _comparable(base: dict, new: dict) -> list[str]:
+    """Warnings about differences that make the numbers of two runs hard to compare."""
+    warnings = []
+    for key in ("database", "target", "cpu_count"):
+        if base.get(key) != new.get(key):
+            warnings.append(f"{key} differs: {base.get(key)} vs {new.get(key)}")
+    for key in ("concurrency", "requests"):
+        if base.get("parameters", {}).get(key) != new.get("parameters", {}).get(key):
+            warnings.append(f"{key} differs: {base['parameters'].get(key)} vs {new['parameters'].get(key)}")
+    if base.get("dataset") != new.get("dataset"):
+        warnings.append("dataset sizes differ")
+    return warnings
+
+
+def _git_commit(path: str) -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=path, capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+__all__ = [
+    "DEFAULT_SCENARIOS",
+    "HttpTarget",
+    "SCENARIOS",
+    "WsgiTarget",
+    "cleanup",
+    "compare_results",
+    "format_result_line",
+    "load_context",
+    "login",
+    "results_document",
+    "run_benchmark",
+    "select_scenarios",
+]
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from pathlib import Path
+from typing import Iterable
+
+from flask import current_app
+from sqlalchemy import case, delete, func, select, tuple_, update
+
+from app.extensions import db
+from app.models import BlogPost, Chapter, MediaAsset, MediaDerivative, Profile
+from app.services.media_cache import get_media_cache
+from app.services.storage import GoogleDriveStorage, StorageError, drive_file_id, get_storage_backend, local_media_path
+
+
+logger = logging.getLogger(__name__)
+
+# Every column that points at a media asset; merging repoints them all.
+MEDIA_REFERENCES = (
+    BlogPost.hero_media_id,
+    Chapter.media_id,
+    MediaAsset.thumbnail_media_id,
+    Profile.avatar_media_id,
+    MediaDerivative.media_id,
+)
+_MERGE_BATCH_SIZE = 500
+
+
+def media_file_path(asset: MediaAsset) -> Path | None:
+    """Local file holding the asset's bytes, fetching Drive objects into the disk cache when it is enabled."""
+    if asset.storage_provider == "LOCAL":
+        path = local_media_path(current_app.config, asset.storage_path)
+        return path if path.is_file() else None
+
+    if asset.storage_provider != "GDRIVE":
+        return None
+    cache = get_media_cache()
+    if cache is None:
+        return None
+    storage = get_storage_backend(current_app.config)
+    if not isinstance(storage, GoogleDriveStorage):
+        return None
+
+    key = asset.checksum or f"gdrive-{drive_file_id(asset.storage_path)}"
+    return cache.get_or_fetch(key, lambda file_handle: storage.download(asset.storage_path, file_handle))
+
+
+def find_duplicate(checksum: str, size: int) -> MediaAsset | None:
+    """Return the oldest stored asset with identical content, if one was uploaded before.
+
+    Only ``READY`` assets count: a ``PENDING`` one may still fail to reach storage.
+    """
+    return db.session.scalar(
+        select(MediaAsset)
+        .where(MediaAsset.checksum == checksum, MediaAsset.bytes == size, MediaAsset.status == "READY")
+        .order_by(MediaAsset.id)
+        .limit(1)
+    )
+
+
+def duplicate_groups(checksums: Iterable[str] | None = None, limit: int | None = None) -> list[dict]:
+    """Group assets sharing ``(checksum, bytes)``; the oldest asset of a group is its canonical copy."""
+    groups_query = (
+        select(MediaAsset.checksum, MediaAsset.bytes)
+        .where(MediaAsset.checksum.is_not(None), MediaAsset.status == "READY")
+        .group_by(MediaAsset.checksum, MediaAsset.bytes)
+        .having(func.count(MediaAsset.id) > 1)
+        .order_by(MediaAsset.checksum, MediaAsset.bytes)
+    )
+    if checksums is not None:
+        groups_query = groups_query.where(MediaAsset.checksum.in_(sorted(set(checksums))))
+    if limit is not None:
+        groups_query = groups_query.limit(limit)
+
+    keys = db.session.execute(groups_query).all()
+    if not keys:
+        return []
+
+    members: dict[tuple, list[int]] = defaultdict(list)
+    rows = db.session.execute(
+        select(MediaAsset.checksum, MediaAsset.bytes, MediaAsset.id)
+        .where(
+            tuple_(MediaAsset.checksum, MediaAsset.bytes).in_([tuple(key) for key in keys]),
+            MediaAsset.status == "READY",
+        )
+        .order_by(MediaAsset.id)
+    )
+    for checksum, size, media_id in rows:
+        members[(checksum, size)].append(media_id)
+
+    return [
+        {
+            "checksum": checksum,
+            "bytes": size,
+            "canonical_id": members[(checksum, size)][0],
+            "duplicate_ids": members[(checksum, size)][1:],
+        }
+        for checksum, size in keys
+    ]
+
+
+def posts_referencing(media_ids: list[int]) -> list[str]:
+    """Slugs of posts whose hero image or chapters use any of ``media_ids``."""
+    if not media_ids:
+        return []
+    chapter_posts = select(Chapter.post_id).where(Chapter.media_id.in_(media_ids))
+    return list(
+        db.session.scalars(
+            select(BlogPost.slug).where(BlogPost.hero_media_id.in_(media_ids) | BlogPost.id.in_(chapter_posts))
+        )
+    )
+
+
+def merge_duplicates(groups: list[dict]) -> dict:
+    """Repoint references to each group's canonical asset and delete the other rows.
+
+    Renditions generated for a duplicate are deleted with it unless another
+    asset still uses them; the canonical asset keeps (or regenerates) its own.
+    Returns the removed ids and the ``(provider, path)`` storage objects no
+    remaining row points at, to pass to :func:`delete_stored_objects` once the
+    transaction has committed.
+    """
+    canonical_by_id = {
+        duplicate_id: group["canonical_id"] for group in groups for duplicate_id in group["duplicate_ids"]
+    }
+    duplicate_ids = sorted(canonical_by_id)
+    rendition_ids: set[int] = set()
+    objects: set[tuple[str, str]] = set()
+
+    for batch in _batches(duplicate_ids):
+        mapping = {media_id: canonical_by_id[media_id] for media_id in batch}
+        rendition_ids.update(
+            db.session.scalars(select(MediaDerivative.media_id).where(MediaDerivative.source_media_id.in_(batch)))
+        )
+        objects.update(_storage_objects(batch))
+        db.session.execute(
+            delete(MediaDerivative)
+            .where(MediaDerivative.source_media_id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+        for column in MEDIA_REFERENCES:
+            db.session.execute(
+                update(column.class_)
+                .where(column.in_(batch))
+                .values({column.key: case(mapping, value=column)})
+                .execution_options(synchronize_session=False)
+            )
+        db.session.execute(
+            delete(MediaAsset).where(MediaAsset.id.in_(batch)).execution_options(synchronize_session=False)
+        )
+
+    # Identical sources render identical files, so renditions are often shared with the canonical asset.
+    orphaned_renditions = sorted(rendition_ids - set(duplicate_ids) - _referenced(sorted(rendition_ids)))
+    for batch in _batches(orphaned_renditions):
+        objects.update(_storage_objects(batch))
+        db.session.execute(
+            delete(MediaAsset).where(MediaAsset.id.in_(batch)).execution_options(synchronize_session=False)
+        )
+
+    return {
+        "removed_media_ids": duplicate_ids,
+        "removed_rendition_ids": orphaned_renditions,
+        # Content-addressed storage gives identical uploads one shared object.
+        "orphaned_objects": sorted(objects - _objects_in_use(sorted(objects))),
+    }
+
+
+def delete_stored_objects(objects: Iterable[tuple[str, str]]) -> int:
+    """Delete ``(provider, path)`` objects from the configured backend; failures are logged, not raised."""
+    storage = get_storage_backend(current_app.config)
+    deleted = 0
+    for provider, path in objects:
+        if provider != storage.provider:
+            logger.info("Leaving %s object %s in place; the %s backend is configured", provider, path, storage.provider)
+            continue
+        try:
+            storage.delete(path)
+        except StorageError as exc:
+            logger.warning("Could not delete orphaned media object %s: %s", path, exc)
+            continue
+        deleted += 1
+    return deleted
+
+
+def _batches(ids: list[int]) -> Iterable[list[int]]:
+    for start in range(0, len(ids), _MERGE_BATCH_SIZE):
+        yield ids[start : start + _MERGE_BATCH_SIZE]
+
+
+def _storage_objects(media_ids: list[int]) -> set[tuple[str, str]]:
+    rows = db.session.execute(
+        select(MediaAsset.storage_provider, MediaAsset.storage_path).where(MediaAsset.id.in_(media_ids))
+    )
+    return {(provider, path) for provider, path in rows if provider and path}
+
+
+def _referenced(media_ids: list[int]) -> set[int]:
+    referenced: set[int] = set()
+    for batch in _batches(media_ids):
+        for column in MEDIA_REFERENCES:
+            referenced.update(db.session.scalars(select(column).where(column.in_(batch))))
+    return referenced
+
+
+def _objects_in_use(objects: list[tuple[str, str]]) -> set[tuple[str, str]]:
+    in_use: set[tuple[str, str]] = set()
+    for start in range(0, len(objects), _MERGE_BATCH_SIZE):
+        batch = objects[start : start + _MERGE_BATCH_SIZE]
+        in_use.update(
+            tuple(row)
+            for row in db.session.execute(
+                select(MediaAsset.storage_provider, MediaAsset.storage_path).where(
+                    tuple_(MediaAsset.storage_provider, MediaAsset.storage_path).in_(batch)
+                )
+            )
+        )
+    return in_use
+
+
+__all__ = [
+    "MEDIA_REFERENCES",
+    "delete_stored_objects",
+    "duplicate_groups",
+    "find_duplicate",
+    "media_file_path",
+    "merge_duplicates",
+    "posts_referencing",
+]
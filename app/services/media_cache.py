@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import BinaryIO, Callable
+
+from flask import Flask, current_app
+
+
+logger = logging.getLogger(__name__)
+
+
+class MediaDiskCache:
+    """Size-bounded LRU of remote media objects on local disk.
+
+    Objects are fetched once through ``fetch`` into a temporary file and renamed
+    into place, after which they are served like any local file. When the total
+    size goes over ``max_bytes`` the least recently served files are removed.
+    """
+
+    def __init__(self, root: str | Path, max_bytes: int) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self._tmp_dir = self.root / ".tmp"
+        self._tmp_dir.mkdir(parents=True, exist_ok=True)
+        self._entries: OrderedDict[str, int] = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._load()
+
+    def get_or_fetch(self, key: str, fetch: Callable[[BinaryIO], None]) -> Path:
+        """Return the cached file for ``key``, calling ``fetch(file)`` to fill it on a miss."""
+        path = self._path(key)
+        if self._touch(key, path):
+            return path
+
+        # One download per key; concurrent requests for the same object wait for it.
+        with self._key_lock(key):
+            if self._touch(key, path):
+                return path
+
+            try:
+                with self._lock:
+                    self._stats["misses"] += 1
+                self._download(path, fetch)
+                self._add(key, path.stat().st_size)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+        return path
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._size, "max_bytes": self.max_bytes}
+
+    def _download(self, path: Path, fetch: Callable[[BinaryIO], None]) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=self._tmp_dir)
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                fetch(tmp)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _touch(self, key: str, path: Path) -> bool:
+        with self._lock:
+            if key not in self._entries:
+                return False
+            if not path.exists():
+                # Evicted by another worker sharing the directory.
+                self._size -= self._entries.pop(key)
+                return False
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return True
+
+    def _add(self, key: str, size: int) -> None:
+        evicted = []
+        with self._lock:
+            self._size += size - self._entries.pop(key, 0)
+            self._entries[key] = size
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._size -= old_size
+                self._stats["evictions"] += 1
+                evicted.append(old_key)
+        for old_key in evicted:
+            try:
+                os.unlink(self._path(old_key))
+            except FileNotFoundError:
+                pass
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _load(self) -> None:
+        """Rebuild the LRU order from modification times, which :meth:`_touch` keeps current."""
+        files = []
+        for shard in self.root.iterdir():
+            if shard.name.startswith(".") or not shard.is_dir():
+                continue
+            for entry in os.scandir(shard):
+                if entry.is_file():
+                    stat = entry.stat()
+                    files.append((stat.st_mtime, entry.name, stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self._size += size
+
+
+def init_media_cache(app: Flask) -> MediaDiskCache | None:
+    max_bytes = int(app.config.get("MEDIA_CACHE_MAX_BYTES") or 0)
+    cache = None
+    if max_bytes > 0:
+        root = app.config.get("MEDIA_CACHE_DIR") or os.path.join(app.instance_path, "media-cache")
+        try:
+            cache = MediaDiskCache(root, max_bytes)
+        except OSError:
+            logger.exception("Media cache directory %s is not usable; serving remote media by redirect", root)
+    app.extensions["media_cache"] = cache
+    return cache
+
+
+def get_media_cache() -> MediaDiskCache | None:
+    return current_app.extensions.get("media_cache")
+
+
+__all__ = ["MediaDiskCache", "get_media_cache", "init_media_cache"]
@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+from typing import Iterable
+
+from app.extensions import db
+from app.models import PostMetricsDaily
+from app.utils.sql import dialect_insert
+
+
+METRIC_COUNTERS = ("views", "unique_sessions", "likes", "shares")
+
+
+def increment_daily_metrics(rows: Iterable[dict]) -> None:
+    """Add counter deltas to ``post_metrics_daily`` with one ``INSERT ... ON CONFLICT DO UPDATE``.
+
+    Each row holds ``post_id``, ``date`` and any subset of :data:`METRIC_COUNTERS`.
+    The increment happens inside the statement, so concurrent workers never lose updates.
+    """
+    values = [
+        {"post_id": row["post_id"], "date": row["date"], **{name: row.get(name, 0) for name in METRIC_COUNTERS}}
+        for row in rows
+    ]
+    if not values:
+        return
+
+    table = PostMetricsDaily.__table__
+    stmt = dialect_insert(table).values(values)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.post_id, table.c.date],
+        set_={name: table.c[name] + stmt.excluded[name] for name in METRIC_COUNTERS},
+    )
+    db.session.execute(stmt)
+
+
+def increment_post_metric(post_id: int, counter: str, amount: int = 1, day: date | None = None) -> None:
+    if counter not in METRIC_COUNTERS:
+        raise ValueError(f"Unknown metric counter {counter!r}")
+    increment_daily_metrics([{"post_id": post_id, "date": day or datetime.utcnow().date(), counter: amount}])
+
+
+__all__ = ["METRIC_COUNTERS", "increment_daily_metrics", "increment_post_metric"]
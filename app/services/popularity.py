@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+from typing import Mapping
+
+from sqlalchemy import case, func, literal, select, update
+
+from app.extensions import db
+from app.models import PostMetricsDaily, PostPopularity
+from app.utils.sql import dialect_insert
+
+
+# Window name -> (column, length in days); ``None`` means all time.
+POPULARITY_WINDOWS = {
+    "7d": ("views_7d", 7),
+    "30d": ("views_30d", 30),
+    "90d": ("views_90d", 90),
+    "all": ("views_total", None),
+}
+_LONGEST_WINDOW = max(days for _, days in POPULARITY_WINDOWS.values() if days)
+# PostgreSQL advisory lock taken by the scheduled refresh, so only one worker runs it.
+_REFRESH_LOCK_KEY = 0x706F7075
+
+
+def popularity_column(window: str):
+    if window not in POPULARITY_WINDOWS:
+        raise ValueError(f"window must be one of {', '.join(POPULARITY_WINDOWS)}")
+    return getattr(PostPopularity, POPULARITY_WINDOWS[window][0])
+
+
+def increment_popularity(views_by_post: Mapping[int, int]) -> None:
+    """Add freshly counted views to every window in a single upsert."""
+    rows = [
+        {"post_id": post_id, **{column: views for column, _ in POPULARITY_WINDOWS.values()}}
+        for post_id, views in views_by_post.items()
+        if views
+    ]
+    if not rows:
+        return
+
+    table = PostPopularity.__table__
+    stmt = dialect_insert(table).values([{**row, "refreshed_at": datetime.utcnow()} for row in rows])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.post_id],
+        set_={column: table.c[column] + stmt.excluded[column] for column, _ in POPULARITY_WINDOWS.values()},
+    )
+    db.session.execute(stmt)
+
+
+def refresh_popularity(today: date | None = None, full: bool = False) -> None:
+    """Recompute the rolling windows so days that fell out of them stop counting.
+
+    Only the last 90 days of ``post_metrics_daily`` are read, plus the full
+    history of posts that have no row yet, so their all-time total starts out
+    right. ``full`` rebuilds every all-time total from the complete history,
+    which is meant for backfills; a first run on an empty table implies it.
+    """
+    today = today or datetime.utcnow().date()
+    now = datetime.utcnow()
+    horizon = today - timedelta(days=_LONGEST_WINDOW)
+    table = PostPopularity.__table__
+    full = full or db.session.scalar(select(PostPopularity.post_id).limit(1)) is None
+
+    totals = select(PostMetricsDaily.post_id, func.sum(PostMetricsDaily.views), literal(now)).group_by(
+        PostMetricsDaily.post_id
+    )
+    if not full:
+        unranked = select(PostMetricsDaily.post_id).where(PostMetricsDaily.date > horizon).except_(
+            select(PostPopularity.post_id)
+        )
+        totals = totals.where(PostMetricsDaily.post_id.in_(unranked))
+    stmt = dialect_insert(table).from_select(["post_id", "views_total", "refreshed_at"], totals)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.post_id],
+        set_={"views_total": stmt.excluded.views_total, "refreshed_at": stmt.excluded.refreshed_at},
+    )
+    db.session.execute(stmt)
+
+    def window_sum(days: int):
+        return func.coalesce(
+            func.sum(case((PostMetricsDaily.date > today - timedelta(days=days), PostMetricsDaily.views), else_=0)), 0
+        )
+
+    window_columns = [column for column, days in POPULARITY_WINDOWS.values() if days]
+    recent = (
+        select(
+            PostMetricsDaily.post_id,
+            *[window_sum(days) for _, days in POPULARITY_WINDOWS.values() if days],
+            literal(now),
+        )
+        .where(PostMetricsDaily.date > horizon)
+        .group_by(PostMetricsDaily.post_id)
+    )
+    stmt = dialect_insert(table).from_select(["post_id", *window_columns, "refreshed_at"], recent)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[table.c.post_id],
+        set_={**{column: stmt.excluded[column] for column in window_columns}, "refreshed_at": stmt.excluded.refreshed_at},
+    )
+    db.session.execute(stmt)
+
+    active = select(PostMetricsDaily.post_id).where(PostMetricsDaily.date > horizon)
+    db.session.execute(
+        update(PostPopularity)
+        .where(PostPopularity.views_90d > 0, PostPopularity.post_id.not_in(active))
+        .values(**{column: 0 for column in window_columns}, refreshed_at=now)
+    )
+    db.session.commit()
+
+
+def popularity_is_stale(today: date | None = None) -> bool:
+    """Whether a row still counts views from before ``today`` that a refresh could have aged out."""
+    today = today or datetime.utcnow().date()
+    stale = select(PostPopularity.post_id).where(
+        PostPopularity.views_90d > 0, PostPopularity.refreshed_at < datetime(today.year, today.month, today.day)
+    )
+    return db.session.scalar(stale.limit(1)) is not None
+
+
+def refresh_popularity_if_stale(today: date | None = None) -> bool:
+    """Refresh unless that already happened today or another worker is doing it; returns whether it ran."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        # Released when the refresh commits; the loser sees fresh rows on its next check.
+        if not db.session.scalar(select(func.pg_try_advisory_xact_lock(_REFRESH_LOCK_KEY))):
+            db.session.rollback()
+            return False
+    if not popularity_is_stale(today):
+        db.session.rollback()
+        return False
+    refresh_popularity(today)
+    return True
+
+
+__all__ = [
+    "POPULARITY_WINDOWS",
+    "increment_popularity",
+    "popularity_column",
+    "popularity_is_stale",
+    "refresh_popularity",
+    "refresh_popularity_if_stale",
+]
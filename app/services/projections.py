@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Iterable, Sequence
+
+from sqlalchemy import Select, select
+
+from app.extensions import db
+from app.models import BlogPost, Category, Chapter, MediaAsset, MediaDerivative, PostCategory
+from app.schemas import BlogPostSchema
+from app.schemas.blog import HERO_MEDIA_FIELDS
+from app.schemas.fast import CompiledSchema, compile_schema
+
+
+# Columns list views need for a card: title, link, teaser, hero image and date.
+SUMMARY_FIELDS = ("id", "slug", "title", "summary", "hero_media_id", "hero_media", "published_at")
+RELATION_FIELDS = ("chapters", "categories", "hero_media")
+POST_FIELDS = tuple(name for name, field in BlogPostSchema().fields.items() if not field.load_only)
+COLUMN_FIELDS = tuple(name for name in POST_FIELDS if name not in RELATION_FIELDS)
+
+def parse_fields(raw: str | None, view: str | None, default_view: str) -> tuple[str, ...] | None:
+    """Resolve ``fields=``/``view=`` into the fields to return; ``None`` means the full representation."""
+    if raw:
+        requested = [name.strip() for name in raw.split(",") if name.strip()]
+        unknown = sorted(set(requested) - set(POST_FIELDS))
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return tuple(dict.fromkeys(["id", *requested]))
+
+    view = view or default_view
+    if view == "full":
+        return None
+    if view == "summary":
+        return SUMMARY_FIELDS
+    raise ValueError("view must be 'summary' or 'full'")
+
+
+def projection_columns(fields: Sequence[str]) -> list:
+    return [getattr(BlogPost, name) for name in fields if name in COLUMN_FIELDS]
+
+
+def project_posts(query: Select, fields: Sequence[str], extra_columns: Iterable = ()) -> tuple[list[dict], list[tuple]]:
+    """Run ``query`` selecting only the columns behind ``fields`` and dump the rows.
+
+    Relationship fields are filled from one batched query each. Values of
+    ``extra_columns`` (e.g. a keyset sort key) are returned alongside.
+    """
+    columns = projection_columns(fields)
+    if "hero_media" in fields and "hero_media_id" not in fields:
+        columns.append(BlogPost.hero_media_id)
+    extra_columns = list(extra_columns)
+    rows = db.session.execute(query.with_only_columns(*columns, *extra_columns)).all()
+
+    records = [dict(zip((column.key for column in columns), row[: len(columns)])) for row in rows]
+    extras = [tuple(row[len(columns):]) for row in rows]
+
+    post_ids = [record["id"] for record in records]
+    if "chapters" in fields:
+        chapters = _chapters_by_post(post_ids)
+        for record in records:
+            record["chapters"] = chapters.get(record["id"], [])
+    if "categories" in fields:
+        categories = _categories_by_post(post_ids)
+        for record in records:
+            record["categories"] = categories.get(record["id"], [])
+    if "hero_media" in fields:
+        media = _media_by_id([record["hero_media_id"] for record in records if record["hero_media_id"]])
+        for record in records:
+            record["hero_media"] = media.get(record["hero_media_id"])
+
+    return dump_fields(records, fields), extras
+
+
+def dump_fields(records: list[Any], fields: Sequence[str]) -> list[dict]:
+    return _fields_schema(tuple(fields)).dump(records)
+
+
+@lru_cache(maxsize=128)
+def _fields_schema(fields: tuple[str, ...]) -> CompiledSchema:
+    return compile_schema(BlogPostSchema(only=fields, many=True))
+
+
+def _chapters_by_post(post_ids: list[int]) -> dict[int, list[dict]]:
+    if not post_ids:
+        return {}
+    columns = [column for column in Chapter.__table__.columns]
+    rows = db.session.execute(
+        select(*columns).where(Chapter.post_id.in_(post_ids)).order_by(Chapter.post_id, Chapter.position)
+    ).mappings()
+    chapters: dict[int, list[dict]] = defaultdict(list)
+    for row in rows:
+        chapters[row["post_id"]].append(dict(row))
+    return chapters
+
+
+def _categories_by_post(post_ids: list[int]) -> dict[int, list[dict]]:
+    if not post_ids:
+        return {}
+    rows = db.session.execute(
+        select(PostCategory.post_id, Category.slug)
+        .join(Category, Category.id == PostCategory.category_id)
+        .where(PostCategory.post_id.in_(post_ids))
+    )
+    categories: dict[int, list[dict]] = defaultdict(list)
+    for post_id, slug in rows:
+        categories[post_id].append({"slug": slug})
+    return categories
+
+
+def _media_by_id(media_ids: list[int]) -> dict[int, dict]:
+    if not media_ids:
+        return {}
+    media_ids = sorted(set(media_ids))
+    columns = [getattr(MediaAsset, name) for name in HERO_MEDIA_FIELDS if name != "derivatives"]
+    rows = db.session.execute(select(*columns).where(MediaAsset.id.in_(media_ids))).mappings()
+    media = {row["id"]: dict(row, derivatives=[]) for row in rows}
+    rows = db.session.execute(
+        select(
+            MediaDerivative.source_media_id,
+            MediaDerivative.media_id,
+            MediaDerivative.variant,
+            MediaDerivative.width,
+            MediaDerivative.height,
+        )
+        .where(MediaDerivative.source_media_id.in_(media_ids))
+        .order_by(MediaDerivative.source_media_id, MediaDerivative.width)
+    ).mappings()
+    for row in rows:
+        media[row["source_media_id"]]["derivatives"].append(dict(row))
+    return media
+
+
+__all__ = [
+    "COLUMN_FIELDS",
+    "POST_FIELDS",
+    "SUMMARY_FIELDS",
+    "dump_fields",
+    "parse_fields",
+    "project_posts",
+    "projection_columns",
+]
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Iterator
+
+from flask import Flask, Response, current_app, g, has_app_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+
+logger = logging.getLogger(__name__)
+
+# Set on admin write responses; browsers holding it read from the primary until it expires.
+PRIMARY_COOKIE = "read_primary"
+# Any client can send this header to read its own writes.
+PRIMARY_HEADER = "X-Read-Primary"
+
+# A caught-up standby reports no lag even when the primary has been idle for a while.
+_LAG_QUERY = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE coalesce(extract(epoch FROM now() - pg_last_xact_replay_timestamp()), 0) END"
+)
+_READ_METHODS = frozenset({"GET", "HEAD"})
+
+
+class RoutingSession(Session):
+    """``db.session`` that sends plain ``SELECT``s of public read requests to a replica.
+
+    Only requests that picked a replica (see :func:`route_public_reads`) are
+    affected. Writes, ``SELECT ... FOR UPDATE``, textual SQL and everything
+    during a flush keep going to the primary, so one session may hold a
+    connection to each within the same request.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and _is_plain_read(clause) and has_app_context():
+            replica = g.get("read_replica")
+            if replica is not None:
+                return replica.engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class Replica:
+    def __init__(self, name: str, engine: Engine) -> None:
+        self.name = name
+        self.engine = engine
+        self.healthy = True
+        self.lag: float | None = None
+        self.checked_at: float | None = None
+        self.error: str | None = None
+        self.checking = threading.Lock()
+
+
+class ReplicaRouter:
+    """Round-robins public reads over the ``SQLALCHEMY_REPLICA_URIS`` engines.
+
+    Each replica is health checked at most every ``REPLICA_HEALTH_INTERVAL``
+    seconds, on the request that picks it: a ``SELECT 1``, or on PostgreSQL the
+    replay lag, which must stay within ``REPLICA_MAX_LAG``. A connection error
+    on a replica takes it out of rotation until the next check passes. When no
+    replica is healthy, reads fall back to the primary.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        uris = app.config.get("SQLALCHEMY_REPLICA_URIS") or ()
+        if isinstance(uris, str):
+            uris = [uri.strip() for uri in uris.split(",") if uri.strip()]
+        defaults = dict(app.config.get("SQLALCHEMY_REPLICA_ENGINE_OPTIONS") or {})
+        defaults.setdefault("echo", bool(app.config.get("SQLALCHEMY_ECHO", False)))
+
+        self.replicas: list[Replica] = []
+        for index, entry in enumerate(uris):
+            options = {**defaults, **(entry if isinstance(entry, dict) else {"url": entry})}
+            engine = create_engine(options.pop("url"), **options)
+            replica = Replica(f"replica-{index}", engine)
+            event.listen(engine, "handle_error", self._error_listener(replica))
+            self.replicas.append(replica)
+
+        self.health_interval = max(float(app.config.get("REPLICA_HEALTH_INTERVAL", 10)), 0.0)
+        max_lag = app.config.get("REPLICA_MAX_LAG", 30)
+        self.max_lag = float(max_lag) if max_lag is not None else None
+        self.sticky_seconds = int(app.config.get("REPLICA_STICKY_SECONDS", 5))
+        self._next = 0
+        self._lock = threading.Lock()
+        self._counters = Counter()
+
+    def pick(self) -> Replica | None:
+        """The next healthy replica in rotation, or ``None`` to read from the primary."""
+        if not self.replicas:
+            return None
+        with self._lock:
+            start = self._next
+            self._next = (start + 1) % len(self.replicas)
+
+        now = time.monotonic()
+        for offset in range(len(self.replicas)):
+            replica = self.replicas[(start + offset) % len(self.replicas)]
+            if replica.checked_at is None or now - replica.checked_at >= self.health_interval:
+                self.check(replica)
+            if replica.healthy:
+                self._count(replica.name)
+                return replica
+        self._count("primary_fallbacks")
+        return None
+
+    def check(self, replica: Replica) -> bool:
+        # Only one thread checks a replica; the others go on with its last known state.
+        if not replica.checking.acquire(blocking=False):
+            return replica.healthy
+        try:
+            with replica.engine.connect() as conn:
+                if conn.dialect.name == "postgresql":
+                    replica.lag = float(conn.scalar(_LAG_QUERY))
+                else:
+                    conn.execute(text("SELECT 1"))
+                    replica.lag = 0.0
+            too_far_behind = self.max_lag is not None and replica.lag > self.max_lag
+            replica.error = f"replication lag {replica.lag:.1f}s" if too_far_behind else None
+            self._set_health(replica, not too_far_behind)
+        except SQLAlchemyError as exc:
+            replica.error = str(getattr(exc, "orig", None) or exc).strip()
+            self._set_health(replica, False)
+        finally:
+            replica.checked_at = time.monotonic()
+            replica.checking.release()
+        return replica.healthy
+
+    def check_all(self) -> dict[str, bool]:
+        return {replica.name: self.check(replica) for replica in self.replicas}
+
+    def dispose(self) -> None:
+        for replica in self.replicas:
+            replica.engine.dispose()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "primary_fallbacks": counters.get("primary_fallbacks", 0),
+            "replicas": [
+                {
+                    "name": replica.name,
+                    "url": replica.engine.url.render_as_string(hide_password=True),
+                    "healthy": replica.healthy,
+                    "lag_seconds": replica.lag,
+                    "error": replica.error,
+                    "reads": counters.get(replica.name, 0),
+                }
+                for replica in self.replicas
+            ],
+        }
+
+    def _set_health(self, replica: Replica, healthy: bool) -> None:
+        if healthy != replica.healthy:
+            if healthy:
+                logger.info("Read replica %s is back in rotation", replica.name)
+            else:
+                logger.warning("Read replica %s taken out of rotation: %s", replica.name, replica.error)
+        replica.healthy = healthy
+
+    def _error_listener(self, replica: Replica):
+        def on_error(context) -> None:
+            # Connection failures and dropped connections, not ordinary SQL errors.
+            if context.is_disconnect or context.connection is None:
+                replica.error = str(context.original_exception).strip()
+                replica.checked_at = time.monotonic()
+                self._set_health(replica, False)
+
+        return on_error
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self._counters[name] += 1
+
+
+def route_public_reads() -> None:
+    """``before_request`` hook that pins a public read request to one replica."""
+    router = get_replica_router()
+    if not router.replicas or request.method not in _READ_METHODS or wants_primary():
+        return
+    replica = router.pick()
+    if replica is not None:
+        g.read_replica = replica
+
+
+def remember_writes(response: Response) -> Response:
+    """``after_request`` hook that sends the writing client's next reads to the primary."""
+    router = get_replica_router()
+    if (
+        router.replicas
+        and router.sticky_seconds > 0
+        and request.method not in _READ_METHODS
+        and request.method != "OPTIONS"
+        and response.status_code < 400
+    ):
+        response.set_cookie(PRIMARY_COOKIE, "1", max_age=router.sticky_seconds, httponly=True, samesite="Lax")
+    return response
+
+
+def wants_primary() -> bool:
+    if request.cookies.get(PRIMARY_COOKIE) == "1":
+        return True
+    return request.headers.get(PRIMARY_HEADER, "").lower() in {"1", "true", "yes"}
+
+
+@contextmanager
+def use_primary() -> Iterator[None]:
+    """Send every query inside the block to the primary, e.g. to re-read a row just written."""
+    replica = g.pop("read_replica", None) if has_app_context() else None
+    try:
+        yield
+    finally:
+        if replica is not None:
+            g.read_replica = replica
+
+
+def _is_plain_read(clause) -> bool:
+    return clause is not None and clause.is_select and getattr(clause, "_for_update_arg", None) is None
+
+
+def init_read_replicas(app: Flask) -> ReplicaRouter:
+    router = ReplicaRouter(app)
+    app.extensions["read_replicas"] = router
+    return router
+
+
+def get_replica_router() -> ReplicaRouter:
+    return current_app.extensions["read_replicas"]
+
+
+__all__ = [
+    "PRIMARY_COOKIE",
+    "PRIMARY_HEADER",
+    "ReplicaRouter",
+    "RoutingSession",
+    "get_replica_router",
+    "init_read_replicas",
+    "remember_writes",
+    "route_public_reads",
+    "use_primary",
+    "wants_primary",
+]
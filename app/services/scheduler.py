@@ -0,0 +1,262 @@
+from __future__ import annotations
+
+import atexit
+import heapq
+import logging
+import os
+import threading
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Callable
+
+from flask import Flask, current_app
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.models import BlogPost
+from app.services.cache import get_response_cache, post_tag
+from app.services.popularity import refresh_popularity_if_stale
+from app.services.visit_partitions import premake_partitions
+
+
+logger = logging.getLogger(__name__)
+
+# How long a worker that lost the advisory lock waits before trying again.
+_LOCK_RETRY_SECONDS = 1.0
+
+
+def publish_due_posts(now: datetime | None = None, lock_key: int | None = None) -> list[str] | None:
+    """Publish every ``SCHEDULED`` post that is due with one ``UPDATE ... RETURNING``.
+
+    Returns the slugs of the published posts, or ``None`` when another worker
+    holds the advisory lock (PostgreSQL only) and is publishing right now.
+    Commits the transaction and invalidates the affected cached responses.
+    """
+    now = now or datetime.now(timezone.utc)
+    if lock_key is not None and db.session.get_bind().dialect.name == "postgresql":
+        # Released with the transaction, so a crashed worker never leaves it behind.
+        if not db.session.scalar(select(func.pg_try_advisory_xact_lock(lock_key))):
+            db.session.rollback()
+            return None
+
+    stmt = (
+        update(BlogPost)
+        .where(BlogPost.status == "SCHEDULED", BlogPost.scheduled_for <= now)
+        .values(status="PUBLISHED", published_at=func.coalesce(BlogPost.published_at, BlogPost.scheduled_for))
+        .returning(BlogPost.id, BlogPost.slug)
+        .execution_options(synchronize_session=False)
+    )
+    published = db.session.execute(stmt).all()
+    db.session.commit()
+
+    slugs = [slug for _, slug in published]
+    if slugs:
+        get_response_cache().invalidate("posts", *(post_tag(slug) for slug in slugs))
+        logger.info("Published %d scheduled posts: %s", len(slugs), ", ".join(slugs))
+    return slugs
+
+
+def upcoming_posts(limit: int) -> list[tuple[int, str, datetime]]:
+    """The next ``limit`` scheduled posts, read through the ``(status, scheduled_for)`` index."""
+    rows = db.session.execute(
+        select(BlogPost.id, BlogPost.slug, BlogPost.scheduled_for)
+        .where(BlogPost.status == "SCHEDULED")
+        .order_by(BlogPost.scheduled_for)
+        .limit(limit)
+    ).all()
+    return [(post_id, slug, _as_utc(scheduled_for)) for post_id, slug, scheduled_for in rows]
+
+
+class PostScheduler:
+    """Publishes scheduled posts when they fall due.
+
+    A background thread keeps a min-heap of upcoming ``scheduled_for`` times and
+    sleeps until the earliest one. Admin writes in this process push their
+    schedule onto the heap right away; changes made elsewhere are picked up
+    when the heap is reloaded every ``SCHEDULER_RELOAD_INTERVAL`` seconds.
+    Every worker runs its own thread, and a PostgreSQL advisory lock keeps
+    them from publishing the same batch twice.
+
+    The same thread runs the maintenance tasks (aging views out of the
+    popularity windows, premaking visit partitions) after every UTC midnight and every
+    ``SCHEDULER_MAINTENANCE_INTERVAL`` seconds; each task decides for itself
+    whether there is anything to do.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        mode = app.config.get("SCHEDULER_MODE") or ("off" if app.testing else "thread")
+        self.enabled = mode == "thread"
+        self.reload_interval = max(float(app.config.get("SCHEDULER_RELOAD_INTERVAL", 60)), 1.0)
+        self.heap_size = max(int(app.config.get("SCHEDULER_HEAP_SIZE", 1000)), 1)
+        self.lock_key = int(app.config.get("SCHEDULER_ADVISORY_LOCK_KEY", 0x626C6F67))
+        self.maintenance_interval = max(float(app.config.get("SCHEDULER_MAINTENANCE_INTERVAL", 3600)), 1.0)
+        self.maintenance_tasks: list[tuple[str, Callable[[], object]]] = []
+        self._heap: list[tuple[datetime, int]] = []
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._counters = Counter()
+
+    def notify(self, post_id: int, scheduled_for: datetime | None) -> None:
+        """Tell the scheduler about a post that was just scheduled in this process."""
+        if not self.enabled or scheduled_for is None:
+            return
+        due = _as_utc(scheduled_for)
+        with self._lock:
+            earliest = self._heap[0][0] if self._heap else None
+            heapq.heappush(self._heap, (due, post_id))
+        if earliest is None or due < earliest:
+            self._wake.set()
+
+    def publish_due(self) -> list[str] | None:
+        with self.app.app_context():
+            try:
+                slugs = publish_due_posts(lock_key=self.lock_key)
+            except SQLAlchemyError:
+                db.session.rollback()
+                logger.exception("Publishing scheduled posts failed")
+                self._count("failed")
+                return None
+            finally:
+                db.session.remove()
+
+        if slugs is None:
+            self._count("lock_busy")
+        else:
+            self._count("runs")
+            self._count("published", len(slugs))
+        return slugs
+
+    def reload(self) -> None:
+        with self.app.app_context():
+            try:
+                upcoming = upcoming_posts(self.heap_size)
+            except SQLAlchemyError:
+                logger.exception("Could not load scheduled posts")
+                return
+            finally:
+                db.session.remove()
+
+        heap = [(due, post_id) for post_id, _, due in upcoming]
+        heapq.heapify(heap)
+        with self._lock:
+            self._heap = heap
+
+    def run_maintenance(self) -> None:
+        """Run every maintenance task, each in its own app context and transaction."""
+        for name, task in self.maintenance_tasks:
+            with self.app.app_context():
+                try:
+                    task()
+                except SQLAlchemyError:
+                    db.session.rollback()
+                    logger.exception("Scheduler maintenance task %s failed", name)
+                    self._count("maintenance_failed")
+                finally:
+                    db.session.remove()
+        self._count("maintenance_runs")
+
+    def ensure_started(self) -> None:
+        # Threads do not survive a fork, so each gunicorn worker starts its own.
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = pid
+            self._stop.clear()
+            self._thread = threading.Thread(target=self.run, name="post-scheduler", daemon=True)
+            self._thread.start()
+
+    def run(self) -> None:
+        """Loop until :meth:`shutdown`; also used by ``flask scheduler run``."""
+        next_reload = next_maintenance = 0.0
+        while not self._stop.is_set():
+            now = datetime.now(timezone.utc)
+            if now.timestamp() >= next_maintenance:
+                self.run_maintenance()
+                next_maintenance = self._next_maintenance(datetime.now(timezone.utc))
+            if now.timestamp() >= next_reload:
+                self.reload()
+                next_reload = now.timestamp() + self.reload_interval
+
+            with self._lock:
+                due = self._heap[0][0] if self._heap else None
+            if due is not None and due <= now:
+                slugs = self.publish_due()
+                if slugs is None:
+                    self._stop.wait(_LOCK_RETRY_SECONDS)
+                    continue
+                # Stale entries (rescheduled or deleted posts) simply drop out here.
+                self.reload()
+                next_reload = datetime.now(timezone.utc).timestamp() + self.reload_interval
+                continue
+
+            timeout = min(next_reload, next_maintenance) - now.timestamp()
+            if due is not None:
+                timeout = min(timeout, (due - now).total_seconds())
+            self._wake.wait(max(timeout, 0.0))
+            self._wake.clear()
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=5)
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+            pending = len(self._heap)
+            next_due = self._heap[0][0].isoformat() if self._heap else None
+        return {
+            "mode": "thread" if self.enabled else "off",
+            "pending": pending,
+            "next_due": next_due,
+            "runs": counters.get("runs", 0),
+            "published": counters.get("published", 0),
+            "lock_busy": counters.get("lock_busy", 0),
+            "failed": counters.get("failed", 0),
+            "maintenance_runs": counters.get("maintenance_runs", 0),
+            "maintenance_failed": counters.get("maintenance_failed", 0),
+        }
+
+    def _next_maintenance(self, now: datetime) -> float:
+        # Right after midnight, so windows that count days age out as soon as the day changes.
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        return min(now.timestamp() + self.maintenance_interval, midnight.timestamp())
+
+    def _count(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += amount
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; the app stores UTC throughout.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def init_post_scheduler(app: Flask) -> PostScheduler:
+    scheduler = PostScheduler(app)
+    scheduler.maintenance_tasks.append(("popularity refresh", refresh_popularity_if_stale))
+    scheduler.maintenance_tasks.append(("visit partitions", premake_partitions))
+    app.extensions["post_scheduler"] = scheduler
+    if scheduler.enabled:
+        app.before_request(scheduler.ensure_started)
+        atexit.register(scheduler.shutdown)
+    return scheduler
+
+
+def get_post_scheduler() -> PostScheduler:
+    return current_app.extensions["post_scheduler"]
+
+
+__all__ = ["PostScheduler", "get_post_scheduler", "init_post_scheduler", "publish_due_posts", "upcoming_posts"]
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import logging
+from collections import defaultdict
+from typing import Iterable, Mapping
+
+from sqlalchemy import Select, cast, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import REGCONFIG, aggregate_order_by, insert as pg_insert
+from sqlalchemy.sql import ColumnElement
+
+from app.extensions import db
+from app.models import BlogPost, Chapter, PostSearchDocument
+
+
+logger = logging.getLogger(__name__)
+
+
+def full_text_enabled() -> bool:
+    """Full-text search relies on PostgreSQL; other dialects fall back to LIKE matching."""
+    return db.session.get_bind().dialect.name == "postgresql"
+
+
+def config_for_lang(lang: str | None, config: Mapping) -> str:
+    languages = config.get("SEARCH_LANGUAGE_CONFIGS") or {}
+    return languages.get((lang or "").lower(), config.get("SEARCH_DEFAULT_CONFIG", "simple"))
+
+
+def search_configs(config: Mapping) -> list[str]:
+    configs = set((config.get("SEARCH_LANGUAGE_CONFIGS") or {}).values())
+    configs.add(config.get("SEARCH_DEFAULT_CONFIG", "simple"))
+    return sorted(configs)
+
+
+def index_posts(post_ids: Iterable[int], config: Mapping) -> None:
+    """Rebuild the search documents for ``post_ids`` inside the current transaction."""
+    post_ids = list(set(post_ids))
+    if not post_ids or not full_text_enabled():
+        return
+
+    rows = db.session.execute(select(BlogPost.id, BlogPost.lang).where(BlogPost.id.in_(post_ids))).all()
+    ids_by_config: dict[str, list[int]] = defaultdict(list)
+    for post_id, lang in rows:
+        ids_by_config[config_for_lang(lang, config)].append(post_id)
+
+    for config_name, ids in ids_by_config.items():
+        regconfig = cast(literal(config_name), REGCONFIG)
+        chapter_text = (
+            select(func.string_agg(Chapter.text_content, aggregate_order_by(literal(" "), Chapter.position)))
+            .where(Chapter.post_id == BlogPost.id, Chapter.type == "TEXT")
+            .scalar_subquery()
+        )
+        document = (
+            func.setweight(func.to_tsvector(regconfig, BlogPost.title), "A")
+            .op("||")(
+                func.setweight(
+                    func.to_tsvector(
+                        regconfig,
+                        func.concat_ws(" ", BlogPost.summary, BlogPost.meta_description),
+                    ),
+                    "B",
+                )
+            )
+            .op("||")(func.setweight(func.to_tsvector(regconfig, func.coalesce(chapter_text, "")), "C"))
+        )
+        source = select(BlogPost.id, literal(config_name), document, func.now()).where(BlogPost.id.in_(ids))
+        stmt = pg_insert(PostSearchDocument).from_select(
+            ["post_id", "config", "document", "updated_at"],
+            source,
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[PostSearchDocument.post_id],
+            set_={
+                "config": stmt.excluded.config,
+                "document": stmt.excluded.document,
+                "updated_at": stmt.excluded.updated_at,
+            },
+        )
+        db.session.execute(stmt)
+
+    logger.debug("Reindexed %d posts for search", len(rows))
+
+
+def build_tsquery(term: str, config: Mapping) -> ColumnElement:
+    """OR together the query parsed by every configured dictionary so the GIN index stays usable."""
+    queries = [func.websearch_to_tsquery(cast(literal(name), REGCONFIG), term) for name in search_configs(config)]
+    tsquery = queries[0]
+    for query in queries[1:]:
+        tsquery = tsquery.op("||")(query)
+    return tsquery
+
+
+def apply_search(query: Select, term: str, config: Mapping) -> tuple[Select, ColumnElement | None]:
+    """Filter ``query`` by ``term`` and return it with a rank expression (``None`` without full-text)."""
+    if not full_text_enabled():
+        pattern = f"%{term.lower()}%"
+        summary_expr = func.coalesce(BlogPost.summary, "")
+        return (
+            query.where(or_(func.lower(BlogPost.title).like(pattern), func.lower(summary_expr).like(pattern))),
+            None,
+        )
+
+    tsquery = build_tsquery(term, config)
+    rank = func.ts_rank(PostSearchDocument.document, tsquery)
+    query = query.join(PostSearchDocument, PostSearchDocument.post_id == BlogPost.id).where(
+        PostSearchDocument.document.bool_op("@@")(tsquery)
+    )
+    return query, rank
+
+
+def headlines(post_ids: list[int], term: str, config: Mapping) -> dict[int, str]:
+    """Highlighted snippets for an already selected page of posts."""
+    if not post_ids:
+        return {}
+
+    if not full_text_enabled():
+        rows = db.session.execute(select(BlogPost.id, BlogPost.summary).where(BlogPost.id.in_(post_ids))).all()
+        return {post_id: summary or "" for post_id, summary in rows}
+
+    chapter_text = (
+        select(func.string_agg(Chapter.text_content, aggregate_order_by(literal(" "), Chapter.position)))
+        .where(Chapter.post_id == BlogPost.id, Chapter.type == "TEXT")
+        .scalar_subquery()
+    )
+    regconfig = cast(PostSearchDocument.config, REGCONFIG)
+    headline = func.ts_headline(
+        regconfig,
+        func.concat_ws(" ", BlogPost.summary, chapter_text),
+        build_tsquery(term, config),
+        config.get("SEARCH_HEADLINE_OPTIONS", "MaxFragments=2, MaxWords=30, MinWords=10"),
+    )
+    rows = db.session.execute(
+        select(BlogPost.id, headline)
+        .join(PostSearchDocument, PostSearchDocument.post_id == BlogPost.id)
+        .where(BlogPost.id.in_(post_ids))
+    ).all()
+    return {post_id: snippet for post_id, snippet in rows}
+
+
+def reindex_all(config: Mapping, batch_size: int = 500) -> int:
+    last_id = 0
+    total = 0
+    while True:
+        ids = db.session.scalars(
+            select(BlogPost.id).where(BlogPost.id > last_id).order_by(BlogPost.id).limit(batch_size)
+        ).all()
+        if not ids:
+            return total
+        index_posts(ids, config)
+        db.session.commit()
+        total += len(ids)
+        last_id = ids[-1]
+
+
+__all__ = [
+    "apply_search",
+    "build_tsquery",
+    "config_for_lang",
+    "full_text_enabled",
+    "headlines",
+    "index_posts",
+    "reindex_all",
+    "search_configs",
+]
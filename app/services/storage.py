@@ -1,16 +1,19 @@
 from __future__ import annotations
 
 import hashlib
+import io
 import logging
 import mimetypes
+import os
+import random
+import re
+import tempfile
+import threading
+import time
 from dataclasses import dataclass
 from pathlib import Path
 from typing import BinaryIO, Protocol
 
-from google.oauth2 import service_account
-from googleapiclient.discovery import build
-from googleapiclient.http import MediaIoBaseUpload
-
 
 logger = logging.getLogger(__name__)
 
@@ -20,9 +23,14 @@ class StorageError(RuntimeError):
 
 
 class StorageBackend(Protocol):
+    provider: str
+
     def upload(self, file_handle: BinaryIO, filename: str, mime_type: str | None = None) -> "StorageObject":
         ...
 
+    def delete(self, path: str) -> None:
+        ...
+
 
 @dataclass(slots=True)
 class StorageObject:
@@ -33,47 +41,189 @@ class StorageObject:
     checksum: str | None
 
 
+class HashingReader(io.RawIOBase):
+    """Seekable read-only view of a stream that hashes bytes as they stream through.
+
+    The view starts at the stream's position when the reader is created:
+    ``tell()`` and ``seek()`` count from there, so consumers that size the
+    stream with ``seek(0, SEEK_END)`` or read it back from offset 0 (the Drive
+    client does both) only ever see the bytes being stored. Every byte is
+    hashed once, the first time it is read in order, so re-reading a chunk
+    after a seek (e.g. a retried upload chunk) does not change the digest.
+    """
+
+    def __init__(self, raw: BinaryIO) -> None:
+        self.raw = raw
+        self.start = raw.tell() if raw.seekable() else 0
+        self._sha256 = hashlib.sha256()
+        self._position = self._hashed = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return self.raw.seekable()
+
+    def tell(self) -> int:
+        return self._position
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            offset += self.start
+        self._position = self.raw.seek(offset, whence) - self.start
+        if self._position < 0:
+            self.rewind()
+            raise ValueError("Cannot seek before the start of the stream")
+        return self._position
+
+    def rewind(self) -> None:
+        """Go back to the stream position the reader was created at."""
+        self.raw.seek(self.start)
+        self._position = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self.raw.read(size)
+        start, self._position = self._position, self._position + len(data)
+        if start <= self._hashed < self._position:
+            self._sha256.update(memoryview(data)[self._hashed - start :])
+            self._hashed = self._position
+        return data
+
+    def readinto(self, buffer) -> int:
+        data = self.read(len(buffer))
+        buffer[: len(data)] = data
+        return len(data)
+
+    def finish(self, chunk_size: int = 1024 * 1024) -> tuple[int, str]:
+        """Hash whatever has not been read yet and return ``(size, sha256)`` of the bytes from the start position."""
+        if self._hashed != self._position:
+            self.seek(self._hashed)
+        while self.read(chunk_size):
+            pass
+        return self._hashed, self._sha256.hexdigest()
+
+
+_DRIVE_ID_PATTERN = re.compile(r"(?:/d/|[?&]id=)([\w-]+)")
+
+
+def drive_file_id(path: str) -> str:
+    """Extract the Drive file id from a stored ``webViewLink``/``webContentLink`` or bare id."""
+    match = _DRIVE_ID_PATTERN.search(path)
+    return match.group(1) if match else path
+
+
+def local_media_path(config: dict, key: str) -> Path:
+    """Filesystem path of an object written by :class:`LocalStorage`."""
+    return LocalStorage.resolve(Path(config.get("MEDIA_LOCAL_ROOT") or "media"), key)
+
+
+def hash_stream(file_handle: BinaryIO) -> tuple[int, str]:
+    """Return ``(size, sha256)`` of a seekable stream from its current position, and rewind it there."""
+    start = file_handle.tell()
+    size, checksum = HashingReader(file_handle).finish()
+    file_handle.seek(start)
+    return size, checksum
+
+
 _storage_instance: StorageBackend | None = None
+_storage_lock = threading.Lock()
 
 
 def get_storage_backend(config: dict) -> StorageBackend:
+    """The process-wide storage backend, built on first use."""
     global _storage_instance
     if _storage_instance is not None:
         return _storage_instance
+    with _storage_lock:
+        if _storage_instance is None:
+            _storage_instance = _build_storage_backend(config)
+    return _storage_instance
+
 
+def _build_storage_backend(config: dict) -> StorageBackend:
     backend_name = (config.get("MEDIA_STORAGE_BACKEND") or "gdrive").lower()
     if backend_name == "gdrive":
-        _storage_instance = GoogleDriveStorage(
+        return GoogleDriveStorage(
             service_account_path=config.get("GOOGLE_DRIVE_SERVICE_ACCOUNT"),
             upload_folder_id=config.get("GOOGLE_DRIVE_UPLOAD_FOLDER_ID"),
+            chunk_size=int(config.get("GOOGLE_DRIVE_CHUNK_SIZE", GoogleDriveStorage.DEFAULT_CHUNK_SIZE)),
+            max_retries=int(config.get("GOOGLE_DRIVE_UPLOAD_RETRIES", 5)),
+        )
+    elif backend_name == "local":
+        return LocalStorage(
+            root=config.get("MEDIA_LOCAL_ROOT") or "media",
+            fsync=bool(config.get("MEDIA_LOCAL_FSYNC", True)),
         )
     elif backend_name == "external":
-        _storage_instance = ExternalStorage()
-    else:
-        _storage_instance = DatabaseStorage()
-    return _storage_instance
+        return ExternalStorage()
+    return DatabaseStorage()
 
 
 class GoogleDriveStorage:
-    """Uploads binary content to Google Drive using a service account."""
-
-    def __init__(self, service_account_path: str | Path | None, upload_folder_id: str | None = None) -> None:
+    """Uploads binary content to Google Drive using a service account.
+
+    Uploads are resumable and sent in ``chunk_size`` pieces, so memory use per
+    upload is bounded by the chunk size rather than the file size.
+
+    The Drive client is built on first use rather than at startup. Its
+    ``httplib2`` transport is neither thread- nor fork-safe, so every thread
+    of every process gets its own client from the shared credentials.
+    """
+
+    provider = "GDRIVE"
+    # Drive requires chunks to be a multiple of 256 KiB.
+    CHUNK_ALIGNMENT = 256 * 1024
+    DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
+    RETRYABLE_STATUSES = {408, 429, 500, 502, 503, 504}
+    SCOPES = ["https://www.googleapis.com/auth/drive.file"]
+
+    def __init__(
+        self,
+        service_account_path: str | Path | None,
+        upload_folder_id: str | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_retries: int = 5,
+    ) -> None:
         if not service_account_path:
             raise StorageError("GOOGLE_DRIVE_SERVICE_ACCOUNT is not configured")
         path = Path(service_account_path)
         if not path.exists():
             raise StorageError(f"Google Drive service account file not found at {path}")
 
-        scopes = ["https://www.googleapis.com/auth/drive.file"]
-        creds = service_account.Credentials.from_service_account_file(str(path), scopes=scopes)
-        self.drive_service = build("drive", "v3", credentials=creds)
+        self.service_account_path = path
         self.folder_id = upload_folder_id
+        self.chunk_size = max(chunk_size // self.CHUNK_ALIGNMENT, 1) * self.CHUNK_ALIGNMENT
+        self.max_retries = max(max_retries, 0)
+        self._credentials = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def drive_service(self):
+        # A thread-local survives fork in the forking thread, hence the pid check.
+        pid = os.getpid()
+        if getattr(self._local, "pid", None) != pid:
+            from googleapiclient.discovery import build
+
+            self._local.service = build("drive", "v3", credentials=self._load_credentials(), cache_discovery=False)
+            self._local.pid = pid
+        return self._local.service
+
+    def _load_credentials(self):
+        with self._lock:
+            if self._credentials is None:
+                from google.oauth2 import service_account
+
+                try:
+                    self._credentials = service_account.Credentials.from_service_account_file(
+                        str(self.service_account_path), scopes=self.SCOPES
+                    )
+                except (OSError, ValueError) as exc:
+                    raise StorageError(f"Could not load {self.service_account_path}: {exc}") from exc
+            return self._credentials
 
     def upload(self, file_handle: BinaryIO, filename: str, mime_type: str | None = None) -> StorageObject:
-        data = file_handle.read()
-        file_handle.seek(0)
-        checksum = hashlib.sha256(data).hexdigest()
-        size = len(data)
+        from googleapiclient.http import MediaIoBaseUpload
 
         if not mime_type:
             mime_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
@@ -82,12 +232,15 @@ class GoogleDriveStorage:
         if self.folder_id:
             metadata["parents"] = [self.folder_id]
 
-        media = MediaIoBaseUpload(file_handle, mimetype=mime_type, resumable=False)
-        file = (
-            self.drive_service.files()
-            .create(body=metadata, media_body=media, fields="id, name, mimeType, webContentLink, webViewLink")
-            .execute()
+        reader = HashingReader(file_handle)
+        media = MediaIoBaseUpload(reader, mimetype=mime_type, chunksize=self.chunk_size, resumable=True)
+        media_request = self.drive_service.files().create(
+            body=metadata, media_body=media, fields="id, name, mimeType, webContentLink, webViewLink"
         )
+        # Building the request sized the stream by seeking to its end.
+        reader.rewind()
+        file = self._upload_chunks(media_request, filename)
+        size, checksum = reader.finish()
 
         file_id = file["id"]
         web_view_link = file.get("webViewLink") or file.get("webContentLink") or file_id
@@ -95,23 +248,159 @@ class GoogleDriveStorage:
         logger.info("Uploaded file %s to Google Drive with id %s", filename, file_id)
 
         return StorageObject(
-            provider="GDRIVE",
+            provider=self.provider,
             path=web_view_link,
             mime_type=file.get("mimeType"),
             size=size,
             checksum=checksum,
         )
 
+    def download(self, path: str, file_handle: BinaryIO) -> None:
+        """Stream a stored file into ``file_handle`` in ``chunk_size`` pieces."""
+        from googleapiclient.errors import HttpError
+        from googleapiclient.http import MediaIoBaseDownload
+
+        media_request = self.drive_service.files().get_media(fileId=drive_file_id(path))
+        downloader = MediaIoBaseDownload(file_handle, media_request, chunksize=self.chunk_size)
+        try:
+            done = False
+            while not done:
+                _, done = downloader.next_chunk(num_retries=self.max_retries)
+        except (HttpError, OSError) as exc:
+            raise StorageError(f"Google Drive download of {path} failed: {exc}") from exc
+
+    def delete(self, path: str) -> None:
+        """Delete a stored file; one that is already gone is not an error."""
+        from googleapiclient.errors import HttpError
+
+        try:
+            self.drive_service.files().delete(fileId=drive_file_id(path)).execute(num_retries=self.max_retries)
+        except HttpError as exc:
+            if exc.resp.status != 404:
+                raise StorageError(f"Google Drive delete of {path} failed: {exc}") from exc
+        except OSError as exc:
+            raise StorageError(f"Google Drive delete of {path} failed: {exc}") from exc
+
+    def _upload_chunks(self, media_request, filename: str) -> dict:
+        """Send the upload chunk by chunk, resuming from the last acknowledged byte after a failure."""
+        from googleapiclient.errors import HttpError
+
+        failures = 0
+        while True:
+            try:
+                status, response = media_request.next_chunk(num_retries=self.max_retries)
+            except (HttpError, OSError) as exc:
+                retryable = not isinstance(exc, HttpError) or exc.resp.status in self.RETRYABLE_STATUSES
+                failures += 1
+                if not retryable or failures > self.max_retries:
+                    raise StorageError(f"Google Drive upload of {filename} failed: {exc}") from exc
+                delay = min(2**failures, 32) + random.random()
+                logger.warning("Chunk upload of %s failed (%s); resuming in %.1fs", filename, exc, delay)
+                time.sleep(delay)
+                continue
+
+            failures = 0
+            if response is not None:
+                return response
+            if status is not None:
+                logger.debug("Uploaded %d%% of %s", int(status.progress() * 100), filename)
+
+
+class LocalStorage:
+    """Stores uploads on the local filesystem under their SHA-256.
+
+    An object lives at ``<root>/ab/cd/abcd...`` where the directories are the
+    first two byte pairs of its digest. Content is streamed to a temporary file
+    inside ``root`` and renamed into place, so readers never see partial files
+    and identical uploads share one file.
+    """
+
+    provider = "LOCAL"
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, root: str | Path, fsync: bool = True) -> None:
+        self.root = Path(root)
+        self.fsync = fsync
+        self._tmp_dir = self.root / ".tmp"
+        try:
+            self._tmp_dir.mkdir(parents=True, exist_ok=True)
+        except OSError as exc:
+            raise StorageError(f"Local media directory {self.root} is not writable: {exc}") from exc
+
+    @staticmethod
+    def key_for(checksum: str) -> str:
+        return f"{checksum[:2]}/{checksum[2:4]}/{checksum}"
+
+    def path_for(self, key: str) -> Path:
+        return self.resolve(self.root, key)
+
+    @staticmethod
+    def resolve(root: Path, key: str) -> Path:
+        path = (root / key).resolve()
+        if root.resolve() not in path.parents:
+            raise StorageError(f"Invalid storage key {key!r}")
+        return path
+
+    def upload(self, file_handle: BinaryIO, filename: str, mime_type: str | None = None) -> StorageObject:
+        if not mime_type:
+            mime_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+
+        reader = HashingReader(file_handle)
+        try:
+            fd, tmp_name = tempfile.mkstemp(dir=self._tmp_dir)
+            try:
+                with os.fdopen(fd, "wb") as tmp:
+                    while chunk := reader.read(self.CHUNK_SIZE):
+                        tmp.write(chunk)
+                    if self.fsync:
+                        tmp.flush()
+                        os.fsync(tmp.fileno())
+                size, checksum = reader.finish()
+
+                key = self.key_for(checksum)
+                target = self.path_for(key)
+                if target.exists():
+                    os.unlink(tmp_name)
+                else:
+                    target.parent.mkdir(parents=True, exist_ok=True)
+                    os.chmod(tmp_name, 0o644)
+                    os.replace(tmp_name, target)
+            except BaseException:
+                if os.path.exists(tmp_name):
+                    os.unlink(tmp_name)
+                raise
+        except OSError as exc:
+            raise StorageError(f"Failed to store {filename}: {exc}") from exc
+
+        logger.info("Stored file %s locally as %s", filename, key)
+        return StorageObject(provider=self.provider, path=key, mime_type=mime_type, size=size, checksum=checksum)
+
+    def delete(self, key: str) -> None:
+        try:
+            self.path_for(key).unlink(missing_ok=True)
+        except OSError as exc:
+            raise StorageError(f"Failed to delete {key}: {exc}") from exc
+
 
 class ExternalStorage:
     """Placeholder backend that expects caller to provide externally hosted URLs."""
 
+    provider = "EXTERNAL"
+
     def upload(self, file_handle: BinaryIO, filename: str, mime_type: str | None = None) -> StorageObject:  # pragma: no cover - simple
         raise StorageError("External storage cannot upload files. Provide a URL instead.")
 
+    def delete(self, path: str) -> None:  # pragma: no cover - simple
+        """External URLs are not ours to delete."""
+
 
 class DatabaseStorage:
     """Placeholder backend for storing raw data in the database."""
 
+    provider = "DB"
+
     def upload(self, file_handle: BinaryIO, filename: str, mime_type: str | None = None) -> StorageObject:  # pragma: no cover - not implemented
         raise StorageError("Database storage is not implemented. Configure Google Drive instead.")
+
+    def delete(self, path: str) -> None:  # pragma: no cover - not implemented
+        """Nothing is ever stored here."""
@@ -0,0 +1,416 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import random
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Mapping
+
+from sqlalchemy import bindparam, delete, func, insert, select, update
+from werkzeug.security import generate_password_hash
+
+from app.extensions import db
+from app.models import (
+    BlogPost,
+    Category,
+    Chapter,
+    MediaAsset,
+    PostCategory,
+    PostMetricsDaily,
+    PostPopularity,
+    PostSearchDocument,
+    User,
+    Visit,
+    VisitAgentDaily,
+    VisitReferrerDaily,
+    VisitSessionDaily,
+)
+from app.services.cache import get_response_cache
+from app.services.categories import rebuild_closure
+from app.services.popularity import refresh_popularity
+from app.services.search import full_text_enabled, reindex_all
+from app.services.visit_partitions import ensure_partitions
+
+
+logger = logging.getLogger(__name__)
+
+# Synthetic posts and media belong to the bench user, and synthetic categories carry a slug prefix no
+# editor would choose; that is how they are found and removed again without touching real content.
+BENCH_EMAIL = "bench@bench.invalid"
+SLUG_PREFIX = "__bench__-"
+CATEGORY_PREFIX = f"{SLUG_PREFIX}cat-"
+MEDIA_URL_PREFIX = "https://media.bench.invalid/"
+
+_TOPICS = (
+    "prehrana", "vitamini", "minerali", "povrće", "voće", "žitarice", "proteini", "hidratacija", "san", "stres",
+    "trčanje", "joga", "snaga", "mobilnost", "doručak", "recepti", "probava", "imunitet", "srce", "djeca",
+)
+_WORDS = (
+    "zdravlje", "brokula", "špinat", "zob", "jabuka", "orašasti", "plodovi", "voda", "kretanje", "odmor", "navike",
+    "ravnoteža", "energija", "vlakna", "šećer", "masti", "ulje", "riba", "grah", "leća", "sezona", "tjedan",
+    "jutro", "večer", "obrok", "porcija", "tijelo", "mišići", "kosti", "koža", "savjet", "istraživanje",
+)
+_REFERRERS = (
+    None, None, None, "https://www.google.com/", "https://www.google.hr/", "https://www.facebook.com/",
+    "https://l.instagram.com/", "https://duckduckgo.com/", "https://t.co/abc", "https://news.example.org/zdravlje",
+)
+_USER_AGENTS = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_4) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.4 Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_4 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148",
+    "Mozilla/5.0 (Linux; Android 14; Pixel 8) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0 Mobile Safari/537.36",
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+)
+
+
+@dataclass(slots=True)
+class SeedScale:
+    posts: int = 1000
+    categories: int = 30
+    chapters: int = 6
+    media: int = 200
+    visits: int = 50000
+    days: int = 90
+    seed: int = 42
+
+
+def seed_synthetic_data(
+    scale: SeedScale, config: Mapping, batch_size: int = 1000, log: Callable[[str], None] = logger.info
+) -> dict:
+    """Generate a reproducible dataset of the given ``scale`` and return the row counts.
+
+    The same ``scale.seed`` always yields the same content. Posts follow a
+    long-tail popularity curve, and their visits, sessions and daily metrics
+    agree with each other, so rankings and analytics behave as in production.
+    """
+    rng = random.Random(scale.seed)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    counts: dict[str, int] = {}
+
+    author_id = _bench_user()
+    category_ids = _seed_categories(rng, scale.categories)
+    counts["categories"] = len(category_ids)
+    log(f"Created {len(category_ids)} categories")
+
+    media_ids = _seed_media(rng, scale.media, author_id, batch_size)
+    counts["media"] = len(media_ids)
+    log(f"Created {len(media_ids)} media assets")
+
+    posts = _seed_posts(rng, scale, author_id, media_ids, now, batch_size)
+    counts["posts"] = len(posts)
+    log(f"Created {len(posts)} posts")
+
+    counts["chapters"] = _seed_chapters(rng, scale.chapters, [post_id for post_id, _ in posts], media_ids, now, batch_size)
+    counts["post_categories"] = _seed_post_categories(rng, [post_id for post_id, _ in posts], category_ids, batch_size)
+    log(f"Created {counts['chapters']} chapters and {counts['post_categories']} category links")
+
+    published = [(post_id, published_at) for post_id, published_at in posts if published_at is not None]
+    counts.update(_seed_visits(rng, scale, published, now, batch_size, log))
+
+    refresh_popularity(full=True)
+    db.session.commit()
+    if full_text_enabled():
+        reindex_all(config, batch_size=batch_size)
+    get_response_cache().invalidate("posts", "categories")
+    return counts
+
+
+def remove_synthetic_data(batch_size: int = 1000) -> dict:
+    """Delete everything :func:`seed_synthetic_data` (and the load test) created."""
+    author_id = bench_user_id()
+    post_ids = [] if author_id is None else db.session.scalars(select(BlogPost.id).where(BlogPost.author_id == author_id)).all()
+    for start in range(0, len(post_ids), batch_size):
+        chunk = post_ids[start : start + batch_size]
+        # Explicit deletes rather than ON DELETE CASCADE, which SQLite does not enforce by default.
+        for model in (
+            Visit, VisitSessionDaily, VisitReferrerDaily, VisitAgentDaily, PostMetricsDaily, PostPopularity,
+            PostSearchDocument, PostCategory, Chapter,
+        ):
+            db.session.execute(delete(model).where(model.post_id.in_(chunk)).execution_options(synchronize_session=False))
+        db.session.execute(delete(BlogPost).where(BlogPost.id.in_(chunk)).execution_options(synchronize_session=False))
+        db.session.commit()
+
+    is_bench_category = Category.slug.startswith(CATEGORY_PREFIX, autoescape=True)
+    db.session.execute(delete(PostCategory).where(PostCategory.category_id.in_(select(Category.id).where(is_bench_category))))
+    categories = db.session.execute(
+        delete(Category).where(is_bench_category).execution_options(synchronize_session=False)
+    ).rowcount
+    rebuild_closure()
+    media = 0
+    if author_id is not None:
+        media = db.session.execute(
+            delete(MediaAsset)
+            .where(MediaAsset.uploader_id == author_id, MediaAsset.storage_path.startswith(MEDIA_URL_PREFIX))
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    db.session.commit()
+    get_response_cache().invalidate("posts", "categories")
+    return {"posts": len(post_ids), "categories": categories, "media": media}
+
+
+def synthetic_data_exists() -> bool:
+    author_id = bench_user_id()
+    if author_id is None:
+        return False
+    return db.session.scalar(select(BlogPost.id).where(BlogPost.author_id == author_id).limit(1)) is not None
+
+
+def bench_user_id() -> int | None:
+    return db.session.scalar(select(User.id).where(User.email == BENCH_EMAIL))
+
+
+def _bench_user() -> int:
+    user_id = bench_user_id()
+    if user_id is None:
+        user = User(email=BENCH_EMAIL, password_hash=generate_password_hash("bench"), display_name="Benchmark")
+        db.session.add(user)
+        db.session.commit()
+        user_id = user.id
+    return user_id
+
+
+def _seed_categories(rng: random.Random, count: int) -> list[int]:
+    now = datetime.now(timezone.utc)
+    rows = []
+    for index in range(count):
+        topic = _TOPICS[index % len(_TOPICS)]
+        rows.append(
+            {
+                "slug": f"{CATEGORY_PREFIX}{index}",
+                "name": f"{topic.capitalize()} {index // len(_TOPICS) + 1}" if index >= len(_TOPICS) else topic.capitalize(),
+                "description": _sentence(rng, 12),
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+    ids = _insert_returning(Category, rows)
+
+    # About a quarter are top-level; the rest hang under an earlier category, up to three levels deep.
+    roots = max(count // 4, 1)
+    depth = {category_id: 0 for category_id in ids[:roots]}
+    links = []
+    for category_id in ids[roots:]:
+        parent_id = rng.choice([candidate for candidate in ids if depth.get(candidate, 9) < 2] or ids[:1])
+        depth[category_id] = depth[parent_id] + 1
+        links.append({"b_id": category_id, "parent_id": parent_id})
+    if links:
+        table = Category.__table__
+        db.session.execute(update(table).where(table.c.id == bindparam("b_id")).values(parent_id=bindparam("parent_id")), links)
+    rebuild_closure()
+    db.session.commit()
+    return ids
+
+
+def _seed_media(rng: random.Random, count: int, author_id: int, batch_size: int) -> list[int]:
+    now = datetime.now(timezone.utc)
+    ids = []
+    for start in range(0, count, batch_size):
+        rows = []
+        for index in range(start, min(start + batch_size, count)):
+            width = rng.choice((800, 1200, 1600, 2400))
+            rows.append(
+                {
+                    "uploader_id": author_id,
+                    "kind": "IMAGE",
+                    "storage_provider": "EXTERNAL",
+                    "storage_path": f"{MEDIA_URL_PREFIX}{index}.jpg",
+                    "status": "READY",
+                    "mime_type": "image/jpeg",
+                    "bytes": rng.randint(40_000, 900_000),
+                    "checksum": hashlib.sha256(f"bench-media-{index}".encode()).hexdigest(),
+                    "width": width,
+                    "height": width * rng.choice((9, 10, 12)) // 16,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+        ids.extend(_insert_returning(MediaAsset, rows))
+        db.session.commit()
+    return ids
+
+
+def _seed_posts(
+    rng: random.Random, scale: SeedScale, author_id: int, media_ids: list[int], now: datetime, batch_size: int
+) -> list[tuple[int, datetime | None]]:
+    posts = []
+    for start in range(0, scale.posts, batch_size):
+        rows = []
+        for index in range(start, min(start + batch_size, scale.posts)):
+            roll = rng.random()
+            status = "PUBLISHED" if roll < 0.9 else "DRAFT" if roll < 0.95 else "SCHEDULED"
+            created = now - timedelta(days=rng.uniform(0, scale.days), hours=1)
+            title = _sentence(rng, rng.randint(3, 7)).rstrip(".")
+            rows.append(
+                {
+                    "author_id": author_id,
+                    "slug": f"{SLUG_PREFIX}{index}",
+                    "title": title,
+                    "summary": _sentence(rng, rng.randint(15, 35)),
+                    "status": status,
+                    "is_featured": rng.random() < 0.03,
+                    "published_at": created if status == "PUBLISHED" else None,
+                    "scheduled_for": now + timedelta(hours=rng.uniform(1, 24 * 14)) if status == "SCHEDULED" else None,
+                    "hero_media_id": rng.choice(media_ids) if media_ids and rng.random() < 0.8 else None,
+                    "meta_title": title,
+                    "meta_description": _sentence(rng, 20),
+                    "reading_time_minutes": rng.randint(2, 15),
+                    "lang": "hr" if rng.random() < 0.8 else "en",
+                    "created_at": created,
+                    "updated_at": created,
+                }
+            )
+        ids = _insert_returning(BlogPost, rows)
+        posts.extend(zip(ids, (row["published_at"] for row in rows)))
+        db.session.commit()
+    return posts
+
+
+def _seed_chapters(
+    rng: random.Random, average: int, post_ids: list[int], media_ids: list[int], now: datetime, batch_size: int
+) -> int:
+    rows = []
+    total = 0
+    for post_id in post_ids:
+        for position in range(rng.randint(1, max(average * 2 - 1, 1))):
+            roll = rng.random()
+            row = {
+                "post_id": post_id,
+                "position": position,
+                "type": "TEXT",
+                "title": _sentence(rng, rng.randint(2, 5)).rstrip(".") if rng.random() < 0.6 else None,
+                "text_content": None,
+                "media_id": None,
+                "external_video_url": None,
+                "caption": None,
+                "alt_text": None,
+                "created_at": now,
+                "updated_at": now,
+            }
+            if roll < 0.2 and media_ids:
+                row.update(type="IMAGE", media_id=rng.choice(media_ids), caption=_sentence(rng, 8), alt_text=_sentence(rng, 5))
+            elif roll < 0.25:
+                row.update(type="VIDEO", external_video_url=f"https://video.bench.invalid/{rng.randrange(10**6)}")
+            else:
+                row["text_content"] = "\n\n".join(_sentence(rng, rng.randint(40, 120)) for _ in range(rng.randint(1, 4)))
+            rows.append(row)
+        if len(rows) >= batch_size:
+            total += _flush(Chapter, rows)
+    return total + _flush(Chapter, rows)
+
+
+def _seed_post_categories(rng: random.Random, post_ids: list[int], category_ids: list[int], batch_size: int) -> int:
+    if not category_ids:
+        return 0
+    now = datetime.now(timezone.utc)
+    rows = []
+    total = 0
+    for post_id in post_ids:
+        for category_id in rng.sample(category_ids, min(rng.randint(1, 3), len(category_ids))):
+            rows.append({"post_id": post_id, "category_id": category_id, "assigned_at": now})
+        if len(rows) >= batch_size:
+            total += _flush(PostCategory, rows)
+    return total + _flush(PostCategory, rows)
+
+
+def _seed_visits(
+    rng: random.Random,
+    scale: SeedScale,
+    published: list[tuple[int, datetime]],
+    now: datetime,
+    batch_size: int,
+    log: Callable[[str], None],
+) -> dict:
+    if not published or scale.visits <= 0:
+        return {"visits": 0, "metric_days": 0}
+
+    # Backdated visits need their monthly partitions when the visit table is partitioned.
+    ensure_partitions(scale.days // 28 + 2, today=(now - timedelta(days=scale.days)).date())
+    db.session.commit()
+
+    # A few posts get most of the traffic, as on a real blog.
+    order = list(published)
+    rng.shuffle(order)
+    weights = [1 / (rank + 1) ** 1.1 for rank in range(len(order))]
+    sessions = [f"bench-session-{index}" for index in range(max(scale.visits // 5, 1))]
+    views: Counter[tuple[int, object]] = Counter()
+    session_days: set[tuple[int, object, str]] = set()
+
+    rows = []
+    written = 0
+    for (post_id, published_at) in rng.choices(order, weights=weights, k=scale.visits):
+        age = max((now - published_at).total_seconds(), 60.0)
+        visited_at = now - timedelta(seconds=rng.uniform(0, age))
+        session_id = rng.choice(sessions)
+        day = visited_at.date()
+        views[(post_id, day)] += 1
+        session_days.add((post_id, day, session_id))
+        rows.append(
+            {
+                "post_id": post_id,
+                "visited_at": visited_at,
+                "session_id": session_id,
+                "ip_hash": hashlib.sha256(session_id.encode()).hexdigest()[:32],
+                "user_agent": rng.choice(_USER_AGENTS),
+                "referrer": rng.choice(_REFERRERS),
+            }
+        )
+        if len(rows) >= batch_size:
+            written += _flush(Visit, rows)
+            if written % (batch_size * 20) == 0:
+                log(f"Created {written} visits")
+    written += _flush(Visit, rows)
+
+    uniques = Counter((post_id, day) for post_id, day, _ in session_days)
+    _flush(VisitSessionDaily, [{"post_id": p, "date": d, "session_id": s} for p, d, s in session_days], batch_size)
+    metrics = [
+        {
+            "post_id": post_id,
+            "date": day,
+            "views": count,
+            "unique_sessions": uniques[(post_id, day)],
+            "likes": sum(rng.random() < 0.03 for _ in range(count)),
+            "shares": sum(rng.random() < 0.01 for _ in range(count)),
+        }
+        for (post_id, day), count in views.items()
+    ]
+    days = _flush(PostMetricsDaily, metrics, batch_size)
+    log(f"Created {written} visits over {days} post-days")
+    return {"visits": written, "metric_days": days}
+
+
+def _insert_returning(model, rows: list[dict]) -> list[int]:
+    if not rows:
+        return []
+    return list(
+        db.session.scalars(insert(model).returning(model.id, sort_by_parameter_order=True), rows)
+    )
+
+
+def _flush(model, rows: list[dict], batch_size: int | None = None) -> int:
+    """Insert ``rows`` (in chunks of ``batch_size``), commit, and empty the list."""
+    count = len(rows)
+    step = batch_size or max(count, 1)
+    for start in range(0, count, step):
+        db.session.execute(insert(model), rows[start : start + step])
+        db.session.commit()
+    rows.clear()
+    return count
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(_WORDS) for _ in range(words))
+    return text[:1].upper() + text[1:] + "."
+
+
+__all__ = [
+    "BENCH_EMAIL",
+    "CATEGORY_PREFIX",
+    "SLUG_PREFIX",
+    "SeedScale",
+    "bench_user_id",
+    "remove_synthetic_data",
+    "seed_synthetic_data",
+    "synthetic_data_exists",
+]
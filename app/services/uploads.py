@@ -0,0 +1,245 @@
+from __future__ import annotations
+
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO
+
+from flask import Flask, current_app
+from sqlalchemy import select, update
+from sqlalchemy.exc import SQLAlchemyError
+from werkzeug.utils import secure_filename
+
+from app.extensions import db
+from app.models import MediaAsset
+from app.services.storage import StorageError, StorageObject, get_storage_backend
+
+try:  # pragma: no cover - POSIX only
+    import fcntl
+except ImportError:  # pragma: no cover - POSIX only
+    fcntl = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class UploadQueueFull(RuntimeError):
+    """Raised when more uploads are waiting than ``MEDIA_UPLOAD_MAX_PENDING`` allows."""
+
+
+class UploadPipeline:
+    """Pushes spooled uploads to the storage backend from a bounded thread pool.
+
+    The request only spools the file to local disk and creates a ``PENDING``
+    asset. A worker uploads the spool file, retrying with exponential backoff,
+    and marks the asset ``READY`` or ``FAILED``. Each job holds an exclusive
+    lock on its spool file, so pending assets left behind by a dead process
+    are picked up again by the next process that starts, without racing
+    uploads that are still running elsewhere.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        self.asynchronous = (app.config.get("MEDIA_UPLOAD_MODE") or "sync").lower() == "async"
+        self.spool_dir = Path(app.config.get("MEDIA_UPLOAD_SPOOL_DIR") or os.path.join(app.instance_path, "upload-spool"))
+        self.workers = max(int(app.config.get("MEDIA_UPLOAD_WORKERS", 2)), 1)
+        self.max_retries = max(int(app.config.get("MEDIA_UPLOAD_RETRIES", 3)), 0)
+        self.backoff = float(app.config.get("MEDIA_UPLOAD_RETRY_BACKOFF", 2.0))
+        self._slots = threading.BoundedSemaphore(max(int(app.config.get("MEDIA_UPLOAD_MAX_PENDING", 32)), 1))
+        self._executor: ThreadPoolExecutor | None = None
+        self._pid: int | None = None
+        self._lock = threading.Lock()
+        self._counters = Counter()
+
+    def spool(self, file_handle: BinaryIO, filename: str) -> str:
+        """Copy an upload into the spool directory and return the spool file name.
+
+        The name keeps the original file name so a recovered job uploads under it too.
+        """
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+        suffix = "." + (secure_filename(filename) or "upload")
+        fd, path = tempfile.mkstemp(dir=self.spool_dir, prefix="upload.", suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as spool:
+                while chunk := file_handle.read(1024 * 1024):
+                    spool.write(chunk)
+        except BaseException:
+            os.unlink(path)
+            raise
+        return os.path.basename(path)
+
+    def discard(self, spool_name: str) -> None:
+        (self.spool_dir / spool_name).unlink(missing_ok=True)
+
+    def submit(self, media_id: int) -> None:
+        if not self._slots.acquire(blocking=False):
+            raise UploadQueueFull("Too many uploads are waiting for storage")
+        self.ensure_started()
+        with self._lock:
+            self._counters["submitted"] += 1
+        self._executor.submit(self._run, media_id)
+
+    def ensure_started(self) -> None:
+        # Thread pools do not survive a fork, so every worker process starts its own and recovers orphans once.
+        pid = os.getpid()
+        if self._pid == pid:
+            return
+        with self._lock:
+            if self._pid == pid:
+                return
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="media-upload")
+            self._pid = pid
+        self._executor.submit(self.recover)
+
+    def recover(self) -> int:
+        """Resubmit ``PENDING`` assets whose spool file is not locked by a running job."""
+        with self.app.app_context():
+            try:
+                pending = db.session.execute(
+                    select(MediaAsset.id, MediaAsset.storage_path).where(MediaAsset.status == "PENDING")
+                ).all()
+                recovered = 0
+                for media_id, spool_name in pending:
+                    if not (self.spool_dir / spool_name).exists():
+                        self._finish(media_id, error="Spooled upload is missing")
+                        continue
+                    try:
+                        self.submit(media_id)
+                    except UploadQueueFull:
+                        logger.warning("Upload queue is full; remaining pending uploads wait for the next start")
+                        break
+                    recovered += 1
+            except SQLAlchemyError:
+                logger.exception("Could not recover pending media uploads")
+                return 0
+            finally:
+                db.session.remove()
+
+        if recovered:
+            logger.info("Resubmitted %d pending media uploads", recovered)
+        return recovered
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "mode": "async" if self.asynchronous else "sync",
+            "submitted": counters.get("submitted", 0),
+            "completed": counters.get("completed", 0),
+            "failed": counters.get("failed", 0),
+            "retries": counters.get("retries", 0),
+        }
+
+    def _run(self, media_id: int) -> None:
+        try:
+            with self.app.app_context():
+                try:
+                    self._upload(media_id)
+                finally:
+                    db.session.remove()
+        except Exception:
+            logger.exception("Media upload %s crashed", media_id)
+        finally:
+            self._slots.release()
+
+    def _upload(self, media_id: int) -> None:
+        asset = db.session.get(MediaAsset, media_id)
+        if asset is None or asset.status != "PENDING":
+            return
+        spool_path = self.spool_dir / asset.storage_path
+        filename = asset.storage_path.split(".", 2)[-1]
+        kind = asset.kind
+
+        try:
+            spool = open(spool_path, "rb")
+        except FileNotFoundError:
+            self._finish(media_id, error="Spooled upload is missing")
+            return
+
+        with spool:
+            if fcntl is not None:
+                try:
+                    fcntl.flock(spool, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except BlockingIOError:
+                    return  # another job is uploading it
+            # A job that held the lock before us may have finished it in the meantime.
+            status, mime_type = db.session.execute(
+                select(MediaAsset.status, MediaAsset.mime_type).where(MediaAsset.id == media_id)
+            ).one()
+            db.session.rollback()  # no transaction stays open during the upload
+            if status != "PENDING":
+                return
+
+            for attempt in range(self.max_retries + 1):
+                try:
+                    storage_obj = get_storage_backend(current_app.config).upload(spool, filename, mime_type)
+                    break
+                except (StorageError, OSError) as exc:
+                    if attempt == self.max_retries:
+                        self._finish(media_id, error=str(exc))
+                        spool_path.unlink(missing_ok=True)
+                        return
+                    delay = self.backoff * 2**attempt * (1 + random.random())
+                    logger.warning("Upload of media %s failed (%s); retrying in %.1fs", media_id, exc, delay)
+                    with self._lock:
+                        self._counters["retries"] += 1
+                    time.sleep(delay)
+                    spool.seek(0)
+
+            if self._finish(media_id, storage_obj=storage_obj):
+                spool_path.unlink(missing_ok=True)
+                if kind == "IMAGE":
+                    current_app.extensions["image_derivatives"].schedule(media_id)
+
+    def _finish(self, media_id: int, storage_obj: StorageObject | None = None, error: str | None = None) -> bool:
+        """Mark a pending asset ``READY`` (with its stored location) or ``FAILED``."""
+        values = {"status": "FAILED", "upload_error": error}
+        if storage_obj is not None:
+            values = {
+                "status": "READY",
+                "upload_error": None,
+                "storage_provider": storage_obj.provider,
+                "storage_path": storage_obj.path,
+            }
+            if storage_obj.mime_type:
+                values["mime_type"] = storage_obj.mime_type
+        try:
+            result = db.session.execute(
+                update(MediaAsset).where(MediaAsset.id == media_id, MediaAsset.status == "PENDING").values(**values)
+            )
+            db.session.commit()
+        except SQLAlchemyError:
+            logger.exception("Could not record the result of media upload %s", media_id)
+            db.session.rollback()
+            return False
+
+        # Another process may have finished the asset already, e.g. recover() saw the spool file its job just removed.
+        if result.rowcount != 1:
+            return False
+        with self._lock:
+            self._counters["completed" if storage_obj is not None else "failed"] += 1
+        if error:
+            logger.error("Media upload %s failed: %s", media_id, error)
+        return True
+
+
+def init_upload_pipeline(app: Flask) -> UploadPipeline:
+    pipeline = UploadPipeline(app)
+    app.extensions["upload_pipeline"] = pipeline
+    if pipeline.asynchronous:
+        # warm_up starts the workers (and recovery) when the process starts; this covers processes without it.
+        app.before_request(pipeline.ensure_started)
+    return pipeline
+
+
+def get_upload_pipeline() -> UploadPipeline:
+    return current_app.extensions["upload_pipeline"]
+
+
+__all__ = ["UploadPipeline", "UploadQueueFull", "get_upload_pipeline", "init_upload_pipeline"]
@@ -0,0 +1,332 @@
+from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from datetime import date, datetime, timezone
+from typing import Callable
+from urllib.parse import urlsplit
+
+from flask import current_app
+from sqlalchemy import Date, delete, func, literal_column, select, text
+
+from app.extensions import db
+from app.models import PostMetricsDaily, Visit, VisitAgentDaily, VisitReferrerDaily, VisitSessionDaily
+from app.utils.sql import dialect_insert
+
+
+logger = logging.getLogger(__name__)
+
+LEGACY_TABLE = "visit_legacy"
+# Catches visits for months without a partition, so a missed premake never rejects writes.
+DEFAULT_PARTITION = "visit_default"
+_PARTITION_NAME = re.compile(r"^visit_y(\d{4})m(\d{2})$")
+_UPSERT_CHUNK = 1000
+# DDL on the parent table waits at most this long for its lock instead of queueing writes behind it.
+_LOCK_TIMEOUT = "5s"
+# Every worker's scheduler thread premakes partitions; this advisory lock lets one at a time do it.
+_PARTITION_LOCK_KEY = 0x76697369
+_BOT_MARKERS = ("bot", "crawler", "spider", "slurp", "preview", "curl", "wget", "python-requests", "headless")
+_MOBILE_MARKERS = ("mobile", "android", "iphone", "ipad", "ipod")
+
+
+def partitioning_supported() -> bool:
+    return db.session.get_bind().dialect.name == "postgresql"
+
+
+def visit_is_partitioned() -> bool:
+    if not partitioning_supported():
+        return False
+    return bool(db.session.scalar(text("SELECT relkind = 'p' FROM pg_class WHERE oid = to_regclass('visit')")))
+
+
+def visit_partitions() -> list[date]:
+    """First days of the months that have a ``visit_yYYYYmMM`` partition, oldest first."""
+    names = db.session.scalars(
+        text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = to_regclass('visit')"
+        )
+    )
+    months = []
+    for name in names:
+        match = _PARTITION_NAME.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def ensure_partitions(ahead: int, today: date | None = None) -> list[str]:
+    """Create the partitions for the current month and ``ahead`` months after it; returns the new ones."""
+    if not visit_is_partitioned():
+        return []
+    month = _month_start(today or datetime.utcnow().date())
+    return _create_partitions([_add_months(month, offset) for offset in range(ahead + 1)])
+
+
+def premake_partitions() -> list[str]:
+    """Create the next ``VISIT_PARTITION_PREMAKE_MONTHS`` partitions and commit; a no-op when not partitioned."""
+    created = ensure_partitions(int(current_app.config.get("VISIT_PARTITION_PREMAKE_MONTHS", 3)))
+    db.session.commit()
+    return created
+
+
+def migrate_to_partitioned(ahead: int, batch_size: int = 10000, log: Callable[[str], None] = logger.info) -> int:
+    """Move ``visit`` into a monthly partitioned table without blocking visit writes for long.
+
+    The existing table is renamed to ``visit_legacy`` and an empty partitioned
+    ``visit`` takes its place in one short transaction, so new visits go to the
+    partitioned table immediately. Old rows are then moved over in batches of
+    ``batch_size``, each in its own transaction, and the legacy table is dropped.
+    An interrupted run continues where it stopped. Returns the number of rows moved.
+    """
+    if not partitioning_supported():
+        raise RuntimeError("Partitioning the visit table requires PostgreSQL")
+
+    if not visit_is_partitioned():
+        _swap_in_partitioned_table()
+        log("Partitioned visit table is live; new visits are written to it")
+    ensure_partitions(ahead)
+    db.session.commit()
+
+    if db.session.scalar(text(f"SELECT to_regclass('{LEGACY_TABLE}')")) is None:
+        return 0
+
+    months = db.session.scalars(
+        text(f"SELECT DISTINCT date_trunc('month', visited_at AT TIME ZONE 'UTC')::date FROM {LEGACY_TABLE}")
+    ).all()
+    created = _create_partitions(months)
+    db.session.commit()
+    if created:
+        log(f"Created {len(created)} partitions for existing visits")
+
+    columns = ", ".join(column.name for column in Visit.__table__.columns)
+    move = text(
+        f"WITH moved AS (DELETE FROM {LEGACY_TABLE} WHERE id IN "
+        f"(SELECT id FROM {LEGACY_TABLE} ORDER BY id LIMIT :batch_size) RETURNING {columns}) "
+        f"INSERT INTO visit ({columns}) SELECT {columns} FROM moved"
+    )
+    moved = 0
+    while True:
+        count = db.session.execute(move, {"batch_size": batch_size}).rowcount
+        db.session.commit()
+        if not count:
+            break
+        moved += count
+        log(f"Moved {moved} visits")
+
+    db.session.execute(text(f"DROP TABLE {LEGACY_TABLE}"))
+    db.session.commit()
+    return moved
+
+
+def apply_retention(months: int, today: date | None = None) -> dict:
+    """Roll up and delete visits older than ``months`` full months.
+
+    Partitioned tables lose whole partitions; otherwise rows are deleted one
+    month at a time. Each month is rolled up and removed in the same
+    transaction, so it is counted exactly once.
+    """
+    cutoff = _add_months(_month_start(today or datetime.utcnow().date()), -months)
+    dropped: list[str] = []
+    deleted = 0
+
+    if visit_is_partitioned():
+        for month in visit_partitions():
+            end = _add_months(month, 1)
+            if end > cutoff:
+                break
+            rollup_visits(month, end)
+            name = _partition_name(month)
+            _set_lock_timeout()
+            db.session.execute(text(f"DROP TABLE {name}"))
+            db.session.commit()
+            dropped.append(name)
+            logger.info("Dropped visit partition %s", name)
+        # Expired months without a partition can only have rows in the default partition.
+        oldest = db.session.scalar(text(f"SELECT min(visited_at) FROM {DEFAULT_PARTITION}"))
+    else:
+        oldest = db.session.scalar(select(func.min(Visit.visited_at)))
+
+    month = _month_start(oldest.date()) if oldest is not None else cutoff
+    while month < cutoff:
+        end = min(_add_months(month, 1), cutoff)
+        rollup_visits(month, end)
+        deleted += db.session.execute(
+            delete(Visit).where(Visit.visited_at >= _utc(month), Visit.visited_at < _utc(end))
+        ).rowcount
+        db.session.commit()
+        month = end
+
+    # Session rows only deduplicate sessions within a day; old days are not needed any more.
+    sessions = db.session.execute(delete(VisitSessionDaily).where(VisitSessionDaily.date < cutoff)).rowcount
+    db.session.commit()
+    return {"cutoff": cutoff.isoformat(), "dropped_partitions": dropped, "deleted_visits": deleted, "deleted_sessions": sessions}
+
+
+def rollup_visits(start: date, end: date) -> None:
+    """Aggregate the visits of ``[start, end)`` into the daily metric, referrer and agent tables.
+
+    ``post_metrics_daily`` is already maintained as visits are written, so its
+    counters are only raised to the recounted value, never added to.
+    """
+    day = _visit_day()
+    in_range = (Visit.visited_at >= _utc(start), Visit.visited_at < _utc(end))
+
+    totals = db.session.execute(
+        select(Visit.post_id, day, func.count(), func.count(func.distinct(Visit.session_id)))
+        .where(*in_range)
+        .group_by(Visit.post_id, day)
+    ).all()
+    table = PostMetricsDaily.__table__
+    for chunk in _chunks([{"post_id": p, "date": d, "views": v, "unique_sessions": s} for p, d, v, s in totals]):
+        stmt = dialect_insert(table).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.post_id, table.c.date],
+            set_={
+                name: _greatest(table.c[name], stmt.excluded[name]) for name in ("views", "unique_sessions")
+            },
+        )
+        db.session.execute(stmt)
+
+    _rollup_dimension(VisitReferrerDaily, "referrer_host", Visit.referrer, referrer_host, day, in_range)
+    _rollup_dimension(VisitAgentDaily, "agent_family", Visit.user_agent, agent_family, day, in_range)
+
+
+def referrer_host(referrer: str | None) -> str:
+    """Host part of a referrer URL without ``www.``; empty for direct visits."""
+    if not referrer:
+        return ""
+    try:
+        host = urlsplit(referrer if "//" in referrer else f"//{referrer}").hostname or ""
+    except ValueError:
+        return ""
+    return host.removeprefix("www.")[:255]
+
+
+def agent_family(user_agent: str | None) -> str:
+    if not user_agent:
+        return "unknown"
+    agent = user_agent.lower()
+    if any(marker in agent for marker in _BOT_MARKERS):
+        return "bot"
+    if any(marker in agent for marker in _MOBILE_MARKERS):
+        return "mobile"
+    return "desktop"
+
+
+def _rollup_dimension(model, key: str, column, classify: Callable[[str | None], str], day, in_range) -> None:
+    # Group by the raw value in SQL, which already collapses most rows, and classify the groups here.
+    counts: Counter[tuple[int, date, str]] = Counter()
+    rows = db.session.execute(
+        select(Visit.post_id, day, column, func.count()).where(*in_range).group_by(Visit.post_id, day, column)
+    )
+    for post_id, visit_day, value, count in rows:
+        counts[(post_id, visit_day, classify(value))] += count
+
+    table = model.__table__
+    values = [{"post_id": p, "date": d, key: k, "visits": count} for (p, d, k), count in counts.items()]
+    for chunk in _chunks(values):
+        stmt = dialect_insert(table).values(chunk)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.post_id, table.c.date, table.c[key]],
+            set_={"visits": table.c.visits + stmt.excluded.visits},
+        )
+        db.session.execute(stmt)
+
+
+def _swap_in_partitioned_table() -> None:
+    _set_lock_timeout()
+    sequence = db.session.scalar(text("SELECT pg_get_serial_sequence('visit', 'id')"))
+    statements = [
+        f"ALTER TABLE visit RENAME TO {LEGACY_TABLE}",
+        f"ALTER TABLE {LEGACY_TABLE} RENAME CONSTRAINT visit_pkey TO {LEGACY_TABLE}_pkey",
+        f"ALTER INDEX IF EXISTS visit_post_time_idx RENAME TO {LEGACY_TABLE}_post_time_idx",
+        f"CREATE TABLE visit (LIKE {LEGACY_TABLE} INCLUDING DEFAULTS) PARTITION BY RANGE (visited_at)",
+        # Unique constraints on a partitioned table must include the partition key.
+        "ALTER TABLE visit ADD CONSTRAINT visit_pkey PRIMARY KEY (id, visited_at)",
+        "ALTER TABLE visit ADD CONSTRAINT visit_post_id_fkey "
+        "FOREIGN KEY (post_id) REFERENCES blog_post (id) ON DELETE CASCADE",
+        "CREATE INDEX visit_post_time_idx ON visit (post_id, visited_at)",
+        f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF visit DEFAULT",
+    ]
+    if sequence:
+        # The legacy table must not take the id sequence with it when it is dropped.
+        statements.append(f"ALTER SEQUENCE {sequence} OWNED BY visit.id")
+    for statement in statements:
+        db.session.execute(text(statement))
+
+
+def _create_partitions(months) -> list[str]:
+    db.session.execute(select(func.pg_advisory_xact_lock(_PARTITION_LOCK_KEY)))
+    existing = set(visit_partitions())
+    created = []
+    for month in sorted(set(months) - existing):
+        name = _partition_name(month)
+        start, end = (f"'{day.isoformat()} 00:00:00+00'" for day in (month, _add_months(month, 1)))
+        _set_lock_timeout()
+        # Attaching fails while the default partition holds rows of the new range, so those move over first.
+        for statement in (
+            f"CREATE TABLE {name} (LIKE visit INCLUDING DEFAULTS)",
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE visited_at >= {start} AND visited_at < {end} "
+            f"RETURNING *) INSERT INTO {name} SELECT * FROM moved",
+            f"ALTER TABLE visit ATTACH PARTITION {name} FOR VALUES FROM ({start}) TO ({end})",
+        ):
+            db.session.execute(text(statement))
+        created.append(name)
+        logger.info("Created visit partition %s", name)
+    return created
+
+
+def _set_lock_timeout() -> None:
+    db.session.execute(text(f"SET LOCAL lock_timeout = '{_LOCK_TIMEOUT}'"))
+
+
+def _visit_day():
+    if db.session.get_bind().dialect.name == "postgresql":
+        # A literal rather than a bound parameter, so the expression matches itself in GROUP BY.
+        return func.date(func.timezone(literal_column("'UTC'"), Visit.visited_at), type_=Date)
+    return func.date(Visit.visited_at, type_=Date)
+
+
+def _greatest(left, right):
+    if db.session.get_bind().dialect.name == "postgresql":
+        return func.greatest(left, right)
+    return func.max(left, right)
+
+
+def _chunks(values: list[dict]):
+    for index in range(0, len(values), _UPSERT_CHUNK):
+        yield values[index : index + _UPSERT_CHUNK]
+
+
+def _partition_name(month: date) -> str:
+    return f"visit_y{month.year}m{month.month:02d}"
+
+
+def _month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def _add_months(month: date, months: int) -> date:
+    years, index = divmod(month.month - 1 + months, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def _utc(day: date) -> datetime:
+    return datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+
+
+__all__ = [
+    "DEFAULT_PARTITION",
+    "agent_family",
+    "apply_retention",
+    "ensure_partitions",
+    "migrate_to_partitioned",
+    "partitioning_supported",
+    "premake_partitions",
+    "referrer_host",
+    "rollup_visits",
+    "visit_is_partitioned",
+    "visit_partitions",
+]
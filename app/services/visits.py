@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import threading
+from collections import Counter
+from dataclasses import asdict, dataclass
+from datetime import date, datetime
+
+from flask import Flask, current_app
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from app.extensions import db
+from app.models import BlogPost, Visit, VisitSessionDaily
+from app.services.metrics import increment_daily_metrics
+from app.services.popularity import increment_popularity
+from app.services.replicas import use_primary
+from app.utils.sql import dialect_insert, is_foreign_key_violation
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class VisitEvent:
+    post_id: int
+    visited_at: datetime
+    session_id: str | None = None
+    ip_hash: str | None = None
+    user_agent: str | None = None
+    referrer: str | None = None
+
+
+class VisitBuffer:
+    """Queues visit events and writes them in batches from a background thread.
+
+    In ``sync`` mode every event is written immediately on the calling thread,
+    which keeps tests deterministic.
+    """
+
+    def __init__(self, app: Flask) -> None:
+        self.app = app
+        mode = app.config.get("VISIT_BUFFER_MODE") or ("sync" if app.testing else "async")
+        self.synchronous = mode == "sync"
+        self.flush_interval = max(int(app.config.get("VISIT_BUFFER_FLUSH_INTERVAL_MS", 500)), 1) / 1000
+        self.batch_size = max(int(app.config.get("VISIT_BUFFER_BATCH_SIZE", 200)), 1)
+        self._queue: queue.Queue[VisitEvent] = queue.Queue(maxsize=int(app.config.get("VISIT_BUFFER_MAX_SIZE", 10000)))
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+        self._pid: int | None = None
+        self._counters = Counter()
+
+    def record(self, event: VisitEvent) -> None:
+        if self.synchronous:
+            self._write([event])
+            return
+
+        self._ensure_worker()
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            with self._lock:
+                self._counters["dropped"] += 1
+            return
+
+        with self._lock:
+            self._counters["enqueued"] += 1
+        if self._queue.qsize() >= self.batch_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Drain everything queued so far and return the number of events written."""
+        written = 0
+        with self._flush_lock:
+            while True:
+                batch = self._drain()
+                if not batch:
+                    return written
+                self._write(batch)
+                written += len(batch)
+
+    def shutdown(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        thread = self._thread
+        if thread is not None and thread.is_alive() and thread is not threading.current_thread():
+            thread.join(timeout=max(self.flush_interval * 4, 5))
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            "mode": "sync" if self.synchronous else "async",
+            "queue_depth": self._queue.qsize(),
+            "enqueued": counters.get("enqueued", 0),
+            "written": counters.get("written", 0),
+            "dropped": counters.get("dropped", 0),
+            "failed": counters.get("failed", 0),
+            "flushes": counters.get("flushes", 0),
+        }
+
+    def _ensure_worker(self) -> None:
+        # Threads do not survive a fork, so each gunicorn worker starts its own.
+        pid = os.getpid()
+        if self._pid == pid and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._pid == pid and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = pid
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="visit-buffer", daemon=True)
+            self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:  # pragma: no cover - keep the worker alive
+                logger.exception("Visit buffer flush failed")
+
+    def _drain(self) -> list[VisitEvent]:
+        batch: list[VisitEvent] = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, events: list[VisitEvent]) -> None:
+        with self.app.app_context():
+            try:
+                write_visits(events)
+            except SQLAlchemyError:
+                db.session.rollback()
+                logger.exception("Failed to write %d visit events", len(events))
+                with self._lock:
+                    self._counters["failed"] += len(events)
+                return
+            finally:
+                db.session.remove()
+
+        with self._lock:
+            self._counters["written"] += len(events)
+            self._counters["flushes"] += 1
+
+
+def write_visits(events: list[VisitEvent]) -> None:
+    """Persist a batch of visits with one multi-row insert and one metrics upsert."""
+    try:
+        _write_visits(events)
+    except IntegrityError as exc:
+        # Only a foreign key violation means a post was deleted while its visits sat in the queue;
+        # anything else (e.g. a row no partition accepts) is a real failure and must not be retried.
+        if not is_foreign_key_violation(exc):
+            raise
+        db.session.rollback()
+        post_ids = {event.post_id for event in events}
+        with use_primary():
+            existing = set(db.session.scalars(select(BlogPost.id).where(BlogPost.id.in_(post_ids))))
+        events = [event for event in events if event.post_id in existing]
+        if events:
+            _write_visits(events)
+
+
+def _write_visits(events: list[VisitEvent]) -> None:
+    if not events:
+        return
+
+    new_sessions = _new_daily_sessions(events)
+
+    db.session.execute(insert(Visit).values([asdict(event) for event in events]))
+
+    views: Counter[tuple[int, date]] = Counter((event.post_id, event.visited_at.date()) for event in events)
+    uniques: Counter[tuple[int, date]] = Counter(new_sessions)
+    increment_daily_metrics(
+        {"post_id": post_id, "date": day, "views": count, "unique_sessions": uniques[(post_id, day)]}
+        for (post_id, day), count in views.items()
+    )
+    increment_popularity(Counter(event.post_id for event in events))
+    db.session.commit()
+
+
+def _new_daily_sessions(events: list[VisitEvent]) -> list[tuple[int, date]]:
+    """Record first-time sessions per post and day; returns one ``(post_id, date)`` per new session."""
+    candidates = {
+        (event.post_id, event.visited_at.date(), event.session_id) for event in events if event.session_id
+    }
+    if not candidates:
+        return []
+
+    stmt = (
+        dialect_insert(VisitSessionDaily)
+        .values([{"post_id": post_id, "date": day, "session_id": session_id} for post_id, day, session_id in candidates])
+        .on_conflict_do_nothing()
+        .returning(VisitSessionDaily.post_id, VisitSessionDaily.date)
+    )
+    return [(post_id, day) for post_id, day in db.session.execute(stmt)]
+
+
+def init_visit_buffer(app: Flask) -> VisitBuffer:
+    buffer = VisitBuffer(app)
+    app.extensions["visit_buffer"] = buffer
+    atexit.register(buffer.shutdown)
+    return buffer
+
+
+def record_visit(event: VisitEvent) -> None:
+    current_app.extensions["visit_buffer"].record(event)
+
+
+__all__ = ["VisitBuffer", "VisitEvent", "init_visit_buffer", "record_visit", "write_visits"]
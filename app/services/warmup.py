@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import logging
+import time
+
+from flask import Flask
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+
+from app.extensions import db
+from app.services.replicas import get_replica_router
+from app.services.scheduler import get_post_scheduler
+from app.services.storage import GoogleDriveStorage, get_storage_backend
+from app.services.uploads import get_upload_pipeline
+
+
+logger = logging.getLogger(__name__)
+
+
+def warm_up(app: Flask) -> dict:
+    """Do the work the first requests of a fresh process would otherwise pay for.
+
+    Configures the ORM mappers, opens a pooled database connection, health
+    checks the read replicas, builds the storage backend (and this thread's
+    Drive client), starts the background upload workers, which resubmit
+    pending uploads left by a stopped process, starts the scheduler thread,
+    whose first maintenance run premakes visit partitions, and requests every
+    ``WARMUP_PATHS`` entry once to fill the response cache. Each step is
+    timed; a failing step is logged and reported instead of raised, so a
+    worker still starts when, say, Drive credentials are missing.
+
+    Call it after the fork, e.g. from gunicorn's ``post_worker_init``:
+    connections and clients made in the master process must not be shared.
+    """
+    timings: dict[str, float] = {}
+    errors: dict[str, str] = {}
+
+    def step(name: str, fn) -> None:
+        started = time.perf_counter()
+        try:
+            fn()
+        except Exception as exc:
+            logger.warning("Warmup step %s failed: %s", name, exc)
+            errors[name] = str(exc)
+        timings[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    with app.app_context():
+        step("mappers", configure_mappers)
+        step("database", _ping_database)
+        step("replicas", _check_replicas)
+        step("storage", lambda: _build_storage(app))
+        step("uploads", _start_uploads)
+        step("scheduler", _start_scheduler)
+
+    client = app.test_client()
+    for path in app.config.get("WARMUP_PATHS") or ():
+        step(path, lambda: _get(client, path))
+
+    return {"timings_ms": timings, "errors": errors}
+
+
+def _ping_database() -> None:
+    try:
+        db.session.execute(text("SELECT 1"))
+    finally:
+        db.session.remove()
+
+
+def _check_replicas() -> None:
+    unhealthy = [name for name, healthy in get_replica_router().check_all().items() if not healthy]
+    if unhealthy:
+        raise RuntimeError(f"Unhealthy read replicas: {', '.join(unhealthy)}")
+
+
+def _build_storage(app: Flask) -> None:
+    storage = get_storage_backend(app.config)
+    if isinstance(storage, GoogleDriveStorage):
+        storage.drive_service  # builds the client of the calling thread
+
+
+def _start_uploads() -> None:
+    pipeline = get_upload_pipeline()
+    if pipeline.asynchronous:
+        pipeline.ensure_started()
+
+
+def _start_scheduler() -> None:
+    scheduler = get_post_scheduler()
+    if scheduler.enabled:
+        scheduler.ensure_started()
+
+
+def _get(client, path: str) -> None:
+    response = client.get(path)
+    if response.status_code >= 400:
+        raise RuntimeError(f"GET {path} answered {response.status_code}")
+
+
+__all__ = ["warm_up"]
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Iterable
+
+from flask import Response, request
+
+
+def fingerprint_etag(rows: Iterable[Iterable[Any]], salt: str = "") -> tuple[str, datetime | None]:
+    """Strong ETag and Last-Modified for a set of metadata rows.
+
+    Rows are hashed in order, so a reordered listing gets a new tag too. ``salt``
+    separates representations that share the same rows (e.g. list vs. detail).
+    """
+    digest = hashlib.sha256(salt.encode())
+    last_modified: datetime | None = None
+    for row in rows:
+        for value in row:
+            if isinstance(value, datetime):
+                value = as_utc(value)
+                if last_modified is None or value > last_modified:
+                    last_modified = value
+                value = value.isoformat()
+            digest.update(str(value).encode())
+            digest.update(b"\x1f")
+        digest.update(b"\x1e")
+    return digest.hexdigest()[:32], last_modified
+
+
+def is_not_modified(etag: str, last_modified: datetime | None) -> bool:
+    """Evaluate the request's validators without building a response."""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return as_utc(last_modified).replace(microsecond=0) <= as_utc(request.if_modified_since)
+    return False
+
+
+def not_modified_response(etag: str, last_modified: datetime | None, cache_control: str) -> Response:
+    response = Response(status=304)
+    apply_validators(response, etag, last_modified, cache_control)
+    return response
+
+
+def apply_validators(response: Response, etag: str, last_modified: datetime | None, cache_control: str) -> Response:
+    response.set_etag(etag)
+    if last_modified is not None:
+        response.last_modified = as_utc(last_modified)
+    response.headers["Cache-Control"] = cache_control
+    return response
+
+
+def as_utc(value: datetime | None) -> datetime | None:
+    # SQLite hands back naive timestamps; they are stored as UTC.
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+__all__ = ["apply_validators", "as_utc", "fingerprint_etag", "is_not_modified", "not_modified_response"]
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import re
+import typing as t
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+try:  # pragma: no cover - optional dependency
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+_NON_ASCII = re.compile(r"[^\x00-\x7f]")
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """``jsonify`` backed by orjson, producing the same bytes as the standard provider.
+
+    orjson always writes UTF-8, so with ``ensure_ascii`` (the default)
+    non-ASCII characters are escaped afterwards; they can only occur inside
+    strings, where ``\\uXXXX`` is what :func:`json.dumps` writes. Dates and
+    dataclasses go through :meth:`default` so they serialize as Flask's do.
+    """
+
+    def dumps(self, obj: t.Any, **kwargs: t.Any) -> str:
+        return self._encode(obj, indent=bool(kwargs.get("indent"))).decode()
+
+    def response(self, *args: t.Any, **kwargs: t.Any):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self._encode(obj, indent) + b"\n", mimetype=self.mimetype)
+
+    def _encode(self, obj: t.Any, indent: bool = False) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        data = orjson.dumps(obj, default=self.default, option=option)
+        if self.ensure_ascii and not data.isascii():
+            data = _NON_ASCII.sub(_escape, data.decode()).encode()
+        return data
+
+
+def _escape(match: re.Match) -> str:
+    code = ord(match.group())
+    if code < 0x10000:
+        return f"\\u{code:04x}"
+    # Outside the BMP: a UTF-16 surrogate pair, as json.dumps writes it.
+    code -= 0x10000
+    return f"\\u{0xD800 | code >> 10:04x}\\u{0xDC00 | code & 0x3FF:04x}"
+
+
+def init_json_provider(app: Flask) -> None:
+    if not app.config.get("JSON_FAST_ENCODER"):
+        return
+    if orjson is None:
+        app.logger.warning("JSON_FAST_ENCODER is enabled but orjson is not installed; using the standard encoder")
+        return
+    app.json = OrjsonProvider(app)
+
+
+__all__ = ["OrjsonProvider", "init_json_provider"]
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from sqlalchemy.orm import joinedload, selectinload
+
+from app.models import BlogPost, MediaAsset
+
+
+def post_list_options() -> tuple:
+    """Loader options for serializing many posts: one extra SELECT per relationship, not per post."""
+    return (
+        selectinload(BlogPost.chapters),
+        selectinload(BlogPost.categories),
+        selectinload(BlogPost.hero_media).selectinload(MediaAsset.derivatives),
+    )
+
+
+def post_detail_options() -> tuple:
+    """Loader options for a single post; categories ride along in the main query."""
+    return (
+        selectinload(BlogPost.chapters),
+        joinedload(BlogPost.categories),
+        selectinload(BlogPost.hero_media).selectinload(MediaAsset.derivatives),
+    )
+
+
+__all__ = ["post_detail_options", "post_list_options"]
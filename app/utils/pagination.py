@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import base64
+import json
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import and_, or_
+from sqlalchemy.sql import ColumnElement
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode keyset values into an opaque, URL-safe cursor token."""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(token: str, size: int) -> list[Any]:
+    padded = token + "=" * (-len(token) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as exc:
+        raise ValueError("Invalid cursor") from exc
+    if not isinstance(values, list) or len(values) != size:
+        raise ValueError("Invalid cursor")
+    return values
+
+
+def parse_datetime_value(value: Any) -> datetime | None:
+    if value is None:
+        return None
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError) as exc:
+        raise ValueError("Invalid cursor") from exc
+
+
+def parse_limit(raw: str | None, default: int, maximum: int) -> int:
+    if raw is None or raw == "":
+        return default
+    try:
+        limit = int(raw)
+    except ValueError as exc:
+        raise ValueError("limit must be an integer") from exc
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, maximum)
+
+
+def descending_keyset(sort_column, id_column, sort_value: Any, id_value: int) -> ColumnElement[bool]:
+    """Rows strictly after ``(sort_value, id_value)`` in ``sort DESC NULLS LAST, id DESC`` order."""
+    if sort_value is None:
+        return and_(sort_column.is_(None), id_column < id_value)
+    return or_(
+        sort_column < sort_value,
+        and_(sort_column == sort_value, id_column < id_value),
+        sort_column.is_(None),
+    )
+
+
+__all__ = [
+    "decode_cursor",
+    "descending_keyset",
+    "encode_cursor",
+    "parse_datetime_value",
+    "parse_limit",
+]
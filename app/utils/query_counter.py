@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+from flask import Flask, g, has_app_context
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.services.cache import get_response_cache
+
+
+class QueryCounter:
+    def __init__(self) -> None:
+        self.count = 0
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        self.count += 1
+        self.statements.append(statement)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """Count every SQL statement executed inside the block, on any engine."""
+    counter = QueryCounter()
+    event.listen(Engine, "before_cursor_execute", counter)
+    try:
+        yield counter
+    finally:
+        event.remove(Engine, "before_cursor_execute", counter)
+
+
+def assert_constant_queries(client, path: str, grow: Callable[[], object], headers: dict | None = None) -> int:
+    """Fail when ``GET path`` issues more queries after ``grow`` added rows to its result.
+
+    Counts come from the ``X-Query-Count`` header, so only the request's own
+    statements are counted, not those of the visit buffer, scheduler or upload
+    threads; the app needs ``QUERY_COUNT_HEADER``. The response cache is
+    cleared before each request, so both runs reach the database. Returns the
+    query count after ``grow``.
+    """
+    before = _request_query_count(client, path, headers)
+    if before == 0:
+        raise AssertionError(f"GET {path} ran no queries, so the comparison would prove nothing")
+    grow()
+    after = _request_query_count(client, path, headers)
+    if after > before:
+        raise AssertionError(f"Query count of GET {path} grew with result size: {before} -> {after}")
+    return after
+
+
+def _request_query_count(client, path: str, headers: dict | None) -> int:
+    with client.application.app_context():
+        get_response_cache().clear()
+    response = client.get(path, headers=headers)
+    if response.status_code != 200:
+        raise AssertionError(f"GET {path} returned {response.status_code}")
+    count = response.headers.get("X-Query-Count")
+    if count is None:
+        raise RuntimeError("assert_constant_queries needs QUERY_COUNT_HEADER enabled")
+    return int(count)
+
+
+def init_query_counter(app: Flask) -> None:
+    """Expose per-request query counts as an ``X-Query-Count`` header when ``QUERY_COUNT_HEADER`` is set."""
+    if not app.config.get("QUERY_COUNT_HEADER"):
+        return
+
+    if not event.contains(Engine, "before_cursor_execute", _count_request_query):
+        event.listen(Engine, "before_cursor_execute", _count_request_query)
+
+    @app.after_request
+    def _add_query_count_header(response):
+        response.headers["X-Query-Count"] = str(g.get("query_count", 0))
+        return response
+
+
+def _count_request_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    if has_app_context():
+        g.query_count = g.get("query_count", 0) + 1
+
+
+__all__ = ["QueryCounter", "assert_constant_queries", "count_queries", "init_query_counter"]
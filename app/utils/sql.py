@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+
+
+def dialect_insert(target):
+    """``INSERT`` construct with ``ON CONFLICT`` support for the active database (PostgreSQL or SQLite)."""
+    if db.session.get_bind().dialect.name == "postgresql":
+        return pg_insert(target)
+    return sqlite_insert(target)
+
+
+def is_foreign_key_violation(exc: IntegrityError) -> bool:
+    """Whether ``exc`` is a foreign key violation rather than, say, a check or unique constraint."""
+    # psycopg2 exposes the SQLSTATE as ``pgcode``, psycopg 3 as ``sqlstate``; sqlite3 only has the message.
+    code = getattr(exc.orig, "pgcode", None) or getattr(exc.orig, "sqlstate", None)
+    if code is not None:
+        return code == "23503"
+    return "FOREIGN KEY constraint failed" in str(exc.orig)
+
+
+__all__ = ["dialect_insert", "is_foreign_key_violation"]
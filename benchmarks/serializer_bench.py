@@ -0,0 +1,112 @@
+"""Compare marshmallow and compiled dumps of a 1k-post payload.
+
+Run from the repository root:
+
+    python benchmarks/serializer_bench.py --posts 1000 --repeat 5
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from app.models import BlogPost, Category, Chapter  # noqa: E402
+from app.schemas import BlogPostSchema  # noqa: E402
+from app.schemas.fast import compile_schema  # noqa: E402
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def build_posts(count: int, chapters: int) -> list[BlogPost]:
+    now = datetime(2024, 3, 1, tzinfo=timezone.utc)
+    categories = [Category(id=i, name=f"Kategorija {i}", slug=f"kategorija-{i}") for i in range(1, 6)]
+    posts = []
+    for post_id in range(1, count + 1):
+        created = now - timedelta(hours=post_id)
+        post = BlogPost(
+            id=post_id,
+            author_id=1,
+            slug=f"post-{post_id}",
+            title=f"Zdrava prehrana {post_id}",
+            summary="Kratki sažetak članka o prehrani i zdravlju.",
+            status="PUBLISHED",
+            is_featured=post_id % 7 == 0,
+            published_at=created,
+            meta_title=None,
+            meta_description="Opis za tražilice",
+            reading_time_minutes=5,
+            lang="hr",
+            created_at=created,
+            updated_at=created,
+        )
+        post.chapters = [
+            Chapter(
+                id=post_id * 100 + position,
+                post_id=post_id,
+                position=position,
+                type="TEXT",
+                title=f"Poglavlje {position}",
+                text_content="Lorem ipsum dolor sit amet, brokula i špinat. " * 8,
+                created_at=created,
+                updated_at=created,
+            )
+            for position in range(chapters)
+        ]
+        post.categories = categories[post_id % 3 : post_id % 3 + 2]
+        posts.append(post)
+    return posts
+
+
+def timed(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--chapters", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    posts = build_posts(args.posts, args.chapters)
+    schema = BlogPostSchema(many=True)
+    compiled = compile_schema(BlogPostSchema(many=True))
+
+    def encode(data) -> bytes:
+        # Same settings as Flask's default provider outside debug mode.
+        return json.dumps(data, ensure_ascii=True, sort_keys=True, separators=(",", ":")).encode()
+
+    if encode(schema.dump(posts)) != encode(compiled.dump(posts)):
+        raise SystemExit("Compiled serializer output differs from marshmallow")
+
+    results = {
+        "marshmallow dump": timed(lambda: schema.dump(posts), args.repeat),
+        "compiled dump": timed(lambda: compiled.dump(posts), args.repeat),
+        "marshmallow dump + json": timed(lambda: encode(schema.dump(posts)), args.repeat),
+        "compiled dump + json": timed(lambda: encode(compiled.dump(posts)), args.repeat),
+    }
+    if orjson is not None:
+        option = orjson.OPT_SORT_KEYS
+        results["compiled dump + orjson"] = timed(lambda: orjson.dumps(compiled.dump(posts), option=option), args.repeat)
+
+    baseline = results["marshmallow dump + json"]
+    print(f"{args.posts} posts x {args.chapters} chapters, best of {args.repeat} (output verified identical)")
+    for name, seconds in results.items():
+        print(f"  {name:<26} {seconds * 1000:9.1f} ms  {baseline / seconds:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Measure cold start: importing ``app`` and calling ``create_app`` in fresh processes.
+
+Run from the repository root:
+
+    python benchmarks/startup_bench.py --runs 10
+    python benchmarks/startup_bench.py --runs 10 --json startup.json --max-ms 1500
+
+Every run is a new interpreter, as on a new replica or a worker started
+without ``--preload``. ``--max-ms`` exits non-zero when the
+median of import plus ``create_app`` exceeds it, so CI can catch regressions.
+``--imports`` lists the slowest modules of one run from ``-X importtime``.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+CHILD = """
+import json, time
+started = time.perf_counter()
+from app import create_app
+imported = time.perf_counter()
+create_app({"SQLALCHEMY_DATABASE_URI": "sqlite://"})
+created = time.perf_counter()
+print(json.dumps({"import": (imported - started) * 1000, "create_app": (created - imported) * 1000}))
+"""
+
+
+def run_once() -> dict[str, float]:
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def slowest_imports(limit: int) -> list[tuple[str, int]]:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stderr
+    modules = []
+    for line in stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        # Cumulative time of the modules ``app`` imports directly, so nested ones are not counted twice.
+        name = parts[2].rstrip()
+        if name.startswith("   ") and not name.startswith("     "):
+            modules.append((name.strip(), int(parts[1])))
+    return sorted(modules, key=lambda item: item[1], reverse=True)[:limit]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", dest="json_path", help="Write the results to this file")
+    parser.add_argument("--max-ms", type=float, help="Fail when the median total exceeds this many milliseconds")
+    parser.add_argument("--imports", type=int, default=0, help="Show the N slowest imports of one run")
+    args = parser.parse_args()
+
+    run_once()  # compiles bytecode, so the first measured run is not an outlier
+    runs = [run_once() for _ in range(max(args.runs, 1))]
+    totals = [run["import"] + run["create_app"] for run in runs]
+    results = {
+        "python": sys.version.split()[0],
+        "runs": len(runs),
+        "import_ms": round(statistics.median(run["import"] for run in runs), 1),
+        "create_app_ms": round(statistics.median(run["create_app"] for run in runs), 1),
+        "total_ms": round(statistics.median(totals), 1),
+        "total_min_ms": round(min(totals), 1),
+        "total_max_ms": round(max(totals), 1),
+    }
+
+    print(f"Startup over {results['runs']} fresh processes (median)")
+    print(f"  import app        {results['import_ms']:9.1f} ms")
+    print(f"  create_app()      {results['create_app_ms']:9.1f} ms")
+    print(f"  total             {results['total_ms']:9.1f} ms  (min {results['total_min_ms']}, max {results['total_max_ms']})")
+
+    if args.imports:
+        results["slowest_imports_us"] = dict(slowest_imports(args.imports))
+        print("Slowest imports of app")
+        for name, micros in results["slowest_imports_us"].items():
+            print(f"  {name:<36} {micros / 1000:9.1f} ms")
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(results, indent=2) + "\n")
+
+    if args.max_ms is not None and results["total_ms"] > args.max_ms:
+        raise SystemExit(f"Startup took {results['total_ms']} ms, over the {args.max_ms} ms limit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import jwt
+import pytest
+
+from app import create_app
+from app.extensions import db
+from app.models import BlogPost, User
+
+JWT_SECRET = "test-secret-that-is-long-enough-for-hs256"
+
+
+@pytest.fixture(autouse=True)
+def fresh_storage_backend(monkeypatch):
+    # The backend is process-wide and built from the first config that asks for it.
+    monkeypatch.setattr("app.services.storage._storage_instance", None)
+
+
+@pytest.fixture()
+def make_app(tmp_path):
+    """Build an app on a fresh SQLite file; keyword arguments override the config."""
+    apps = []
+
+    def factory(**config):
+        app = create_app(
+            {
+                "TESTING": True,
+                "SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path / 'test.db'}",
+                "MEDIA_STORAGE_BACKEND": "db",
+                "MEDIA_LOCAL_ROOT": str(tmp_path / "media"),
+                "ADMIN_JWT_SECRET": JWT_SECRET,
+                **config,
+            }
+        )
+        with app.app_context():
+            db.create_all()
+        apps.append(app)
+        return app
+
+    yield factory
+    for app in apps:
+        with app.app_context():
+            db.session.remove()
+            db.engine.dispose()
+
+
+@pytest.fixture()
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture()
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture()
+def admin_headers():
+    now = datetime.now(timezone.utc)
+    token = jwt.encode({"sub": "1", "role": "admin", "iat": now, "exp": now + timedelta(hours=1)}, JWT_SECRET, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture()
+def add_post():
+    """Insert a post and return its id; it is published a minute ago unless ``columns`` say otherwise."""
+
+    def factory(app, slug: str, **columns) -> int:
+        with app.app_context():
+            author = db.session.get(User, 1) or User(id=1, email="admin@example.com", password_hash="x", display_name="Admin")
+            values = {"title": slug.replace("-", " ").title(), "status": "PUBLISHED", "lang": "hr"}
+            if columns.get("status", "PUBLISHED") == "PUBLISHED":
+                values["published_at"] = datetime.now(timezone.utc) - timedelta(minutes=1)
+            post = BlogPost(author=author, slug=slug, **{**values, **columns})
+            db.session.add(post)
+            db.session.commit()
+            return post.id
+
+    return factory
@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import BlogPost, Category, MediaAsset, User, Visit
+
+
+def count(app, model, *where) -> int:
+    with app.app_context():
+        return db.session.scalar(select(func.count()).select_from(model).where(*where))
+
+
+def test_seed_and_reset_leave_real_content_alone(app, client, admin_headers):
+    runner = app.test_cli_runner()
+    with app.app_context():
+        db.session.add(User(id=1, email="editor@example.com", password_hash="x", display_name="Editor"))
+        db.session.commit()
+    response = client.post("/api/admin/categories", json={"name": "Bench press", "slug": "bench-press"}, headers=admin_headers)
+    assert response.status_code == 201
+    response = client.post(
+        "/api/admin/posts",
+        json={"slug": "bench-press-101", "title": "Bench press 101", "status": "PUBLISHED", "author_id": 1, "chapters": []},
+        headers=admin_headers,
+    )
+    assert response.status_code == 201
+
+    result = runner.invoke(args=["bench", "seed", "--posts", "20", "--categories", "5", "--media", "5", "--visits", "200"])
+    assert result.exit_code == 0, result.output
+    assert count(app, BlogPost) == 21
+    assert count(app, Visit) == 200
+
+    result = runner.invoke(args=["bench", "run", "--requests", "5", "--concurrency", "2", "--warmup", "0"])
+    assert result.exit_code == 0, result.output
+    assert "errors 0" in result.output and "Scenarios with errors" not in result.output
+
+    result = runner.invoke(args=["bench", "reset"])
+    assert result.exit_code == 0, result.output
+    assert count(app, BlogPost) == 1
+    assert count(app, BlogPost, BlogPost.slug == "bench-press-101") == 1
+    assert count(app, Category) == 1
+    assert count(app, Category, Category.slug == "bench-press") == 1
+    assert count(app, MediaAsset) == 0
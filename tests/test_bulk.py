@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import json
+
+from app.extensions import db
+from app.models import BlogPost, Category, Chapter
+
+
+def ndjson(*records: dict) -> bytes:
+    return b"".join(json.dumps(record).encode() + b"\n" for record in records)
+
+
+def events(response) -> list[dict]:
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.data.splitlines()]
+
+
+def import_content(client, headers, body: bytes, query: str = "") -> list[dict]:
+    return events(
+        client.post(f"/api/admin/content/import{query}", data=body, headers=headers, content_type="application/x-ndjson")
+    )
+
+
+def export_content(client, headers, query: str = "") -> list[dict]:
+    return events(client.get(f"/api/admin/content/export{query}", headers=headers))
+
+
+def add_content(app, add_post) -> None:
+    post_id = add_post(app, "first", summary="Teaser")
+    add_post(app, "draft", status="DRAFT")
+    with app.app_context():
+        news = Category(name="News", slug="news")
+        local = Category(name="Local", slug="local", parent=news)
+        post = db.session.get(BlogPost, post_id)
+        post.categories = [news, local]
+        post.chapters = [
+            Chapter(position=0, type="TEXT", title="Intro", text_content="Hello"),
+            Chapter(position=1, type="TEXT", text_content="World"),
+        ]
+        db.session.commit()
+
+
+def test_export_then_import_round_trips(make_app, add_post, admin_headers, tmp_path):
+    source = make_app()
+    add_content(source, add_post)
+    exported = export_content(source.test_client(), admin_headers, "?batch_size=1")
+
+    assert [record["kind"] for record in exported] == ["category", "category", "post", "post"]
+    assert exported[1]["parent"] == "news"
+    first = exported[2]
+    assert first["slug"] == "first"
+    assert first["categories"] == ["local", "news"]
+    assert [chapter["text_content"] for chapter in first["chapters"]] == ["Hello", "World"]
+
+    target = make_app(SQLALCHEMY_DATABASE_URI=f"sqlite:///{tmp_path / 'target.db'}")
+    client = target.test_client()
+    result = import_content(client, admin_headers, ndjson(*exported), "?batch_size=1")
+    assert result[-1] == {"summary": {"processed": 4, "imported": 2, "updated": 0, "categories": 2, "failed": 0}}
+    assert export_content(client, admin_headers) == exported
+
+
+def test_existing_slugs_fail_unless_updating(app, client, add_post, admin_headers):
+    add_content(app, add_post)
+    (record,) = [record for record in export_content(client, admin_headers) if record.get("slug") == "first"]
+    record.update(title="Renamed", categories=["news"], chapters=[{"type": "TEXT", "text_content": "Only"}])
+
+    result = import_content(client, admin_headers, ndjson(record))
+    assert result[0]["error"]["slug"] == "first"
+    assert result[-1]["summary"]["failed"] == 1
+
+    result = import_content(client, admin_headers, ndjson(record), "?update=1")
+    assert result[-1]["summary"]["updated"] == 1
+    post = client.get("/api/posts/first").get_json()
+    assert post["title"] == "Renamed"
+    assert post["categories"] == ["news"]
+    assert [chapter["text_content"] for chapter in post["chapters"]] == ["Only"]
+
+
+def test_bad_records_fail_alone(app, client, admin_headers):
+    body = b"\n".join(
+        [
+            b"not json",
+            json.dumps({"kind": "post", "slug": "ok", "title": "Ok", "status": "PUBLISHED"}).encode(),
+            json.dumps({"kind": "post", "slug": "no-title"}).encode(),
+            json.dumps({"kind": "post", "slug": "bad-category", "title": "Bad", "categories": ["missing"]}).encode(),
+            json.dumps({"kind": "widget"}).encode(),
+        ]
+    )
+    result = import_content(client, admin_headers, body)
+
+    assert sorted(event["error"]["line"] for event in result if "error" in event) == [1, 3, 4, 5]
+    assert result[-1]["summary"] == {"processed": 5, "imported": 1, "updated": 0, "categories": 0, "failed": 4}
+    with app.app_context():
+        assert db.session.query(BlogPost.slug).all() == [("ok",)]
+
+
+def test_batch_size_is_validated(client, admin_headers):
+    assert client.get("/api/admin/content/export?batch_size=0", headers=admin_headers).status_code == 400
+    assert client.post("/api/admin/content/import?batch_size=x", data=b"", headers=admin_headers).status_code == 400
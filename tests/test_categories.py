@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import CategoryClosure
+from app.services.categories import rebuild_closure
+
+
+@pytest.fixture()
+def tree(client, admin_headers) -> dict[str, int]:
+    """news > (local > city, world); sport is a root of its own."""
+    ids: dict[str, int] = {}
+    for slug, parent in (("news", None), ("local", "news"), ("city", "local"), ("world", "news"), ("sport", None)):
+        payload = {"name": slug.title(), "slug": slug, "parent_id": ids.get(parent)}
+        response = client.post("/api/admin/categories", json=payload, headers=admin_headers)
+        assert response.status_code == 201, response.get_json()
+        ids[slug] = response.get_json()["id"]
+    return ids
+
+
+def add_post(client, headers, slug: str, *category_ids: int, status: str = "PUBLISHED") -> None:
+    payload = {"slug": slug, "title": slug.title(), "status": status, "category_ids": list(category_ids)}
+    assert client.post("/api/admin/posts", json=payload, headers=headers).status_code == 201
+
+
+def counts(client) -> dict[str, tuple[int, int]]:
+    def walk(nodes):
+        for node in nodes:
+            yield node["slug"], (node["post_count"], node["direct_post_count"])
+            yield from walk(node["children"])
+
+    return dict(walk(client.get("/api/categories?tree=1").get_json()))
+
+
+def slugs(client, category: str) -> list[str]:
+    return sorted(item["slug"] for item in client.get(f"/api/posts?category={category}").get_json()["items"])
+
+
+def test_tree_counts_include_subcategories_once(client, admin_headers, tree):
+    add_post(client, admin_headers, "a", tree["news"], tree["city"])
+    add_post(client, admin_headers, "b", tree["city"])
+    add_post(client, admin_headers, "c", tree["world"])
+    add_post(client, admin_headers, "draft", tree["city"], status="DRAFT")
+
+    nested = client.get("/api/categories?tree=1").get_json()
+    assert [node["slug"] for node in nested] == ["news", "sport"]
+    assert [child["slug"] for child in nested[0]["children"]] == ["local", "world"]
+    assert counts(client) == {
+        "news": (3, 1),
+        "local": (2, 0),
+        "city": (2, 2),
+        "world": (1, 1),
+        "sport": (0, 0),
+    }
+
+
+def test_category_filter_covers_the_subtree(client, admin_headers, tree):
+    add_post(client, admin_headers, "a", tree["news"], tree["city"])
+    add_post(client, admin_headers, "b", tree["city"])
+    add_post(client, admin_headers, "c", tree["sport"])
+
+    assert slugs(client, "news") == ["a", "b"]
+    assert slugs(client, "local") == ["a", "b"]
+    assert slugs(client, "sport") == ["c"]
+    assert slugs(client, "missing") == []
+
+
+def test_moving_a_category_moves_its_subtree(client, admin_headers, tree):
+    add_post(client, admin_headers, "b", tree["city"])
+
+    response = client.put(f"/api/admin/categories/{tree['local']}", json={"parent_id": tree["sport"]}, headers=admin_headers)
+    assert response.status_code == 200
+    assert slugs(client, "news") == []
+    assert slugs(client, "sport") == ["b"]
+    assert counts(client)["sport"] == (1, 0)
+
+
+def test_cycles_are_rejected(client, admin_headers, tree):
+    for parent in ("city", "news"):
+        response = client.put(f"/api/admin/categories/{tree['news']}", json={"parent_id": tree[parent]}, headers=admin_headers)
+        assert response.status_code == 400
+
+
+def test_rebuild_matches_incremental_maintenance(app, client, admin_headers, tree):
+    client.put(f"/api/admin/categories/{tree['local']}", json={"parent_id": tree["sport"]}, headers=admin_headers)
+    client.delete(f"/api/admin/categories/{tree['world']}", headers=admin_headers)
+
+    def closure():
+        return set(db.session.execute(select(CategoryClosure.ancestor_id, CategoryClosure.descendant_id, CategoryClosure.depth)))
+
+    with app.app_context():
+        incremental = closure()
+        rebuild_closure()
+        assert closure() == incremental
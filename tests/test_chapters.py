@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import Chapter
+
+
+def create_post(client, headers, slug: str, *texts: str) -> dict:
+    payload = {
+        "slug": slug,
+        "title": slug.title(),
+        "status": "PUBLISHED",
+        "chapters": [{"type": "TEXT", "text_content": text} for text in texts],
+    }
+    response = client.post("/api/admin/posts", json=payload, headers=headers)
+    assert response.status_code == 201, response.get_json()
+    return response.get_json()
+
+
+def chapters(client, slug: str) -> list[tuple[int, str]]:
+    return [(chapter["id"], chapter["text_content"]) for chapter in client.get(f"/api/posts/{slug}").get_json()["chapters"]]
+
+
+def test_update_reconciles_chapters_by_id(app, client, admin_headers):
+    post = create_post(client, admin_headers, "first", "one", "two", "three")
+    one, two, three = (chapter["id"] for chapter in post["chapters"])
+
+    payload = {
+        "chapters": [
+            {"id": three},
+            {"id": str(one), "text_content": "one, edited"},
+            {"type": "TEXT", "text_content": "new"},
+        ]
+    }
+    response = client.put(f"/api/admin/posts/{post['id']}", json=payload, headers=admin_headers)
+    assert response.status_code == 200, response.get_json()
+
+    result = chapters(client, "first")
+    assert result[:2] == [(three, "three"), (one, "one, edited")]
+    assert result[2][1] == "new" and result[2][0] not in (one, two, three)
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(Chapter)) == 3
+
+
+@pytest.mark.parametrize("chapter_id", ["abc", 1.5, True, [1]])
+def test_non_numeric_chapter_ids_are_rejected(client, admin_headers, chapter_id):
+    post = create_post(client, admin_headers, "first", "one")
+    before = chapters(client, "first")
+
+    payload = {"chapters": [{"id": chapter_id, "text_content": "changed"}]}
+    response = client.put(f"/api/admin/posts/{post['id']}", json=payload, headers=admin_headers)
+    assert response.status_code == 400
+    assert "Chapter id must be an integer" in response.get_json()["message"]
+    assert chapters(client, "first") == before
+
+
+def test_chapters_of_other_posts_cannot_be_claimed(client, admin_headers):
+    first = create_post(client, admin_headers, "first", "one")
+    second = create_post(client, admin_headers, "second", "two")
+
+    payload = {"chapters": [{"id": second["chapters"][0]["id"]}]}
+    assert client.put(f"/api/admin/posts/{first['id']}", json=payload, headers=admin_headers).status_code == 400
+    assert [text for _, text in chapters(client, "second")] == ["two"]
+
+
+def test_patch_changes_one_chapter(client, admin_headers):
+    post = create_post(client, admin_headers, "first", "one", "two")
+    chapter_id = post["chapters"][1]["id"]
+    url = f"/api/admin/posts/{post['id']}/chapters/{chapter_id}"
+
+    response = client.patch(url, json={"text_content": "two, edited"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert [text for _, text in chapters(client, "first")] == ["one", "two, edited"]
+
+    assert client.patch(url, json={"colour": "red"}, headers=admin_headers).status_code == 400
+    other = create_post(client, admin_headers, "second", "x")
+    assert client.patch(f"/api/admin/posts/{other['id']}/chapters/{chapter_id}", json={}, headers=admin_headers).status_code == 404
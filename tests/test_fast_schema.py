@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+from marshmallow import Schema, fields, pre_dump
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import BlogPost, Category, Chapter, MediaAsset
+from app.schemas import BlogPostSchema, CategorySchema
+from app.schemas.fast import compile_schema
+
+
+class ItemSchema(Schema):
+    name = fields.String()
+    count = fields.Integer(data_key="total")
+    price = fields.Decimal(as_string=True)
+    tags = fields.List(fields.String())
+    day = fields.Date()
+    owner = fields.String(attribute="owner.name")
+    active = fields.Boolean()
+
+
+class HookedSchema(Schema):
+    name = fields.String()
+
+    @pre_dump
+    def shout(self, data, **kwargs):
+        return {"name": data["name"].upper()}
+
+
+def test_compiled_post_dump_matches_marshmallow(app, add_post):
+    post_id = add_post(app, "first", summary="Teaser", is_featured=True)
+    with app.app_context():
+        post = db.session.get(BlogPost, post_id)
+        post.hero_media = MediaAsset(
+            kind="IMAGE", storage_provider="EXTERNAL", storage_path="https://example.com/hero.png", width=10, height=5
+        )
+        post.chapters = [
+            Chapter(position=0, type="TEXT", text_content="Body"),
+            Chapter(position=1, type="VIDEO", external_video_url="https://example.com/v", caption=None),
+        ]
+        post.categories = [Category(name="News", slug="news"), Category(name="Odd", slug="odd")]
+        db.session.commit()
+
+        posts = db.session.scalars(select(BlogPost)).all()
+        assert compile_schema(BlogPostSchema()).dump(posts[0]) == BlogPostSchema().dump(posts[0])
+        assert compile_schema(BlogPostSchema(many=True)).dump(posts) == BlogPostSchema(many=True).dump(posts)
+
+        categories = db.session.scalars(select(Category)).all()
+        assert compile_schema(CategorySchema(many=True)).dump(categories) == CategorySchema(many=True).dump(categories)
+
+
+def test_compiled_dump_matches_for_objects_and_dicts():
+    class Owner:
+        name = "Ana"
+
+    class Item:
+        name = "Lamp"
+        count = 3
+        price = Decimal("9.50")
+        tags = ["a", "b"]
+        day = date(2024, 6, 1)
+        owner = Owner()
+        active = 1
+
+    schema = ItemSchema()
+    assert compile_schema(schema).dump(Item()) == schema.dump(Item())
+
+    record = {"name": None, "count": None, "tags": None, "day": datetime(2024, 6, 1, tzinfo=timezone.utc).date()}
+    assert compile_schema(schema).dump(record) == schema.dump(record)
+
+
+def test_dump_hooks_fall_back_to_marshmallow():
+    assert compile_schema(HookedSchema()).dump({"name": "quiet"}) == {"name": "QUIET"}
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import PostMetricsDaily
+
+
+def views(app, post_id: int) -> int:
+    with app.app_context():
+        return sum(db.session.scalars(select(PostMetricsDaily.views).where(PostMetricsDaily.post_id == post_id)))
+
+
+def test_matching_etag_gets_304(app, client, add_post):
+    add_post(app, "first")
+
+    for path in ("/api/posts", "/api/posts/recent", "/api/posts/first", "/api/categories"):
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.headers["ETag"]
+        assert response.headers["Cache-Control"] == "public, no-cache"
+
+        again = client.get(path, headers={"If-None-Match": response.headers["ETag"]})
+        assert again.status_code == 304
+        assert again.data == b""
+        assert again.headers["ETag"] == response.headers["ETag"]
+
+        assert client.get(path, headers={"If-None-Match": '"something-else"'}).status_code == 200
+
+
+def test_if_modified_since(app, client, add_post):
+    add_post(app, "first")
+    response = client.get("/api/posts/first")
+    last_modified = response.headers["Last-Modified"]
+
+    assert client.get("/api/posts/first", headers={"If-Modified-Since": last_modified}).status_code == 304
+    earlier = "Mon, 01 Jan 2001 00:00:00 GMT"
+    assert client.get("/api/posts/first", headers={"If-Modified-Since": earlier}).status_code == 200
+
+
+def test_edit_changes_the_etag(app, client, add_post, admin_headers):
+    post_id = add_post(app, "first")
+    etag = client.get("/api/posts/first").headers["ETag"]
+
+    client.put(f"/api/admin/posts/{post_id}", json={"title": "Renamed"}, headers=admin_headers)
+
+    response = client.get("/api/posts/first", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+    assert response.get_json()["title"] == "Renamed"
+
+
+def test_same_rows_on_another_path_get_another_etag(app, client, add_post):
+    add_post(app, "first", is_featured=True)
+    assert client.get("/api/posts/recent").headers["ETag"] != client.get("/api/posts/featured").headers["ETag"]
+
+
+def test_not_modified_still_counts_a_visit(app, client, add_post):
+    post_id = add_post(app, "first")
+    etag = client.get("/api/posts/first").headers["ETag"]
+
+    assert client.get("/api/posts/first", headers={"If-None-Match": etag}).status_code == 304
+    assert views(app, post_id) == 2
+
+
+def test_unknown_post_is_404(client):
+    assert client.get("/api/posts/missing").status_code == 404
+    assert client.get("/api/posts/missing", headers={"If-None-Match": "*"}).status_code == 404
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from decimal import Decimal
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
+
+pytest.importorskip("orjson")
+
+from app.utils.json_provider import OrjsonProvider  # noqa: E402
+
+
+@dataclass
+class Point:
+    x: int
+    label: str
+
+
+PAYLOAD = {
+    "title": "Čudesna šuma – đurđica",
+    "emoji": "Pjesma 🎶 i 𝄞",
+    "control": "tab\tquote\" backslash\\ nul\x00",
+    "numbers": [0, -7, 3.25, 10**15, True, None],
+    "nested": {"b": [{"z": 1, "a": 2}], "a": {}},
+    "published_at": datetime(2024, 3, 1, 12, 30, tzinfo=timezone.utc),
+    "day": date(2024, 3, 1),
+    "price": Decimal("9.90"),
+    "point": Point(1, "ž"),
+}
+
+
+@pytest.mark.parametrize("debug", [False, True])
+def test_orjson_provider_matches_the_standard_encoder(make_app, debug):
+    app = make_app()
+    app.debug = debug
+    with app.app_context():
+        fast = OrjsonProvider(app).response(PAYLOAD).get_data()
+        standard = DefaultJSONProvider(app).response(PAYLOAD).get_data()
+    assert fast.isascii()
+    assert fast == standard
+
+
+def test_fast_encoder_serves_the_same_bytes(make_app):
+    bodies = []
+    for fast in (False, True):
+        app = make_app(JSON_FAST_ENCODER=fast)
+        app.get("/test/payload")(lambda: PAYLOAD)
+        bodies.append(app.test_client().get("/test/payload").get_data())
+    assert bodies[0] == bodies[1]
@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from app.extensions import db
+from app.models import MediaAsset, MediaDerivative
+from app.services.storage import get_storage_backend
+
+
+@pytest.fixture()
+def media_app(make_app):
+    return make_app(MEDIA_STORAGE_BACKEND="local", IMAGE_DERIVATIVE_MODE="off")
+
+
+def store(app, data: bytes, **fields) -> int:
+    with app.app_context():
+        stored = get_storage_backend(app.config).upload(io.BytesIO(data), "file.bin")
+        asset = MediaAsset(
+            kind="IMAGE",
+            storage_provider=stored.provider,
+            storage_path=stored.path,
+            bytes=stored.size,
+            checksum=stored.checksum,
+            **fields,
+        )
+        db.session.add(asset)
+        db.session.commit()
+        return asset.id
+
+
+def add_rendition(app, source_id: int, rendition_id: int, variant: str) -> None:
+    with app.app_context():
+        db.session.add(MediaDerivative(source_media_id=source_id, media_id=rendition_id, variant=variant, width=10, height=10))
+        db.session.commit()
+
+
+def test_upload_does_not_reuse_a_pending_asset(media_app, admin_headers):
+    pending_id = store(media_app, b"same bytes", status="PENDING")
+    client = media_app.test_client()
+
+    response = client.post(
+        "/api/admin/media",
+        data={"file": (io.BytesIO(b"same bytes"), "copy.bin"), "kind": "FILE"},
+        headers=admin_headers,
+    )
+
+    assert response.status_code == 201
+    assert response.get_json()["id"] != pending_id
+
+
+def test_merge_removes_orphaned_renditions_and_their_files(media_app, admin_headers):
+    canonical_id = store(media_app, b"original")
+    duplicate_id = store(media_app, b"original")
+    shared_id = store(media_app, b"small rendition")
+    own_id = store(media_app, b"rendition only the duplicate has")
+    add_rendition(media_app, canonical_id, shared_id, "w320")
+    add_rendition(media_app, duplicate_id, shared_id, "w320")
+    add_rendition(media_app, duplicate_id, own_id, "w640")
+    with media_app.app_context():
+        root = get_storage_backend(media_app.config)
+        own_file = root.path_for(db.session.get(MediaAsset, own_id).storage_path)
+        original_file = root.path_for(db.session.get(MediaAsset, canonical_id).storage_path)
+
+    response = media_app.test_client().post("/api/admin/media/duplicates/merge", json={}, headers=admin_headers)
+
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["removed_media_ids"] == [duplicate_id]
+    assert body["removed_rendition_ids"] == [own_id]
+    with media_app.app_context():
+        assert sorted(db.session.scalars(db.select(MediaAsset.id))) == [canonical_id, shared_id]
+        assert db.session.scalars(db.select(MediaDerivative.source_media_id)).all() == [canonical_id]
+    assert not own_file.exists()
+    assert original_file.exists()
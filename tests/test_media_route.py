@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import io
+
+import pytest
+
+from app.extensions import db
+from app.models import MediaAsset
+from app.services.storage import get_storage_backend
+
+DATA = bytes(range(256)) * 4
+
+
+@pytest.fixture()
+def media_app(make_app):
+    return make_app(MEDIA_STORAGE_BACKEND="local", IMAGE_DERIVATIVE_MODE="off")
+
+
+@pytest.fixture()
+def media_id(media_app):
+    with media_app.app_context():
+        stored = get_storage_backend(media_app.config).upload(io.BytesIO(DATA), "file.bin")
+        asset = MediaAsset(
+            kind="FILE",
+            storage_provider=stored.provider,
+            storage_path=stored.path,
+            mime_type="application/octet-stream",
+            bytes=stored.size,
+            checksum=stored.checksum,
+        )
+        db.session.add(asset)
+        db.session.commit()
+        return asset.id
+
+
+def test_full_response_and_validators(media_app, media_id):
+    client = media_app.test_client()
+    response = client.get(f"/api/media/{media_id}")
+    assert response.status_code == 200
+    assert response.data == DATA
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+
+    etag = response.headers["ETag"]
+    assert client.get(f"/api/media/{media_id}", headers={"If-None-Match": etag}).status_code == 304
+    last_modified = response.headers["Last-Modified"]
+    assert client.get(f"/api/media/{media_id}", headers={"If-Modified-Since": last_modified}).status_code == 304
+
+
+def test_single_range(media_app, media_id):
+    client = media_app.test_client()
+    response = client.get(f"/api/media/{media_id}", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.data == DATA[10:20]
+    assert response.headers["Content-Range"] == f"bytes 10-19/{len(DATA)}"
+
+    suffix = client.get(f"/api/media/{media_id}", headers={"Range": "bytes=-5"})
+    assert suffix.status_code == 206
+    assert suffix.data == DATA[-5:]
+
+    assert client.get(f"/api/media/{media_id}", headers={"Range": f"bytes={len(DATA)}-"}).status_code == 416
+
+
+def test_multiple_ranges_are_multipart(media_app, media_id):
+    client = media_app.test_client()
+    response = client.get(f"/api/media/{media_id}", headers={"Range": "bytes=0-3,100-103,-2"})
+    assert response.status_code == 206
+    assert response.mimetype == "multipart/byteranges"
+    assert int(response.headers["Content-Length"]) == len(response.data)
+
+    boundary = response.mimetype_params["boundary"].encode()
+    parts = response.data.split(b"--" + boundary)
+    assert parts[0] == b"" and parts[-1] == b"--\r\n"
+    bodies = []
+    for part in parts[1:-1]:
+        head, _, body = part.partition(b"\r\n\r\n")
+        assert b"Content-Type: application/octet-stream" in head
+        bodies.append((head.split(b"Content-Range: ")[1], body.removesuffix(b"\r\n")))
+    size = len(DATA)
+    assert bodies == [
+        (f"bytes 0-3/{size}".encode(), DATA[0:4]),
+        (f"bytes 100-103/{size}".encode(), DATA[100:104]),
+        (f"bytes {size - 2}-{size - 1}/{size}".encode(), DATA[-2:]),
+    ]
+
+
+def test_unsatisfiable_multiple_ranges(media_app, media_id):
+    response = media_app.test_client().get(f"/api/media/{media_id}", headers={"Range": "bytes=5000-5001,6000-6001"})
+    assert response.status_code == 416
+    assert response.headers["Content-Range"] == f"bytes */{len(DATA)}"
+
+
+def test_stale_if_range_gets_the_whole_file(media_app, media_id):
+    response = media_app.test_client().get(
+        f"/api/media/{media_id}", headers={"Range": "bytes=0-3,10-13", "If-Range": '"old"'}
+    )
+    assert response.status_code == 200
+    assert response.data == DATA
+
+
+def test_external_and_missing_media(media_app):
+    with media_app.app_context():
+        asset = MediaAsset(kind="IMAGE", storage_provider="EXTERNAL", storage_path="https://example.com/a.png")
+        db.session.add(asset)
+        db.session.commit()
+        external_id = asset.id
+
+    client = media_app.test_client()
+    response = client.get(f"/api/media/{external_id}")
+    assert response.status_code == 302
+    assert response.headers["Location"] == "https://example.com/a.png"
+    assert client.get("/api/media/999").status_code == 404
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+START = datetime(2024, 5, 1, 12, tzinfo=timezone.utc)
+
+
+@pytest.fixture()
+def posts(app, add_post):
+    """Seven published posts, two sharing a timestamp, plus a draft; newest first."""
+    ages = {"g": 0, "f": 1, "e": 2, "d": 2, "c": 3, "b": 4, "a": 5}
+    for slug, age in sorted(ages.items()):
+        add_post(app, f"post-{slug}", published_at=START - timedelta(hours=age), summary=f"About {slug}")
+    add_post(app, "draft", status="DRAFT")
+    # Ties on published_at are broken by the higher id first.
+    return ["post-g", "post-f", "post-e", "post-d", "post-c", "post-b", "post-a"]
+
+
+def walk(client, path: str, headers=None) -> tuple[list[str], int]:
+    slugs, pages, cursor = [], 0, None
+    while True:
+        separator = "&" if "?" in path else "?"
+        url = f"{path}{separator}limit=2" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url, headers=headers).get_json()
+        slugs += [item["slug"] for item in body["items"]]
+        pages += 1
+        cursor = body["next_cursor"]
+        if cursor is None:
+            return slugs, pages
+
+
+def test_public_cursor_walks_every_post_once(client, posts):
+    assert walk(client, "/api/posts") == (posts, 4)
+
+
+def test_cursor_keeps_filters(client, posts):
+    after = (START - timedelta(hours=3)).isoformat()
+    slugs, _ = walk(client, f"/api/posts?published_after={after.replace('+', '%2B')}")
+    assert slugs == ["post-g", "post-f", "post-e", "post-d", "post-c"]
+
+
+def test_search_results_page_too(client, posts):
+    slugs, pages = walk(client, "/api/posts?search=about")
+    assert (slugs, pages) == (posts, 4)
+
+
+def test_admin_cursor_includes_drafts(client, admin_headers, posts):
+    slugs, _ = walk(client, "/api/admin/posts", headers=admin_headers)
+    assert sorted(slugs) == sorted(posts + ["draft"])
+    assert len(slugs) == len(set(slugs))
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", "WzFd", "WyJ4IiwgMV0"])
+def test_bad_cursors_are_rejected(client, posts, cursor):
+    response = client.get(f"/api/posts?cursor={cursor}")
+    assert response.status_code == 400
+    assert response.get_json() == {"message": "Invalid cursor"}
+
+
+def test_limit_is_validated(client):
+    assert client.get("/api/posts?limit=0").status_code == 400
+    assert client.get("/api/posts?limit=abc").status_code == 400
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+from datetime import date, datetime, timedelta
+
+from app.extensions import db
+from app.models import PostMetricsDaily, PostPopularity
+from app.services.popularity import increment_popularity, popularity_is_stale, refresh_popularity, refresh_popularity_if_stale
+
+TODAY = date(2024, 6, 30)
+
+
+def add_views(app, post_id: int, views_by_age: dict[int, int]) -> None:
+    """Daily metrics for ``post_id``: days before ``TODAY`` -> views."""
+    with app.app_context():
+        db.session.add_all(
+            PostMetricsDaily(post_id=post_id, date=TODAY - timedelta(days=age), views=views)
+            for age, views in views_by_age.items()
+        )
+        db.session.commit()
+
+
+def windows(app, post_id: int) -> tuple[int, int, int, int]:
+    with app.app_context():
+        row = db.session.get(PostPopularity, post_id)
+        return row.views_7d, row.views_30d, row.views_90d, row.views_total
+
+
+def test_refresh_sums_each_window(app, add_post):
+    post_id = add_post(app, "old-favourite")
+    add_views(app, post_id, {0: 1, 6: 2, 7: 4, 29: 8, 30: 16, 89: 32, 90: 64, 400: 128})
+
+    with app.app_context():
+        refresh_popularity(TODAY)
+
+    assert windows(app, post_id) == (3, 15, 63, 255)
+
+
+def test_new_rows_get_their_full_history(app, add_post):
+    ranked = add_post(app, "already-ranked")
+    add_views(app, ranked, {1: 5})
+    with app.app_context():
+        refresh_popularity(TODAY)
+
+    post_id = add_post(app, "imported")
+    add_views(app, post_id, {1: 3, 200: 100})
+    with app.app_context():
+        refresh_popularity(TODAY)
+
+    assert windows(app, post_id) == (3, 3, 3, 103)
+    assert windows(app, ranked) == (5, 5, 5, 5)
+
+
+def test_views_age_out_once_the_table_is_stale(app, add_post):
+    post_id = add_post(app, "yesterdays-news")
+    add_views(app, post_id, {6: 10})
+    with app.app_context():
+        increment_popularity({post_id: 10})
+        db.session.query(PostPopularity).update({"refreshed_at": datetime(2024, 6, 29, 12)})
+        db.session.commit()
+
+        assert not popularity_is_stale(TODAY - timedelta(days=1))
+        assert popularity_is_stale(TODAY + timedelta(days=1))
+        assert refresh_popularity_if_stale(TODAY + timedelta(days=1))
+        assert not refresh_popularity_if_stale(TODAY + timedelta(days=1))
+
+    assert windows(app, post_id) == (0, 10, 10, 10)
+
+
+def test_popular_endpoint_ranks_by_window(app, add_post):
+    steady = add_post(app, "steady")
+    burst = add_post(app, "burst")
+    add_views(app, steady, {20: 50})
+    add_views(app, burst, {0: 10})
+    with app.app_context():
+        refresh_popularity(TODAY)
+    client = app.test_client()
+
+    def slugs(window):
+        return [post["slug"] for post in client.get(f"/api/posts/popular?window={window}").get_json()]
+
+    assert slugs("7d") == ["burst"]
+    assert slugs("30d") == ["steady", "burst"]
+    assert client.get("/api/posts/popular?window=1y").status_code == 400
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from app.extensions import db
+from app.models import BlogPost, Category, Chapter
+from app.services.projections import SUMMARY_FIELDS
+
+
+def add_content(app, post_id: int) -> None:
+    with app.app_context():
+        post = db.session.get(BlogPost, post_id)
+        post.chapters.append(Chapter(position=0, type="TEXT", text_content="Body"))
+        post.categories.append(Category(name="News", slug="news"))
+        db.session.commit()
+
+
+def test_lists_return_summaries_by_default(app, client, add_post):
+    add_post(app, "first", summary="Teaser", is_featured=True)
+
+    for path in ("/api/posts/recent", "/api/posts/featured"):
+        (item,) = client.get(path).get_json()
+        assert set(item) == set(SUMMARY_FIELDS)
+        assert item["summary"] == "Teaser"
+    (item,) = client.get("/api/posts").get_json()["items"]
+    assert set(item) == set(SUMMARY_FIELDS)
+
+
+def test_full_view_matches_the_detail_endpoint(app, client, add_post):
+    post_id = add_post(app, "first")
+    add_content(app, post_id)
+
+    (item,) = client.get("/api/posts/recent?view=full").get_json()
+    assert item == client.get("/api/posts/first").get_json()
+    assert [chapter["text_content"] for chapter in item["chapters"]] == ["Body"]
+
+
+def test_fields_select_exactly_the_listed_fields(app, client, add_post):
+    post_id = add_post(app, "first")
+    add_content(app, post_id)
+
+    (item,) = client.get("/api/posts/recent?fields=title,categories").get_json()
+    assert set(item) == {"id", "title", "categories"}
+    assert item["categories"] == ["news"]
+
+    detail = client.get("/api/posts/first?fields=slug,chapters").get_json()
+    full = client.get("/api/posts/first").get_json()
+    assert detail == {"id": post_id, "slug": "first", "chapters": full["chapters"]}
+
+
+def test_invalid_fields_and_views_are_rejected(app, client, add_post):
+    add_post(app, "first")
+    assert client.get("/api/posts?fields=title,password").status_code == 400
+    assert client.get("/api/posts/first?fields=nope").status_code == 400
+    assert client.get("/api/posts/recent?view=compact").status_code == 400
+
+
+def test_post_gone_before_the_body_query_is_404(app, client, add_post, monkeypatch):
+    add_post(app, "first")
+    # The post is deleted between the fingerprint query and the body query.
+    monkeypatch.setattr("app.routes.public.project_posts", lambda query, fields, extra=(): ([], []))
+    assert client.get("/api/posts/first?fields=title").status_code == 404
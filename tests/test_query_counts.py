@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from flask import jsonify
+from sqlalchemy import select
+
+from app.extensions import db
+from app.models import BlogPost, Category, Chapter, User
+from app.utils.query_counter import assert_constant_queries
+
+
+@pytest.fixture()
+def app(make_app):
+    return make_app(QUERY_COUNT_HEADER=True)
+
+
+def add_posts(app, number: int, chapters: int = 2, categories: int = 2) -> list[str]:
+    """Add published posts, each with its own chapters and categories; returns their slugs."""
+    with app.app_context():
+        author = db.session.get(User, 1) or User(id=1, email="admin@example.com", password_hash="x", display_name="Admin")
+        offset = db.session.query(BlogPost).count()
+        now = datetime.now(timezone.utc)
+        posts = []
+        for index in range(offset, offset + number):
+            post = BlogPost(
+                author=author,
+                slug=f"post-{index}",
+                title=f"Post {index}",
+                status="PUBLISHED",
+                published_at=now - timedelta(minutes=index),
+                lang="hr",
+            )
+            post.chapters = [Chapter(position=p, type="TEXT", text_content=f"Chapter {p}") for p in range(chapters)]
+            post.categories = [Category(name=f"Category {index}-{c}", slug=f"category-{index}-{c}") for c in range(categories)]
+            posts.append(post)
+        db.session.add_all(posts)
+        db.session.commit()
+        return [post.slug for post in posts]
+
+
+def grow_post(app, slug: str) -> None:
+    with app.app_context():
+        post = db.session.scalar(select(BlogPost).where(BlogPost.slug == slug))
+        start = len(post.chapters)
+        post.chapters.extend(Chapter(position=start + i, type="TEXT", text_content="More") for i in range(10))
+        post.categories.extend(Category(name=f"Extra {slug}-{i}", slug=f"extra-{slug}-{i}") for i in range(5))
+        db.session.commit()
+
+
+@pytest.mark.parametrize("path", ["/api/posts", "/api/posts/recent"])
+def test_public_post_lists_use_constant_queries(app, client, path):
+    add_posts(app, 2)
+    assert_constant_queries(client, path, lambda: add_posts(app, 10))
+
+
+def test_post_detail_uses_constant_queries(app, client):
+    (slug,) = add_posts(app, 1)
+    assert_constant_queries(client, f"/api/posts/{slug}", lambda: grow_post(app, slug))
+
+
+def test_admin_post_list_uses_constant_queries(app, client, admin_headers):
+    add_posts(app, 2)
+    assert_constant_queries(client, "/api/admin/posts", lambda: add_posts(app, 10), headers=admin_headers)
+
+
+def test_guard_fails_on_per_row_queries(app, client):
+    @app.get("/test/lazy-chapters")
+    def lazy_chapters():
+        posts = db.session.scalars(select(BlogPost)).all()
+        return jsonify([len(post.chapters) for post in posts])
+
+    add_posts(app, 2)
+    with pytest.raises(AssertionError, match="grew with result size"):
+        assert_constant_queries(client, "/test/lazy-chapters", lambda: add_posts(app, 3))
@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import shutil
+
+import pytest
+
+
+@pytest.fixture()
+def replica_app(make_app, tmp_path):
+    """An app reading from a replica file, and a function that brings the replica up to date."""
+    primary, replica = tmp_path / "test.db", tmp_path / "replica.db"
+    app = make_app(SQLALCHEMY_REPLICA_URIS=[f"sqlite:///{replica}"], RESPONSE_CACHE_BACKEND="memory")
+    return app, lambda: shutil.copy(primary, replica)
+
+
+def create_post(client, headers, slug: str) -> None:
+    response = client.post(
+        "/api/admin/posts",
+        json={"slug": slug, "title": slug.title(), "status": "PUBLISHED", "chapters": []},
+        headers=headers,
+    )
+    assert response.status_code == 201
+
+
+def recent_slugs(client) -> list[str]:
+    return sorted(post["slug"] for post in client.get("/api/posts/recent").get_json())
+
+
+def test_cache_refill_after_invalidation_reads_the_primary(replica_app, admin_headers):
+    app, sync_replica = replica_app
+    admin = app.test_client()
+    create_post(admin, admin_headers, "first")
+    sync_replica()
+
+    reader = app.test_client()
+    assert recent_slugs(reader) == ["first"]
+
+    # The replica has not seen this write yet; the invalidated entry must still be rebuilt with it.
+    create_post(admin, admin_headers, "second")
+    assert recent_slugs(app.test_client()) == ["first", "second"]
+
+    # Uncached endpoints keep reading the lagging replica.
+    listed = app.test_client().get("/api/posts").get_json()["items"]
+    assert [post["slug"] for post in listed] == ["first"]
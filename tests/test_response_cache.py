@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+from app.services.cache import get_response_cache
+
+
+def cache_stats(app) -> dict:
+    with app.app_context():
+        return get_response_cache().stats()
+
+
+def test_repeat_reads_are_served_from_the_cache(app, client, add_post):
+    add_post(app, "first", is_featured=True)
+
+    for path in ("/api/posts/recent", "/api/posts/featured", "/api/categories", "/api/posts/first"):
+        first = client.get(path)
+        second = client.get(path)
+        assert first.status_code == second.status_code == 200
+        assert second.get_json() == first.get_json()
+
+    stats = cache_stats(app)
+    assert stats["backend"] == "MemoryCacheBackend"
+    assert (stats["misses"], stats["hits"]) == (4, 4)
+
+
+def test_post_writes_invalidate_lists_and_the_post(app, client, add_post, admin_headers):
+    post_id = add_post(app, "first")
+    assert [item["title"] for item in client.get("/api/posts/recent").get_json()] == ["First"]
+    assert client.get("/api/posts/first").get_json()["title"] == "First"
+
+    response = client.put(f"/api/admin/posts/{post_id}", json={"title": "Renamed"}, headers=admin_headers)
+    assert response.status_code == 200
+    assert [item["title"] for item in client.get("/api/posts/recent").get_json()] == ["Renamed"]
+    assert client.get("/api/posts/first").get_json()["title"] == "Renamed"
+
+    assert client.delete(f"/api/admin/posts/{post_id}", headers=admin_headers).status_code == 204
+    assert client.get("/api/posts/recent").get_json() == []
+    assert client.get("/api/posts/first").status_code == 404
+
+
+def test_category_writes_invalidate_category_lists(app, client, admin_headers):
+    assert client.get("/api/categories").get_json() == []
+
+    response = client.post("/api/admin/categories", json={"name": "News", "slug": "news"}, headers=admin_headers)
+    assert response.status_code == 201
+    category_id = response.get_json()["id"]
+    assert [c["name"] for c in client.get("/api/categories").get_json()] == ["News"]
+
+    client.put(f"/api/admin/categories/{category_id}", json={"name": "Updates"}, headers=admin_headers)
+    assert [c["name"] for c in client.get("/api/categories").get_json()] == ["Updates"]
+
+    assert client.delete(f"/api/admin/categories/{category_id}", headers=admin_headers).status_code == 204
+    assert client.get("/api/categories").get_json() == []
+
+
+def test_sqlite_backend_is_shared_between_apps(make_app, add_post, admin_headers, tmp_path):
+    config = {"RESPONSE_CACHE_BACKEND": "sqlite", "RESPONSE_CACHE_SQLITE_PATH": str(tmp_path / "cache.sqlite3")}
+    writer, reader = make_app(**config), make_app(**config)
+    post_id = add_post(writer, "first")
+
+    assert reader.test_client().get("/api/posts/first").get_json()["title"] == "First"
+    writer.test_client().put(f"/api/admin/posts/{post_id}", json={"title": "Renamed"}, headers=admin_headers)
+    assert reader.test_client().get("/api/posts/first").get_json()["title"] == "Renamed"
+    assert cache_stats(writer)["invalidations"] == 1
+
+
+def test_disabled_cache_counts_nothing(make_app, add_post):
+    app = make_app(RESPONSE_CACHE_BACKEND="none")
+    add_post(app, "first")
+    client = app.test_client()
+    client.get("/api/posts/recent")
+    client.get("/api/posts/recent")
+
+    stats = cache_stats(app)
+    assert stats["backend"] is None
+    assert (stats["misses"], stats["hits"]) == (0, 0)
@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import time
+from datetime import date, datetime, timedelta, timezone
+
+from app.extensions import db
+from app.models import BlogPost, PostMetricsDaily, PostPopularity
+from app.services.scheduler import get_post_scheduler, publish_due_posts
+
+
+def status(app, post_id: int) -> str:
+    with app.app_context():
+        status = db.session.get(BlogPost, post_id).status
+        db.session.remove()
+        return status
+
+
+def test_publish_due_posts_publishes_only_due_posts(app, add_post):
+    now = datetime.now(timezone.utc)
+    scheduled_for = now - timedelta(minutes=1)
+    due = add_post(app, "due", status="SCHEDULED", scheduled_for=scheduled_for)
+    later = add_post(app, "later", status="SCHEDULED", scheduled_for=now + timedelta(hours=1))
+    client = app.test_client()
+    assert client.get("/api/posts/due").status_code == 404
+
+    with app.app_context():
+        assert publish_due_posts() == ["due"]
+        assert publish_due_posts() == []
+        published_at = db.session.get(BlogPost, due).published_at
+
+    assert (status(app, due), status(app, later)) == ("PUBLISHED", "SCHEDULED")
+    # The scheduled time, not the moment the scan ran.
+    assert published_at.replace(tzinfo=timezone.utc) == scheduled_for
+    assert client.get("/api/posts/due").status_code == 200
+
+
+def test_scheduler_thread_publishes_when_the_post_falls_due(make_app, add_post):
+    app = make_app(SCHEDULER_MODE="thread")
+    scheduled_for = datetime.now(timezone.utc) + timedelta(seconds=0.5)
+    post_id = add_post(app, "on-time", status="SCHEDULED", scheduled_for=scheduled_for)
+    scheduler = app.extensions["post_scheduler"]
+    scheduler.ensure_started()
+    try:
+        deadline = time.monotonic() + 5
+        while status(app, post_id) != "PUBLISHED" and time.monotonic() < deadline:
+            time.sleep(0.05)
+    finally:
+        scheduler.shutdown()
+
+    assert status(app, post_id) == "PUBLISHED"
+    assert datetime.now(timezone.utc) >= scheduled_for
+    assert scheduler.stats()["published"] == 1
+
+
+def test_maintenance_refreshes_stale_popularity(app, add_post):
+    post_id = add_post(app, "faded")
+    with app.app_context():
+        db.session.add(PostMetricsDaily(post_id=post_id, date=date.today() - timedelta(days=100), views=7))
+        counts = {"views_7d": 7, "views_30d": 7, "views_90d": 7, "views_total": 7}
+        db.session.add(PostPopularity(post_id=post_id, refreshed_at=datetime.utcnow() - timedelta(days=2), **counts))
+        db.session.commit()
+        scheduler = get_post_scheduler()
+
+    scheduler.run_maintenance()
+
+    with app.app_context():
+        row = db.session.get(PostPopularity, post_id)
+        assert (row.views_7d, row.views_90d, row.views_total) == (0, 0, 7)
+    assert scheduler.stats()["maintenance_runs"] == 1
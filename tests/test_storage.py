@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+
+from app.services.storage import GoogleDriveStorage, HashingReader, hash_stream
+
+
+def test_hash_stream_starts_at_current_position():
+    stream = io.BytesIO(b"0123456789")
+    stream.seek(4)
+    assert hash_stream(stream) == (6, hashlib.sha256(b"456789").hexdigest())
+    assert stream.tell() == 4
+
+
+def test_hashing_reader_counts_reread_bytes_once():
+    reader = HashingReader(io.BytesIO(b"abcdef"))
+    reader.read(3)
+    reader.seek(1)
+    reader.read(4)
+    assert reader.finish() == (6, hashlib.sha256(b"abcdef").hexdigest())
+
+
+def test_hashing_reader_counts_from_its_start_position():
+    stream = io.BytesIO(b"headerpayload")
+    stream.seek(6)
+    reader = HashingReader(stream)
+    assert reader.seek(0, io.SEEK_END) == 7
+    reader.rewind()
+    assert stream.tell() == 6
+    assert reader.read(3) == b"pay"
+    reader.seek(0)
+    assert reader.read() == b"payload"
+    assert reader.finish() == (7, hashlib.sha256(b"payload").hexdigest())
+
+
+class FakeDriveRequest:
+    """Drives a resumable ``MediaIoBaseUpload`` the way the Drive client does, failing one chunk once."""
+
+    def __init__(self, media_body):
+        self.media_body = media_body
+        self.received = b""
+        self.failed = False
+
+    def next_chunk(self, num_retries=0):
+        chunk = self.media_body.getbytes(len(self.received), self.media_body.chunksize())
+        if len(self.received) and not self.failed:
+            self.failed = True
+            raise OSError("connection reset")
+        self.received += chunk
+        if len(self.received) < self.media_body.size():
+            return None, None
+        return None, {"id": "file-1", "mimeType": "text/plain", "webViewLink": "https://drive.google.com/file/d/file-1/view"}
+
+
+class FakeDriveService:
+    def __init__(self):
+        self.requests = []
+
+    def files(self):
+        return self
+
+    def create(self, body, media_body, fields):
+        self.requests.append(FakeDriveRequest(media_body))
+        return self.requests[-1]
+
+
+def test_drive_upload_sends_only_the_bytes_after_the_stream_position(tmp_path, monkeypatch):
+    account = tmp_path / "service-account.json"
+    account.write_text("{}")
+    storage = GoogleDriveStorage(account, chunk_size=GoogleDriveStorage.CHUNK_ALIGNMENT)
+    service = FakeDriveService()
+    storage._local.service, storage._local.pid = service, os.getpid()
+    monkeypatch.setattr("app.services.storage.time.sleep", lambda seconds: None)
+
+    payload = os.urandom(GoogleDriveStorage.CHUNK_ALIGNMENT * 2 + 100)
+    stream = io.BytesIO(b"multipart preamble" + payload)
+    stream.seek(len(b"multipart preamble"))
+    stored = storage.upload(stream, "notes.txt")
+
+    assert service.requests[0].received == payload
+    assert (stored.size, stored.checksum) == (len(payload), hashlib.sha256(payload).hexdigest())
+    assert stored.path == "https://drive.google.com/file/d/file-1/view"
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import time
+
+import pytest
+
+from app.extensions import db
+from app.models import MediaAsset
+from app.services.storage import StorageObject
+from app.services.uploads import get_upload_pipeline
+from app.services.warmup import warm_up
+
+
+@pytest.fixture()
+def async_app(make_app, tmp_path):
+    return make_app(
+        MEDIA_STORAGE_BACKEND="local",
+        MEDIA_UPLOAD_MODE="async",
+        MEDIA_UPLOAD_SPOOL_DIR=str(tmp_path / "spool"),
+        IMAGE_DERIVATIVE_MODE="off",
+        WARMUP_PATHS=(),
+    )
+
+
+def pending_asset(app, spool_name: str = "upload.abc.notes.txt", data: bytes | None = b"hello") -> int:
+    pipeline = app.extensions["upload_pipeline"]
+    if data is not None:
+        pipeline.spool_dir.mkdir(parents=True, exist_ok=True)
+        (pipeline.spool_dir / spool_name).write_bytes(data)
+    with app.app_context():
+        asset = MediaAsset(kind="FILE", storage_provider="LOCAL", storage_path=spool_name, status="PENDING")
+        db.session.add(asset)
+        db.session.commit()
+        return asset.id
+
+
+def wait_for_status(app, media_id: int, timeout: float = 5.0) -> str:
+    deadline = time.monotonic() + timeout
+    while True:
+        with app.app_context():
+            status = db.session.get(MediaAsset, media_id).status
+            db.session.remove()
+        if status != "PENDING" or time.monotonic() > deadline:
+            return status
+        time.sleep(0.05)
+
+
+def test_warm_up_recovers_pending_uploads(async_app):
+    media_id = pending_asset(async_app)
+    result = warm_up(async_app)
+    assert "uploads" in result["timings_ms"] and not result["errors"]
+    assert wait_for_status(async_app, media_id) == "READY"
+
+
+def test_finish_ignores_assets_that_are_no_longer_pending(async_app):
+    media_id = pending_asset(async_app, data=None)
+    with async_app.app_context():
+        pipeline = get_upload_pipeline()
+        stored = StorageObject(provider="LOCAL", path="ab/cd/abcd", mime_type=None, size=5, checksum=None)
+        assert pipeline._finish(media_id, storage_obj=stored)
+        # A late recover() that finds the spool file gone must not record a failure.
+        assert not pipeline._finish(media_id, error="Spooled upload is missing")
+        assert db.session.get(MediaAsset, media_id).status == "READY"
+    assert pipeline.stats()["completed"] == 1
+    assert pipeline.stats()["failed"] == 0
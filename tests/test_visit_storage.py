@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import date, datetime, timezone
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+from app.extensions import db
+from app.models import PostMetricsDaily, Visit, VisitAgentDaily, VisitReferrerDaily
+from app.services import visits
+from app.services.visit_partitions import apply_retention
+from app.services.visits import VisitEvent, write_visits
+from app.utils.sql import is_foreign_key_violation
+
+
+class PostgresError(Exception):
+    def __init__(self, pgcode: str) -> None:
+        super().__init__(pgcode)
+        self.pgcode = pgcode
+
+
+def integrity_error(orig: Exception) -> IntegrityError:
+    return IntegrityError("INSERT INTO visit ...", {}, orig)
+
+
+@pytest.mark.parametrize(
+    "orig, expected",
+    [
+        (PostgresError("23503"), True),
+        # "no partition of relation visit found for row"
+        (PostgresError("23514"), False),
+        (sqlite3.IntegrityError("FOREIGN KEY constraint failed"), True),
+        (sqlite3.IntegrityError("UNIQUE constraint failed: visit.id"), False),
+    ],
+)
+def test_foreign_key_violations_are_told_apart(orig, expected):
+    assert is_foreign_key_violation(integrity_error(orig)) is expected
+
+
+def test_visits_of_deleted_posts_are_dropped(app, add_post, monkeypatch):
+    post_id = add_post(app, "still-here")
+    write = visits._write_visits
+    calls = []
+
+    def fail_once(events):
+        calls.append([event.post_id for event in events])
+        if len(calls) == 1:
+            raise integrity_error(PostgresError("23503"))
+        write(events)
+
+    monkeypatch.setattr(visits, "_write_visits", fail_once)
+    now = datetime.now(timezone.utc)
+    with app.app_context():
+        write_visits([VisitEvent(post_id, now), VisitEvent(post_id + 1, now)])
+        assert db.session.scalars(select(Visit.post_id)).all() == [post_id]
+    assert calls == [[post_id, post_id + 1], [post_id]]
+
+
+def test_other_integrity_errors_are_not_swallowed(app, add_post, monkeypatch):
+    post_id = add_post(app, "partition-missing")
+
+    def reject(events):
+        raise integrity_error(PostgresError("23514"))
+
+    monkeypatch.setattr(visits, "_write_visits", reject)
+    with app.app_context(), pytest.raises(IntegrityError):
+        write_visits([VisitEvent(post_id, datetime.now(timezone.utc))])
+
+
+def test_retention_rolls_up_and_deletes_expired_months(app, add_post):
+    post_id = add_post(app, "evergreen")
+    old = datetime(2024, 1, 15, 10, tzinfo=timezone.utc)
+    recent = datetime(2024, 6, 1, 10, tzinfo=timezone.utc)
+    with app.app_context():
+        write_visits(
+            [
+                VisitEvent(post_id, old, "s1", referrer="https://www.example.com/a", user_agent="Mozilla/5.0 (iPhone)"),
+                VisitEvent(post_id, old, "s2", referrer="https://example.com/b", user_agent="Googlebot/2.1"),
+                VisitEvent(post_id, recent, "s1"),
+            ]
+        )
+
+        result = apply_retention(3, today=date(2024, 6, 20))
+
+        assert result["cutoff"] == "2024-03-01"
+        assert result["deleted_visits"] == 2
+        assert db.session.scalar(select(func.count(Visit.id))) == 1
+        referrers = db.session.execute(select(VisitReferrerDaily.referrer_host, VisitReferrerDaily.visits)).all()
+        assert referrers == [("example.com", 2)]
+        agents = dict(db.session.execute(select(VisitAgentDaily.agent_family, VisitAgentDaily.visits)).all())
+        assert agents == {"mobile": 1, "bot": 1}
+        metrics = db.session.get(PostMetricsDaily, (post_id, date(2024, 1, 15)))
+        assert (metrics.views, metrics.unique_sessions) == (2, 2)
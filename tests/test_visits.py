@@ -0,0 +1,46 @@
+from __future__ import annotations
+
+from datetime import date, datetime
+
+from sqlalchemy import func, select
+
+from app.extensions import db
+from app.models import PostMetricsDaily, Visit, VisitSessionDaily
+from app.services.visits import VisitEvent, write_visits
+
+
+def visit(post_id: int, session_id: str | None, when: str = "2024-06-01T10:00:00") -> VisitEvent:
+    return VisitEvent(post_id=post_id, visited_at=datetime.fromisoformat(when), session_id=session_id)
+
+
+def daily_metrics(app, post_id: int) -> dict[date, tuple[int, int]]:
+    with app.app_context():
+        rows = db.session.scalars(select(PostMetricsDaily).where(PostMetricsDaily.post_id == post_id))
+        return {row.date: (row.views, row.unique_sessions) for row in rows}
+
+
+def test_sessions_count_once_per_post_and_day(app, add_post):
+    post_id = add_post(app, "first")
+    other_id = add_post(app, "second")
+
+    with app.app_context():
+        write_visits([visit(post_id, "a"), visit(post_id, "a"), visit(post_id, "b"), visit(post_id, None)])
+        # A later flush must not count sessions already seen that day.
+        write_visits([visit(post_id, "a", "2024-06-01T18:00:00"), visit(post_id, "c"), visit(other_id, "a")])
+        write_visits([visit(post_id, "a", "2024-06-02T09:00:00")])
+
+        assert db.session.scalar(select(func.count()).select_from(Visit)) == 8
+        assert db.session.scalar(select(func.count()).select_from(VisitSessionDaily)) == 5
+
+    assert daily_metrics(app, post_id) == {date(2024, 6, 1): (6, 3), date(2024, 6, 2): (1, 1)}
+    assert daily_metrics(app, other_id) == {date(2024, 6, 1): (1, 1)}
+
+
+def test_post_reads_record_the_session(app, client, add_post):
+    post_id = add_post(app, "first")
+
+    for session_id in ("a", "a", "b"):
+        assert client.get("/api/posts/first", headers={"X-Session-ID": session_id}).status_code == 200
+
+    ((views, unique_sessions),) = daily_metrics(app, post_id).values()
+    assert (views, unique_sessions) == (3, 2)